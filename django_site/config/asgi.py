@@ -12,5 +12,14 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("ASYNC_VIEWS", "true")
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+from pages.outbox import start_sender_in_server_processes  # noqa: E402
+from pages.warmup import warm_up  # noqa: E402
+
+if settings.CONTENT_WARMUP:
+    warm_up()
+start_sender_in_server_processes()
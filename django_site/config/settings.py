@@ -71,7 +71,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "pages.middleware.CanonicalHostRedirectMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "pages.middleware.WhiteNoiseMiddleware",
+    "pages.timing.ServerTimingMiddleware",
+    "pages.metrics.MetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -93,6 +95,7 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "pages.context_processors.seo",
+                "pages.context_processors.site_assets",
             ],
         },
     },
@@ -159,12 +162,24 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Hashed, precompressed names need `collectstatic`; with DEBUG, files are served unhashed from the finders.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
 
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 USE_X_FORWARDED_HOST = _env_bool("USE_X_FORWARDED_HOST", default=True)
 
 SECURE_SSL_REDIRECT = _env_bool("SECURE_SSL_REDIRECT", default=not DEBUG)
+# Platform health checks probe the readiness endpoint over plain HTTP.
+SECURE_REDIRECT_EXEMPT = [r"^ready/$"]
 SESSION_COOKIE_SECURE = _env_bool("SESSION_COOKIE_SECURE", default=not DEBUG)
 CSRF_COOKIE_SECURE = _env_bool("CSRF_COOKIE_SECURE", default=not DEBUG)
 SECURE_HSTS_SECONDS = int(os.getenv("SECURE_HSTS_SECONDS", "31536000" if not DEBUG else "0"))
@@ -175,6 +190,8 @@ SECURE_HSTS_PRELOAD = _env_bool("SECURE_HSTS_PRELOAD", default=not DEBUG)
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "website@sam-osian.com")
 CONTACT_EMAIL_RECIPIENT = os.getenv("CONTACT_EMAIL_RECIPIENT", "samoand@liverpool.ac.uk")
+# How long a rendered contact form's signed timestamp is accepted
+CONTACT_FORM_TOKEN_MAX_AGE_SECONDS = int(os.getenv("CONTACT_FORM_TOKEN_MAX_AGE_SECONDS", str(6 * 60 * 60)))
 
 # SMTP settings (used when EMAIL_BACKEND is SMTP backend)
 EMAIL_HOST = os.getenv("EMAIL_HOST", "")
@@ -183,3 +200,88 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 EMAIL_USE_TLS = _env_bool("EMAIL_USE_TLS", default=True)
 EMAIL_USE_SSL = _env_bool("EMAIL_USE_SSL", default=False)
+
+
+# Markdown posts, pages, CV and config (point at a generated corpus for scale testing)
+CONTENT_ROOT = Path(os.getenv("CONTENT_ROOT", str(BASE_DIR / "content")))
+
+# Precompiled content (built by `manage.py compile_content`, loaded at startup when present)
+CONTENT_SNAPSHOT_PATH = Path(os.getenv("CONTENT_SNAPSHOT_PATH", str(BASE_DIR / "build" / "content.snapshot")))
+CONTENT_SNAPSHOT_VERIFY = _env_bool("CONTENT_SNAPSHOT_VERIFY", default=True)
+
+# Static image dimensions (built by `manage.py build_image_manifest`, updated on cache misses)
+IMAGE_MANIFEST_PATH = Path(os.getenv("IMAGE_MANIFEST_PATH", str(BASE_DIR / "build" / "image-manifest.json")))
+
+# Responsive image derivatives (built by `manage.py build_responsive_images`, served under /static/responsive/)
+RESPONSIVE_IMAGES_DIR = BASE_DIR / "build" / "responsive"
+RESPONSIVE_IMAGES_MANIFEST_PATH = BASE_DIR / "build" / "responsive-images.json"
+
+# Bundled, minified CSS and JS (built by `manage.py build_assets`, used by templates once present)
+ASSET_BUILD_DIR = BASE_DIR / "build" / "assets"
+
+# Per-template first-screen CSS (built by `manage.py build_critical_css`, inlined so the stylesheet loads non-blocking)
+CRITICAL_CSS_MANIFEST_PATH = BASE_DIR / "build" / "critical-css.json"
+
+STATICFILES_DIRS = [
+    *([("responsive", RESPONSIVE_IMAGES_DIR)] if RESPONSIVE_IMAGES_DIR.is_dir() else []),
+    *([ASSET_BUILD_DIR] if ASSET_BUILD_DIR.is_dir() else []),
+]
+
+# Rendered page cache (keyed by URL and a fingerprint of content, templates and image manifests)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "pages": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pages",
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "2000"))},
+    },
+}
+PAGE_CACHE_ENABLED = _env_bool("PAGE_CACHE_ENABLED", default=True)
+PAGE_CACHE_ALIAS = "pages"
+PAGE_CACHE_VERSION_TTL = float(os.getenv("PAGE_CACHE_VERSION_TTL", "1.0"))
+
+# Contact form rate limiting (SQLite file shared by every worker on the host)
+CONTACT_RATE_LIMIT_BACKEND = os.getenv("CONTACT_RATE_LIMIT_BACKEND", "pages.rate_limit.SQLiteRateLimiter")
+CONTACT_RATE_LIMIT_DB_PATH = Path(
+    os.getenv("CONTACT_RATE_LIMIT_DB_PATH", str(BASE_DIR / "build" / "rate-limits.sqlite3"))
+)
+# Keyword arguments for the backend class (the SQLite limiter takes the file path; the cache one none)
+CONTACT_RATE_LIMIT_OPTIONS = (
+    {"path": CONTACT_RATE_LIMIT_DB_PATH} if CONTACT_RATE_LIMIT_BACKEND == "pages.rate_limit.SQLiteRateLimiter" else {}
+)
+
+# Contact email outbox (spooled to SQLite and sent in the background, or by `manage.py send_outbox`)
+# The default lives in the disposable build directory; use a persistent path to keep queued mail across deploys.
+CONTACT_OUTBOX_DB_PATH = Path(os.getenv("CONTACT_OUTBOX_DB_PATH", str(BASE_DIR / "build" / "outbox.sqlite3")))
+CONTACT_OUTBOX_SENDER_THREAD = _env_bool("CONTACT_OUTBOX_SENDER_THREAD", default=True)
+CONTACT_OUTBOX_POLL_SECONDS = float(os.getenv("CONTACT_OUTBOX_POLL_SECONDS", "60"))
+
+# Serve the async view variants (config.asgi turns this on; WSGI keeps the sync views)
+ASYNC_VIEWS = _env_bool("ASYNC_VIEWS", default=False)
+
+# Load content and prime the page cache when the WSGI/ASGI app is created (before fork with --preload)
+CONTENT_WARMUP = _env_bool("CONTENT_WARMUP", default=not DEBUG)
+
+# Server-Timing header and one JSON timing line per request on the `pages.timing` logger (off by default)
+SERVER_TIMING_ENABLED = _env_bool("SERVER_TIMING_ENABLED", default=False)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "pages.timing": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
+# Prometheus metrics at /metrics, summed across workers through a shared SQLite file (off by default)
+METRICS_ENABLED = _env_bool("METRICS_ENABLED", default=False)
+METRICS_DB_PATH = Path(os.getenv("METRICS_DB_PATH", str(BASE_DIR / "build" / "metrics.sqlite3")))
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+# Scrapers must connect from one of these addresses or send `Authorization: Bearer <METRICS_TOKEN>`.
+METRICS_ALLOWED_IPS = _env_list("METRICS_ALLOWED_IPS", default=["127.0.0.1", "::1"])
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+from pages.outbox import start_sender_in_server_processes  # noqa: E402
+from pages.warmup import warm_up  # noqa: E402
+
+if settings.CONTENT_WARMUP:
+    warm_up()
+start_sender_in_server_processes()
@@ -1,5 +1,29 @@
 from django.apps import AppConfig
+from django.core.signals import setting_changed
+
+
+def _content_root_changed(*, setting, value, **kwargs):
+    if setting == "CONTENT_ROOT":
+        from .content import set_content_root
+
+        set_content_root(value)
 
 
 class PagesConfig(AppConfig):
     name = "pages"
+
+    def ready(self):
+        from django.conf import settings
+
+        from .content import set_content_root
+        from .critical_css import critical_styles
+        from .images import image_manifest
+        from .responsive_images import responsive_images
+        from .snapshot import activate_configured_snapshot
+
+        set_content_root(settings.CONTENT_ROOT)
+        setting_changed.connect(_content_root_changed)
+        image_manifest.load(getattr(settings, "IMAGE_MANIFEST_PATH", None))
+        responsive_images.load(getattr(settings, "RESPONSIVE_IMAGES_MANIFEST_PATH", None))
+        critical_styles.load(getattr(settings, "CRITICAL_CSS_MANIFEST_PATH", None))
+        activate_configured_snapshot()
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import posixpath
+import re
+from urllib.parse import urljoin, urlsplit
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+STATIC_SOURCE_DIR = Path(__file__).resolve().parent / "static"
+SIMPLEBAR_VERSION = "6.2.6"
+VENDOR_FETCH_TIMEOUT_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class AssetBundle:
+    output: str
+    sources: tuple[str, ...]
+    kind: str
+
+
+@dataclass(frozen=True)
+class VendoredAsset:
+    path: str
+    url: str
+
+
+# Third-party files served from our own static files instead of their CDNs, fetched by `vendor_assets`.
+VENDORED_ASSETS = (
+    VendoredAsset(
+        "pages/vendor/simplebar/simplebar.css",
+        f"https://cdn.jsdelivr.net/npm/simplebar@{SIMPLEBAR_VERSION}/dist/simplebar.css",
+    ),
+    VendoredAsset(
+        "pages/vendor/simplebar/simplebar.min.js",
+        f"https://cdn.jsdelivr.net/npm/simplebar@{SIMPLEBAR_VERSION}/dist/simplebar.min.js",
+    ),
+    VendoredAsset("pages/vendor/hugeicons/hgi-stroke-rounded.css", "https://cdn.hugeicons.com/font/hgi-stroke-rounded.css"),
+)
+
+ASSET_BUNDLES = {
+    "css": AssetBundle(
+        "pages/site.min.css",
+        ("pages/vendor/simplebar/simplebar.css", "pages/vendor/hugeicons/hgi-stroke-rounded.css", "pages/site.css"),
+        "css",
+    ),
+    "js": AssetBundle("pages/site.min.js", ("pages/vendor/simplebar/simplebar.min.js", "pages/site.js"), "js"),
+}
+
+_CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def minify_css(source: str) -> str:
+    """Minify with rcssmin, keeping ``/*! ... */`` licence notices."""
+
+    import rcssmin
+
+    return rcssmin.cssmin(source, keep_bang_comments=True) + "\n"
+
+
+def minify_js(source: str) -> str:
+    """Minify with rjsmin, keeping ``/*! ... */`` licence notices. Identifiers are not renamed."""
+
+    import rjsmin
+
+    return rjsmin.jsmin(source, keep_bang_comments=True) + "\n"
+
+
+def _fetch(url: str) -> bytes:
+    request = Request(url, headers={"User-Agent": "sams-website-vendor-assets"})
+    with urlopen(request, timeout=VENDOR_FETCH_TIMEOUT_SECONDS) as response:
+        return response.read()
+
+
+def vendor_asset(asset: VendoredAsset, static_dir: Path = STATIC_SOURCE_DIR) -> list[Path]:
+    """Download ``asset`` into ``static_dir``. A stylesheet's fonts and images are saved next to it."""
+
+    target = Path(static_dir) / asset.path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    data = _fetch(asset.url)
+    written: dict[str, Path] = {}
+    if asset.path.endswith(".css"):
+
+        def localise(match: re.Match) -> str:
+            url = match.group(2).strip()
+            if url.startswith(("data:", "#")):
+                return match.group()
+            parts = urlsplit(urljoin(asset.url, url))
+            name = posixpath.basename(parts.path)
+            if name not in written:
+                written[name] = target.parent / name
+                written[name].write_bytes(_fetch(parts._replace(fragment="").geturl()))
+            return f'url("{name}#{parts.fragment}")' if parts.fragment else f'url("{name}")'
+
+        data = _CSS_URL.sub(localise, data.decode("utf-8")).encode("utf-8")
+    target.write_bytes(data)
+    return [target, *written.values()]
+
+
+def _rebase_css_urls(css: str, source: str) -> str:
+    # The bundle lives at another path (and critical CSS is inlined into pages), so a
+    # vendored stylesheet's relative font URLs become absolute static URLs.
+    base = posixpath.dirname(source)
+
+    def rebase(match: re.Match) -> str:
+        url = match.group(2).strip()
+        if url.startswith(("data:", "#", "/")) or urlsplit(url).scheme:
+            return match.group()
+        return f'url("{settings.STATIC_URL}{posixpath.normpath(posixpath.join(base, url))}")'
+
+    return _CSS_URL.sub(rebase, css)
+
+
+def bundle_text(bundle: AssetBundle) -> str:
+    minify = minify_css if bundle.kind == "css" else minify_js
+    parts = []
+    for source in bundle.sources:
+        path = finders.find(source)
+        if path is None:
+            raise FileNotFoundError(f"Static file {source} not found. Run `manage.py vendor_assets` for vendored files.")
+        text = Path(path).read_text(encoding="utf-8")
+        if bundle.kind == "css":
+            text = _rebase_css_urls(text, source)
+        parts.append(minify(text))
+    # A semicolon between scripts stops one file's last statement running into the next.
+    return (";\n" if bundle.kind == "js" else "").join(parts)
+
+
+def build_bundle(bundle: AssetBundle, output_dir: Path) -> Path:
+    output_path = Path(output_dir) / bundle.output
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(bundle_text(bundle), encoding="utf-8")
+    return output_path
+
+
+def bundle_paths(name: str) -> list[str]:
+    """Static paths a template should load for a bundle: the built file, or its sources until it is built."""
+
+    bundle = ASSET_BUNDLES[name]
+    build_dir = getattr(settings, "ASSET_BUILD_DIR", None)
+    if build_dir and (Path(build_dir) / bundle.output).is_file():
+        return [bundle.output]
+    return list(bundle.sources)
@@ -0,0 +1,87 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+
+from . import views
+from .content import get_content_snapshot
+from .forms import ContactForm
+from .page_cache import cache_page_by_content_version
+from .timing import render
+
+
+async def _from_content(builder, *args):
+    # With a compiled snapshot every content lookup is an in-memory read, so it runs on
+    # the event loop. Without one, loading may parse files and goes to a worker thread.
+    if get_content_snapshot() is not None:
+        return builder(*args)
+    return await sync_to_async(builder, thread_sensitive=False)(*args)
+
+
+@cache_page_by_content_version(per_request_fields=views.HOME_PER_REQUEST_FIELDS, bypass_with_session=True)
+async def home(request):
+    if request.method == "POST" and request.POST.get("form_name") == "contact":
+        return await sync_to_async(views._handle_contact_submission)(request)
+
+    contact_form, contact_status = ContactForm(), None
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        contact_form, contact_status = await sync_to_async(views._contact_form_state)(request)
+    context = await _from_content(views._home_context, contact_form, contact_status)
+    return render(request, "pages/home.html", context)
+
+
+@cache_page_by_content_version
+async def about(request):
+    return render(request, "pages/about_showcase.html", await _from_content(views._about_context))
+
+
+@cache_page_by_content_version
+async def publications(request):
+    return render(request, "pages/page.html", await _from_content(views._publications_context))
+
+
+@cache_page_by_content_version
+async def cv(request):
+    return render(request, "pages/cv.html", await _from_content(views._cv_context))
+
+
+@cache_page_by_content_version
+async def post_detail(request, slug: str):
+    return render(request, "pages/post_detail.html", await _from_content(views._post_detail_context, request, slug))
+
+
+@cache_page_by_content_version
+async def tag_posts(request, tag: str):
+    return render(request, "pages/post_list.html", await _from_content(views._tag_posts_context, request, tag))
+
+
+@cache_page_by_content_version
+async def archive_year(request, year: int):
+    return render(request, "pages/post_list.html", await _from_content(views._archive_year_context, request, year))
+
+
+async def search(request):
+    return render(request, "pages/search.html", await _from_content(views._search_context, request))
+
+
+@cache_page_by_content_version
+async def robots_txt(_request):
+    return HttpResponse(await _from_content(views._robots_txt_content), content_type="text/plain; charset=utf-8")
+
+
+@cache_page_by_content_version
+async def sitemap_xml(_request):
+    return HttpResponse(await _from_content(views._sitemap_xml_content), content_type="application/xml; charset=utf-8")
+
+
+@cache_page_by_content_version
+async def feed_xml(_request):
+    return views._feed_response(*await _from_content(views._feed_xml_content))
+
+
+async def readiness(_request):
+    return views._readiness_response()
+
+
+async def metrics(request):
+    # The shared metrics file is SQLite, so it is read off the event loop.
+    return await sync_to_async(views._metrics_response)(request)
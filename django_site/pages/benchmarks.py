@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+import os
+from pathlib import Path
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+import django
+from django.test import Client, override_settings
+
+from . import content, page_cache
+from .corpus import write_corpus
+
+DEFAULT_SIZES = (10, 1000, 10000)
+BENCHMARK_FORMAT_VERSION = 1
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    size: int
+    mode: str
+    runs_ms: list[float] = field(default_factory=list)
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.runs_ms)
+
+    def as_dict(self) -> dict:
+        return {
+            **asdict(self),
+            "min_ms": min(self.runs_ms),
+            "median_ms": self.median_ms,
+            "max_ms": max(self.runs_ms),
+        }
+
+
+@dataclass
+class Benchmark:
+    name: str
+    run: Callable[[], object]
+    # Whether the work grows with the number of posts; per-document benchmarks run once.
+    scales_with_corpus: bool = True
+
+
+def _reset_content_caches() -> None:
+    content.clear_post_index()
+    vars(content._markdown_engines).pop("engine", None)
+    page_cache.clear_content_version()
+
+
+@contextmanager
+def _corpus(size: int) -> Iterator[list[str]]:
+    work_dir = Path(tempfile.mkdtemp(prefix="benchmark-corpus-"))
+    original_snapshot = content.get_content_snapshot()
+    try:
+        slugs = write_corpus(work_dir, size)
+        # Changing the root also drops the active snapshot, which would otherwise answer every lookup.
+        with override_settings(CONTENT_ROOT=work_dir):
+            _reset_content_caches()
+            yield slugs
+    finally:
+        content.set_content_snapshot(original_snapshot)
+        _reset_content_caches()
+        shutil.rmtree(work_dir)
+
+
+def _get_ok(client: Client, path: str) -> None:
+    response = client.get(path)
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {path} returned {response.status_code}.")
+
+
+def _benchmarks(slugs: list[str]) -> list[Benchmark]:
+    sample_path = content.POSTS_DIR / f"{slugs[0]}.md"
+    sample_raw = sample_path.read_text(encoding="utf-8")
+    _, sample_body = content._split_front_matter(sample_raw)
+    middle_slug = slugs[len(slugs) // 2]
+    client = Client()
+    return [
+        Benchmark("_split_front_matter", lambda: content._split_front_matter(sample_raw), scales_with_corpus=False),
+        Benchmark("_render_markdown", lambda: content._render_markdown(sample_body), scales_with_corpus=False),
+        Benchmark("_load_post", lambda: content._load_post(sample_path), scales_with_corpus=False),
+        Benchmark("load_cv", content.load_cv, scales_with_corpus=False),
+        Benchmark("load_posts", content.load_posts),
+        Benchmark("get_post", lambda: content.get_post(middle_slug)),
+        Benchmark("search", lambda: content.get_post_index().search("coroner data calibration")),
+        Benchmark("view:home", lambda: _get_ok(client, "/")),
+        Benchmark("view:post_detail", lambda: _get_ok(client, f"/posts/{middle_slug}/")),
+        Benchmark("view:sitemap_xml", lambda: _get_ok(client, "/sitemap.xml")),
+    ]
+
+
+def _time_ms(run: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    run()
+    return (time.perf_counter() - started) * 1000
+
+
+def run_suite(
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    repeat: int = 5,
+    cold_repeat: int = 1,
+    progress: Callable[[BenchmarkResult], None] | None = None,
+) -> list[BenchmarkResult]:
+    """Time each benchmark cold (content caches cleared before every run) and warm.
+
+    Views go through the test client with the page cache off, so they measure
+    rendering rather than cache hits.
+    """
+
+    results = []
+    measured_once = set()
+    with override_settings(
+        ALLOWED_HOSTS=["testserver"],
+        PAGE_CACHE_ENABLED=False,
+        SECURE_SSL_REDIRECT=False,
+        REDIRECT_WWW_TO_APEX=False,
+    ):
+        for size in sizes:
+            with _corpus(size) as slugs:
+                for benchmark in _benchmarks(slugs):
+                    if not benchmark.scales_with_corpus and benchmark.name in measured_once:
+                        continue
+                    measured_once.add(benchmark.name)
+                    result_size = size if benchmark.scales_with_corpus else 1
+
+                    cold = BenchmarkResult(benchmark.name, result_size, "cold")
+                    for _ in range(cold_repeat):
+                        _reset_content_caches()
+                        cold.runs_ms.append(_time_ms(benchmark.run))
+
+                    warm = BenchmarkResult(benchmark.name, result_size, "warm")
+                    benchmark.run()
+                    for _ in range(repeat):
+                        warm.runs_ms.append(_time_ms(benchmark.run))
+
+                    for result in (cold, warm):
+                        results.append(result)
+                        if progress is not None:
+                            progress(result)
+    return results
+
+
+def _git_commit(cwd: Path) -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def results_document(results: list[BenchmarkResult], *, repeat: int, cold_repeat: int) -> dict:
+    return {
+        "format_version": BENCHMARK_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(Path(__file__).resolve().parent),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "cold_repeat": cold_repeat,
+        "results": [result.as_dict() for result in results],
+    }
+
+
+def compare(baseline: dict, current: dict) -> list[tuple[str, int, str, float, float, float]]:
+    """Pair up results by name, corpus size and mode; returns medians and the relative change."""
+
+    def by_key(document: dict) -> dict[tuple[str, int, str], float]:
+        return {(row["name"], row["size"], row["mode"]): row["median_ms"] for row in document["results"]}
+
+    before, after = by_key(baseline), by_key(current)
+    rows = []
+    for key in sorted(before.keys() & after.keys(), key=lambda key: (key[1], key[0], key[2])):
+        change = (after[key] - before[key]) / before[key] if before[key] else 0.0
+        rows.append((*key, before[key], after[key], change))
+    return rows
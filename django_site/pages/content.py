@@ -1,17 +1,28 @@
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
 from datetime import date, datetime
+from hashlib import sha256
 import html
 import mimetypes
 from math import ceil
 from pathlib import Path
 import re
-from typing import Any
+import threading
+import time
+from typing import TYPE_CHECKING, Any
 
-import markdown
-from PIL import Image
-import yaml
+from django.utils.text import slugify
+
+from . import metrics
+from .images import image_manifest
+from .responsive_images import responsive_images
+from .search import SearchDocument, SearchIndex, build_search_index
+from .timing import timed
+
+if TYPE_CHECKING:
+    import markdown
 
 
 CONTENT_DIR = Path(__file__).resolve().parents[1] / "content"
@@ -26,6 +37,17 @@ PAGE_MAP = {
 }
 READ_MORE_MARKER = "<!-- more -->"
 POST_FOOTER_MARKER = "<!-- post-footer -->"
+FOOTNOTES_BLOCK_START = '<div class="footnote">'
+SECTION_MARKERS = (READ_MORE_MARKER, POST_FOOTER_MARKER)
+INTERNAL_PAGE_LINKS = {
+    "index.md": "/",
+    "about.md": "/about/",
+    "publications.md": "/publications/",
+}
+POST_LINK_PATTERN = re.compile(r"posts/([a-zA-Z0-9\-]+)\.md")
+FOOTNOTE_REFERENCE_PATTERN = re.compile(r'<sup id="(fnref\d*:[^"]+)"><a class="footnote-ref" href="#fn:[^"]+">.*?</a></sup>')
+POSTS_PAGE_SIZE = 10
+MARKDOWN_IMAGE_SIZES = "(max-width: 760px) 100vw, 690px"
 MARKDOWN_EXTENSIONS = [
     "admonition",
     "abbr",
@@ -112,6 +134,14 @@ class AuthorProfile:
     url: str | None
 
 
+@timed("yaml")
+def _load_yaml(raw: str) -> Any:
+    # PyYAML is only needed when a file is actually parsed, not when a snapshot is served.
+    import yaml
+
+    return yaml.safe_load(raw)
+
+
 def _split_front_matter(raw: str) -> tuple[dict[str, Any], str]:
     if not raw.startswith("---"):
         return {}, raw
@@ -124,7 +154,7 @@ def _split_front_matter(raw: str) -> tuple[dict[str, Any], str]:
         if lines[idx].strip() == "---":
             front_matter = "\n".join(lines[1:idx])
             body = "\n".join(lines[idx + 1 :])
-            parsed = yaml.safe_load(front_matter) or {}
+            parsed = _load_yaml(front_matter) or {}
             if not isinstance(parsed, dict):
                 parsed = {}
             return parsed, body
@@ -149,17 +179,14 @@ def _normalize_asset_url(raw_url: str) -> str:
     return url
 
 
-def _normalize_markdown_paths(content: str) -> str:
-    content = re.sub(
-        r"\]\(\s*([^\)]+)\)",
-        lambda match: f"]({_normalize_asset_url(match.group(1))})",
-        content,
-    )
-    content = re.sub(r"\]\(\s*index\.md\)", "](/)", content)
-    content = re.sub(r"\]\(\s*about\.md\)", "](/about/)", content)
-    content = re.sub(r"\]\(\s*publications\.md\)", "](/publications/)", content)
-    content = re.sub(r"\]\(\s*posts/([a-zA-Z0-9\-]+)\.md\)", r"](/\1/)", content)
-    return content
+def _normalize_link_url(raw_url: str) -> str:
+    url = _normalize_asset_url(raw_url)
+    if url in INTERNAL_PAGE_LINKS:
+        return INTERNAL_PAGE_LINKS[url]
+    post_match = POST_LINK_PATTERN.fullmatch(url)
+    if post_match:
+        return f"/{post_match.group(1)}/"
+    return url
 
 
 def _asset_path_from_url(url: str) -> Path | None:
@@ -175,45 +202,73 @@ def _image_metadata_from_url(url: str | None) -> tuple[str | None, int | None, i
 
     mime_type, _ = mimetypes.guess_type(url)
     image_path = _asset_path_from_url(url)
-    if image_path is None or not image_path.exists():
+    if image_path is None:
         return mime_type, None, None
 
-    try:
-        with Image.open(image_path) as image:
-            width, height = image.size
-    except OSError:
+    entry = image_manifest.lookup(image_path)
+    if entry is None:
         return mime_type, None, None
+    return mime_type, entry.width, entry.height
 
-    return mime_type, width, height
 
+def image_dimensions(url: str) -> tuple[int, int] | None:
+    _, width, height = _image_metadata_from_url(url)
+    return (width, height) if width and height else None
 
-def _render_markdown(content: str) -> str:
-    cleaned = _normalize_markdown_paths(content)
-    return markdown.markdown(
-        cleaned,
-        extensions=MARKDOWN_EXTENSIONS,
+
+_markdown_engines = threading.local()
+
+
+def _build_markdown_engine() -> markdown.Markdown:
+    # Deferred so startup and management commands don't import markdown and pymdownx.
+    import markdown
+
+    from .markdown_extensions import SiteExtension
+
+    return markdown.Markdown(
+        extensions=[
+            *MARKDOWN_EXTENSIONS,
+            SiteExtension(
+                rewrite_url=_normalize_link_url,
+                section_markers=SECTION_MARKERS,
+                responsive_image=responsive_images.get,
+                image_sizes=MARKDOWN_IMAGE_SIZES,
+                image_dimensions=image_dimensions,
+            ),
+        ],
         output_format="html",
     )
 
 
-def _external_links_new_tab(html_content: str) -> str:
-    anchor_pattern = re.compile(r"<a\s+([^>]*?)href=[\"'](https?://[^\"']+)[\"']([^>]*)>", flags=re.IGNORECASE)
-
-    def replace(match: re.Match[str]) -> str:
-        before_attrs = match.group(1)
-        href = match.group(2)
-        after_attrs = match.group(3)
-        attrs = f"{before_attrs}href=\"{href}\"{after_attrs}"
+def _markdown_engine() -> markdown.Markdown:
+    # Building an engine imports and registers every extension, so each thread
+    # keeps one and resets it between documents instead.
+    engine = getattr(_markdown_engines, "engine", None)
+    if engine is None:
+        engine = _build_markdown_engine()
+        _markdown_engines.engine = engine
+    return engine
 
-        if "target=" not in attrs.lower():
-            attrs = f'{attrs} target="_blank"'
 
-        if "rel=" not in attrs.lower():
-            attrs = f'{attrs} rel="noopener noreferrer"'
+@timed("markdown")
+def _render_markdown_document(content: str) -> tuple[str, list[tuple[int, PostTocEntry]]]:
+    md = _markdown_engine()
+    started = time.perf_counter()
+    try:
+        rendered = md.convert(content)
+        headings = [
+            (section, PostTocEntry(title=title, anchor=anchor))
+            for section, anchor, title in md.site_headings
+        ]
+    finally:
+        md.reset()
+    metrics.observe("pages_markdown_render_seconds", time.perf_counter() - started)
+    return rendered, headings
 
-        return f"<a {attrs}>"
 
-    return anchor_pattern.sub(replace, html_content)
+def _render_markdown(content: str) -> str:
+    rendered, _ = _render_markdown_document(content)
+    return rendered
 
 
 def _title_from_markdown_body(body: str) -> str:
@@ -268,21 +323,6 @@ def _as_string(value: Any) -> str:
     return str(value).strip()
 
 
-def _extract_toc_entries(body_html: str) -> list[PostTocEntry]:
-    entries: list[PostTocEntry] = []
-    matches = re.findall(
-        r"<h2\s+[^>]*id=[\"']([^\"']+)[\"'][^>]*>(.*?)</h2>",
-        body_html,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
-    for anchor, title_html in matches:
-        title = _html_to_text(title_html)
-        if not title:
-            continue
-        entries.append(PostTocEntry(title=title, anchor=anchor))
-    return entries
-
-
 def _extract_cover_image(metadata: dict[str, Any], body: str) -> str | None:
     image = metadata.get("image")
     if isinstance(image, str) and image.strip():
@@ -328,18 +368,120 @@ def _html_to_text(content: str) -> str:
     return re.sub(r"\s+", " ", content).strip()
 
 
-def _estimate_reading_time_minutes(*chunks: str) -> int:
+def _estimate_reading_time_minutes(*texts: str) -> int:
     words = 0
-    for chunk in chunks:
-        plain = _html_to_text(chunk)
-        if plain:
-            words += len(plain.split())
+    for text in texts:
+        if text:
+            words += len(text.split())
     if words <= 0:
         return 1
     return max(1, ceil(words / 225))
 
 
-def load_page(page_key: str) -> PageContent:
+def _split_post_sections(body: str) -> tuple[str, str, str]:
+    has_read_more = READ_MORE_MARKER in body
+    summary_source, remainder = body.split(READ_MORE_MARKER, maxsplit=1) if has_read_more else (body, body)
+    main_body_source, footer_source = (
+        remainder.split(POST_FOOTER_MARKER, maxsplit=1)
+        if POST_FOOTER_MARKER in remainder
+        else (remainder, "")
+    )
+    return summary_source, main_body_source, footer_source
+
+
+def _strip_summary_footnote_references(summary_html: str, main_body_html: str) -> tuple[str, str]:
+    # The footnote definitions render after the read-more split, so references in the
+    # summary would point nowhere in list pages and feeds. Drop them, and the
+    # back-links to them, leaving the definitions in the main body.
+    reference_ids = FOOTNOTE_REFERENCE_PATTERN.findall(summary_html)
+    if not reference_ids:
+        return summary_html, main_body_html
+    summary_html = FOOTNOTE_REFERENCE_PATTERN.sub("", summary_html)
+    for reference_id in reference_ids:
+        main_body_html = re.sub(
+            rf'<a class="footnote-backref" href="#{re.escape(reference_id)}"[^>]*>.*?</a>', "", main_body_html
+        )
+    return summary_html, main_body_html
+
+
+def _move_footnotes_out_of_footer(main_body_html: str, footer_html: str) -> tuple[str, str]:
+    footnotes_start = footer_html.rfind(FOOTNOTES_BLOCK_START)
+    if footnotes_start == -1:
+        return main_body_html, footer_html
+    footnotes_html = footer_html[footnotes_start:]
+    footer_html = footer_html[:footnotes_start].strip()
+    return f"{main_body_html}\n{footnotes_html}", footer_html
+
+
+@dataclass
+class _RenderedPostBody:
+    summary_html: str
+    main_body_html: str
+    footer_html: str
+    body_html: str
+    toc_entries: list[PostTocEntry]
+
+
+def _render_post_body_per_section(body: str) -> _RenderedPostBody:
+    summary_source, main_body_source, footer_source = _split_post_sections(body)
+    main_body_html, main_body_headings = _render_markdown_document(main_body_source)
+    body_source = body.replace(READ_MORE_MARKER, "").replace(POST_FOOTER_MARKER, "")
+    return _RenderedPostBody(
+        summary_html=_render_markdown(summary_source),
+        main_body_html=main_body_html,
+        footer_html=_render_markdown(footer_source) if footer_source.strip() else "",
+        body_html=_render_markdown(body_source),
+        toc_entries=[entry for _, entry in main_body_headings],
+    )
+
+
+def _render_post_body(body: str) -> _RenderedPostBody:
+    has_read_more = READ_MORE_MARKER in body
+    remainder_source = body.split(READ_MORE_MARKER, maxsplit=1)[1] if has_read_more else body
+    has_footer = POST_FOOTER_MARKER in remainder_source
+    expected_markers = [
+        marker
+        for marker, present in ((READ_MORE_MARKER, has_read_more), (POST_FOOTER_MARKER, has_footer))
+        if present
+    ]
+
+    # Render once and split on the markers, which Markdown passes through as raw
+    # HTML comments. A marker that does not come through exactly once (e.g. one
+    # written inline in a paragraph) cannot be split on safely.
+    rendered, headings = _render_markdown_document(body)
+    if any(
+        rendered.count(marker) != 1 or not re.search(rf"(?m)^{re.escape(marker)}$", rendered)
+        for marker in expected_markers
+    ):
+        return _render_post_body_per_section(body)
+
+    if has_read_more:
+        summary_html, remainder_html = rendered.split(READ_MORE_MARKER, maxsplit=1)
+    else:
+        summary_html, remainder_html = rendered, rendered
+    if has_footer:
+        main_body_html, footer_html = remainder_html.split(POST_FOOTER_MARKER, maxsplit=1)
+        main_body_html, footer_html = _move_footnotes_out_of_footer(main_body_html.strip(), footer_html.strip())
+    else:
+        main_body_html, footer_html = remainder_html, ""
+
+    body_html = rendered
+    for marker in expected_markers:
+        body_html = body_html.replace(marker, "")
+    if has_read_more:
+        summary_html, main_body_html = _strip_summary_footnote_references(summary_html, main_body_html)
+    main_body_section = 1 if has_read_more else 0
+    return _RenderedPostBody(
+        summary_html=summary_html.strip(),
+        main_body_html=main_body_html.strip(),
+        footer_html=footer_html.strip(),
+        body_html=body_html,
+        toc_entries=[entry for section, entry in headings if section == main_body_section],
+    )
+
+
+@timed("content_read")
+def _read_page(page_key: str) -> PageContent:
     source_path = PAGE_MAP[page_key]
     raw = source_path.read_text(encoding="utf-8")
     metadata, body = _split_front_matter(raw)
@@ -349,6 +491,7 @@ def load_page(page_key: str) -> PageContent:
     return PageContent(title=title, html=rendered)
 
 
+@timed("post_parse")
 def _load_post(source_path: Path) -> PostContent:
     raw = source_path.read_text(encoding="utf-8")
     metadata, body = _split_front_matter(raw)
@@ -370,31 +513,12 @@ def _load_post(source_path: Path) -> PostContent:
         social_image_url or cover_image_url
     )
 
-    has_read_more = READ_MORE_MARKER in body
-    summary_source, remainder = body.split(READ_MORE_MARKER, maxsplit=1) if has_read_more else (body, body)
-    main_body_source, footer_source = (
-        remainder.split(POST_FOOTER_MARKER, maxsplit=1)
-        if POST_FOOTER_MARKER in remainder
-        else (remainder, "")
-    )
-    summary_source = _strip_cover_image_from_body(summary_source, cover_image_url)
-    main_body_source = _strip_cover_image_from_body(main_body_source, cover_image_url)
-    footer_source = _strip_cover_image_from_body(footer_source, cover_image_url)
-
-    summary_html = _render_markdown(summary_source)
-    main_body_html = _render_markdown(main_body_source)
-    footer_html = _render_markdown(footer_source) if footer_source.strip() else ""
-    body_source = _strip_cover_image_from_body(
-        body.replace(READ_MORE_MARKER, "").replace(POST_FOOTER_MARKER, ""),
-        cover_image_url,
-    )
-    body_html = _render_markdown(body_source)
+    body = _strip_cover_image_from_body(body, cover_image_url)
+    rendered_body = _render_post_body(body)
 
-    summary_html = _external_links_new_tab(summary_html)
-    main_body_html = _external_links_new_tab(main_body_html)
-    footer_html = _external_links_new_tab(footer_html)
-    body_html = _external_links_new_tab(body_html)
-    summary_text = _html_to_text(summary_html)
+    summary_text = _html_to_text(rendered_body.summary_html)
+    main_body_text = _html_to_text(rendered_body.main_body_html)
+    footer_text = _html_to_text(rendered_body.footer_html)
     seo_title = _as_string(metadata.get("seo_title")) or title
     seo_description = _as_string(metadata.get("seo_description")) or summary_text
 
@@ -408,12 +532,12 @@ def _load_post(source_path: Path) -> PostContent:
         draft=draft,
         authors=authors,
         tags=tags,
-        toc_entries=_extract_toc_entries(main_body_html),
-        reading_time_minutes=_estimate_reading_time_minutes(summary_html, main_body_html, footer_html),
-        summary_html=summary_html,
-        main_body_html=main_body_html,
-        footer_html=footer_html,
-        body_html=body_html,
+        toc_entries=rendered_body.toc_entries,
+        reading_time_minutes=_estimate_reading_time_minutes(summary_text, main_body_text, footer_text),
+        summary_html=rendered_body.summary_html,
+        main_body_html=rendered_body.main_body_html,
+        footer_html=rendered_body.footer_html,
+        body_html=rendered_body.body_html,
         cover_image_url=cover_image_url,
         social_image_url=social_image_url,
         social_image_mime_type=social_image_mime_type,
@@ -422,12 +546,13 @@ def _load_post(source_path: Path) -> PostContent:
     )
 
 
-def load_authors_index() -> dict[str, AuthorProfile]:
+@timed("content_read")
+def _read_authors_index() -> dict[str, AuthorProfile]:
     if not AUTHORS_PATH.exists():
         return {}
 
     raw = AUTHORS_PATH.read_text(encoding="utf-8")
-    parsed = yaml.safe_load(raw) or {}
+    parsed = _load_yaml(raw) or {}
     if not isinstance(parsed, dict):
         return {}
 
@@ -483,49 +608,242 @@ def _parse_cv_entry(entry: Any) -> CVEntry | None:
     )
 
 
-def load_posts(include_drafts: bool = False) -> list[PostContent]:
-    posts = [_load_post(path) for path in sorted(POSTS_DIR.glob("*.md"))]
+@dataclass
+class PostPage:
+    posts: list[PostContent]
+    newer_cursor: str | None
+    older_cursor: str | None
 
-    if not include_drafts:
-        posts = [post for post in posts if not post.draft]
 
-    posts.sort(
-        key=lambda post: (post.date or date.min, post.title.lower()),
-        reverse=True,
+@dataclass
+class PostIndex:
+    posts: list[PostContent]
+    published_posts: list[PostContent]
+    posts_by_slug: dict[str, PostContent]
+    published_posts_by_slug: dict[str, PostContent]
+    # Listings hold ascending positions into published_posts (newest first), so a page is
+    # a bisect on the cursor's position plus a slice, whatever the size of the corpus.
+    published_positions: dict[str, int]
+    published_posts_by_id: dict[int, PostContent]
+    tag_positions: dict[str, list[int]]
+    tag_names: dict[str, str]
+    year_positions: dict[int, list[int]]
+    # Filled from the snapshot, or built on first use from the published posts.
+    prebuilt_search_index: SearchIndex | None = None
+
+    @property
+    def search_index(self) -> SearchIndex:
+        if self.prebuilt_search_index is None:
+            self.prebuilt_search_index = _build_search_index(self.published_posts)
+        return self.prebuilt_search_index
+
+    @timed("search")
+    def search(self, query: str, limit: int = 20) -> list[PostContent]:
+        return [self.published_posts[position] for position, _ in self.search_index.search(query, limit)]
+
+    def page(
+        self,
+        positions: list[int],
+        *,
+        after: str | None = None,
+        before: str | None = None,
+        size: int = POSTS_PAGE_SIZE,
+    ) -> PostPage | None:
+        """Return the posts older than ``after`` or newer than ``before`` (both post slugs).
+
+        Returns ``None`` when the cursor is unknown or the page would be empty.
+        """
+
+        cursor_slug = after if after is not None else before
+        cursor = self.published_positions.get(cursor_slug) if cursor_slug is not None else None
+        if cursor_slug is not None and cursor is None:
+            return None
+        if after is not None:
+            start = bisect_right(positions, cursor)
+            end = start + size
+        elif before is not None:
+            end = bisect_left(positions, cursor)
+            start = max(0, end - size)
+        else:
+            start, end = 0, size
+
+        posts = [self.published_posts[position] for position in positions[start:end]]
+        if not posts:
+            return None
+        return PostPage(
+            posts=posts,
+            newer_cursor=posts[0].slug if start > 0 else None,
+            older_cursor=posts[-1].slug if end < len(positions) else None,
+        )
+
+
+_post_index_lock = threading.Lock()
+_post_index: PostIndex | None = None
+_post_index_signatures: dict[Path, tuple[int, int]] = {}
+_post_index_entries: dict[Path, PostContent] = {}
+_snapshot_post_index: PostIndex | None = None
+
+
+def _post_sort_key(post: PostContent) -> tuple[date, str]:
+    return (post.date or date.min, post.title.lower())
+
+
+def _scan_post_signatures() -> dict[Path, tuple[int, int]]:
+    signatures: dict[Path, tuple[int, int]] = {}
+    for path in POSTS_DIR.glob("*.md"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        signatures[path] = (stat.st_mtime_ns, stat.st_size)
+    return signatures
+
+
+def _build_search_index(published_posts: list[PostContent]) -> SearchIndex:
+    return build_search_index(
+        SearchDocument(title=post.title, tags=post.tags, body_text=_html_to_text(post.body_html))
+        for post in published_posts
     )
-    return posts
+
+
+def _build_post_index(posts: list[PostContent], search_index: SearchIndex | None = None) -> PostIndex:
+    metrics.inc("pages_post_index_builds_total")
+    posts = sorted(posts, key=_post_sort_key, reverse=True)
+    published_posts = [post for post in posts if not post.draft]
+
+    posts_by_slug: dict[str, PostContent] = {}
+    for post in posts:
+        posts_by_slug.setdefault(post.slug, post)
+    published_posts_by_slug: dict[str, PostContent] = {}
+    published_positions: dict[str, int] = {}
+    published_posts_by_id: dict[int, PostContent] = {}
+    tag_positions: dict[str, list[int]] = {}
+    tag_names: dict[str, str] = {}
+    year_positions: dict[int, list[int]] = {}
+    for position, post in enumerate(published_posts):
+        published_posts_by_slug.setdefault(post.slug, post)
+        published_positions.setdefault(post.slug, position)
+        if post.post_id is not None:
+            published_posts_by_id.setdefault(post.post_id, post)
+        for tag in post.tags:
+            tag_slug = slugify(tag)
+            if not tag_slug:
+                continue
+            tag_names.setdefault(tag_slug, tag)
+            tagged = tag_positions.setdefault(tag_slug, [])
+            if not tagged or tagged[-1] != position:
+                tagged.append(position)
+        if post.date is not None:
+            year_positions.setdefault(post.date.year, []).append(position)
+
+    return PostIndex(
+        posts=posts,
+        published_posts=published_posts,
+        posts_by_slug=posts_by_slug,
+        published_posts_by_slug=published_posts_by_slug,
+        published_positions=published_positions,
+        published_posts_by_id=published_posts_by_id,
+        tag_positions=tag_positions,
+        tag_names=tag_names,
+        year_positions=year_positions,
+        prebuilt_search_index=search_index,
+    )
+
+
+@timed("post_index")
+def get_post_index() -> PostIndex:
+    global _post_index, _post_index_signatures, _post_index_entries
+
+    if _snapshot_post_index is not None:
+        return _snapshot_post_index
+
+    signatures = _scan_post_signatures()
+    with _post_index_lock:
+        if _post_index is not None and signatures == _post_index_signatures:
+            return _post_index
+
+        entries: dict[Path, PostContent] = {}
+        for path in sorted(signatures):
+            cached = _post_index_entries.get(path)
+            if cached is not None and _post_index_signatures.get(path) == signatures[path]:
+                entries[path] = cached
+            else:
+                entries[path] = _load_post(path)
+
+        _post_index = _build_post_index(list(entries.values()))
+        _post_index_signatures = signatures
+        _post_index_entries = entries
+        return _post_index
+
+
+def clear_post_index() -> None:
+    global _post_index, _post_index_signatures, _post_index_entries
+
+    with _post_index_lock:
+        _post_index = None
+        _post_index_signatures = {}
+        _post_index_entries = {}
+
+
+def set_content_root(root: Path) -> None:
+    """Point every content path at ``root`` (``settings.CONTENT_ROOT``) and drop the post index and active snapshot."""
+
+    global CONTENT_DIR, POSTS_DIR, CV_PATH, CONFIG_DIR, AUTHORS_PATH, SITE_CONFIG_PATH, POSTS_CONFIG_PATH
+
+    CONTENT_DIR = Path(root)
+    POSTS_DIR = CONTENT_DIR / "posts"
+    CV_PATH = CONTENT_DIR / "cv.md"
+    CONFIG_DIR = CONTENT_DIR / "config"
+    AUTHORS_PATH = CONFIG_DIR / "authors.yaml"
+    SITE_CONFIG_PATH = CONFIG_DIR / "site_config.yaml"
+    POSTS_CONFIG_PATH = CONFIG_DIR / "featured_post.yaml"
+    # Updated in place: management commands import PAGE_MAP by name.
+    PAGE_MAP.clear()
+    PAGE_MAP["publications"] = CONTENT_DIR / "publications.md"
+    # A snapshot was compiled from the old root, so it can't answer for the new one.
+    set_content_snapshot(None)
+    clear_post_index()
+
+
+def load_posts(include_drafts: bool = False) -> list[PostContent]:
+    index = get_post_index()
+    posts = index.posts if include_drafts else index.published_posts
+    return list(posts)
 
 
 def get_post(slug: str, include_drafts: bool = False) -> PostContent | None:
-    for post in load_posts(include_drafts=include_drafts):
-        if post.slug == slug:
-            return post
-    return None
+    index = get_post_index()
+    if include_drafts:
+        return index.posts_by_slug.get(slug)
+    return index.published_posts_by_slug.get(slug)
 
 
-def load_site_config() -> dict[str, Any]:
+@timed("content_read")
+def _read_site_config() -> dict[str, Any]:
     if not SITE_CONFIG_PATH.exists():
         return {}
 
     raw = SITE_CONFIG_PATH.read_text(encoding="utf-8")
-    parsed = yaml.safe_load(raw) or {}
+    parsed = _load_yaml(raw) or {}
     if isinstance(parsed, dict):
         return parsed
     return {}
 
 
-def load_posts_config() -> dict[str, Any]:
+@timed("content_read")
+def _read_posts_config() -> dict[str, Any]:
     if not POSTS_CONFIG_PATH.exists():
         return {}
 
     raw = POSTS_CONFIG_PATH.read_text(encoding="utf-8")
-    parsed = yaml.safe_load(raw) or {}
+    parsed = _load_yaml(raw) or {}
     if isinstance(parsed, dict):
         return parsed
     return {}
 
 
-def load_cv() -> CVContent:
+@timed("content_read")
+def _read_cv() -> CVContent:
     if not CV_PATH.exists():
         return CVContent(
             title="Curriculum Vitae",
@@ -587,3 +905,98 @@ def load_cv() -> CVContent:
         education_entries=education_entries,
         key_skills=key_skills,
     )
+
+
+@dataclass
+class ContentSnapshot:
+    source_digest: str
+    posts: list[PostContent]
+    pages: dict[str, PageContent]
+    cv: CVContent
+    authors: dict[str, AuthorProfile]
+    site_config: dict[str, Any]
+    posts_config: dict[str, Any]
+    search_index: SearchIndex | None = None
+
+
+_active_snapshot: ContentSnapshot | None = None
+
+
+def content_source_digest() -> str:
+    digest = sha256()
+    for path in sorted(path for path in CONTENT_DIR.rglob("*") if path.is_file()):
+        data = path.read_bytes()
+        relative_name = path.relative_to(CONTENT_DIR).as_posix().encode("utf-8")
+        digest.update(len(relative_name).to_bytes(8, "big"))
+        digest.update(relative_name)
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def _load_posts_in_parallel(paths: list[Path], workers: int) -> list[PostContent]:
+    workers = min(workers, len(paths))
+    if workers <= 1:
+        return [_load_post(path) for path in paths]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_load_post, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+
+def compile_content_snapshot(workers: int = 1) -> ContentSnapshot:
+    source_digest = content_source_digest()
+    posts = _load_posts_in_parallel(sorted(POSTS_DIR.glob("*.md")), workers)
+    index = _build_post_index(posts)
+    return ContentSnapshot(
+        source_digest=source_digest,
+        posts=index.posts,
+        pages={page_key: _read_page(page_key) for page_key in PAGE_MAP},
+        cv=_read_cv(),
+        authors=_read_authors_index(),
+        site_config=_read_site_config(),
+        posts_config=_read_posts_config(),
+        search_index=index.search_index,
+    )
+
+
+def get_content_snapshot() -> ContentSnapshot | None:
+    return _active_snapshot
+
+
+def set_content_snapshot(snapshot: ContentSnapshot | None) -> None:
+    global _active_snapshot, _snapshot_post_index
+
+    _active_snapshot = snapshot
+    _snapshot_post_index = _build_post_index(snapshot.posts, snapshot.search_index) if snapshot is not None else None
+
+
+def load_page(page_key: str) -> PageContent:
+    if _active_snapshot is not None:
+        return _active_snapshot.pages[page_key]
+    return _read_page(page_key)
+
+
+def load_authors_index() -> dict[str, AuthorProfile]:
+    if _active_snapshot is not None:
+        return _active_snapshot.authors
+    return _read_authors_index()
+
+
+def load_site_config() -> dict[str, Any]:
+    if _active_snapshot is not None:
+        return _active_snapshot.site_config
+    return _read_site_config()
+
+
+def load_posts_config() -> dict[str, Any]:
+    if _active_snapshot is not None:
+        return _active_snapshot.posts_config
+    return _read_posts_config()
+
+
+def load_cv() -> CVContent:
+    if _active_snapshot is not None:
+        return _active_snapshot.cv
+    return _read_cv()
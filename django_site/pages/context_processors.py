@@ -1,5 +1,7 @@
 from django.conf import settings
 
+from .assets import ASSET_BUNDLES, bundle_paths
+
 
 def seo(request):
     site_url = getattr(settings, "SITE_URL", "").strip().rstrip("/")
@@ -21,3 +23,7 @@ def seo(request):
         "seo_default_image_url": default_image_url,
         "site_default_cover_path": default_image_path,
     }
+
+
+def site_assets(request):
+    return {"site_assets": {name: bundle_paths(name) for name in ASSET_BUNDLES}}
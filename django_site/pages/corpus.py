@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+import random
+import shutil
+
+from . import content
+
+CORPUS_START_DATE = date(2026, 3, 1)
+CORPUS_DRAFT_EVERY = 20
+CORPUS_AUTHORS = ("sam", "dan-joyce")
+CORPUS_CATEGORIES = (
+    "Announcement",
+    "Opinion",
+    "Original research",
+    "Statistics",
+    "Public health",
+    "Machine learning",
+    "Open data",
+)
+CORPUS_IMAGES = (
+    "assets/images/rethinking_significance.webp",
+    "assets/images/gorton_denton.png",
+    "assets/images/paper-almost-significant.png",
+    "assets/images/missing_content.jpeg",
+)
+CORPUS_WORDS = (
+    "analysis baseline bias calibration cohort confidence coroner data dataset deaths decision "
+    "effect error estimate evidence exposure framework harm hospital inference interval language "
+    "learning measure model monitoring outcome patient policy practice prediction prevention "
+    "probability record report review risk safety sample signal standard study survey system "
+    "threshold toolkit trial uncertainty validation variance"
+).split()
+CORPUS_ADMONITIONS = ("note", "tip", "warning", "info")
+
+
+def _sentence(rng: random.Random, low: int = 8, high: int = 20) -> str:
+    words = rng.choices(CORPUS_WORDS, k=rng.randint(low, high))
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, low: int = 3, high: int = 6) -> str:
+    return " ".join(_sentence(rng) for _ in range(rng.randint(low, high)))
+
+
+def _title(rng: random.Random) -> str:
+    return _sentence(rng, 4, 9).rstrip(".")
+
+
+def _front_matter(number: int, slug: str, title: str, summary: str, rng: random.Random) -> str:
+    authors = CORPUS_AUTHORS[:1] if number % 3 else CORPUS_AUTHORS
+    categories = rng.sample(CORPUS_CATEGORIES, k=rng.randint(1, 3))
+    image = CORPUS_IMAGES[number % len(CORPUS_IMAGES)]
+    lines = [
+        "---",
+        f"draft: {'true' if number % CORPUS_DRAFT_EVERY == CORPUS_DRAFT_EVERY - 1 else 'false'}",
+        f"id: {number + 1}",
+        f"title: {title}",
+        f"seo_title: {title}",
+        f"seo_description: {summary[:150].rstrip()}",
+        f"slug: {slug}",
+        "authors:",
+        *(f"  - {author}" for author in authors),
+        f"date: {(CORPUS_START_DATE - timedelta(days=number)).isoformat()}",
+        "categories:",
+        *(f"  - {category}" for category in categories),
+    ]
+    # Spread the three ways a cover image is declared: front matter, og:image, first body image.
+    if number % 3 == 0:
+        lines.append(f"image: {image}")
+    lines += ["meta:", "  - property: og:image", f"    content: {image if number % 3 == 1 else ''}"]
+    lines.append("---")
+    return "\n".join(lines)
+
+
+def _body(number: int, summary: str, rng: random.Random) -> str:
+    image = CORPUS_IMAGES[(number + 1) % len(CORPUS_IMAGES)]
+    admonition = CORPUS_ADMONITIONS[number % len(CORPUS_ADMONITIONS)]
+    footnotes = rng.randint(1, 3)
+    sections = [
+        summary,
+        f'![{_title(rng)}](../{image}){{ width="600" }}',
+        "<!-- more -->",
+    ]
+    for section in range(rng.randint(2, 4)):
+        sections += [
+            f"## {_title(rng)}",
+            *(_paragraph(rng) for _ in range(rng.randint(1, 3))),
+        ]
+        if section < footnotes:
+            sections[-1] += f"[^{section + 1}]"
+    sections += [
+        f'!!! {admonition} "{_title(rng)}"\n\n    {_paragraph(rng, 1, 3)}',
+        f"### {_title(rng)}",
+        '=== "Python"\n\n    ```python\n    rate = deaths / exposure\n    print(round(rate, 3))\n    ```',
+        '=== "R"\n\n    ```r\n    rate <- deaths / exposure\n    round(rate, 3)\n    ```',
+        _paragraph(rng),
+        "<!-- post-footer -->",
+        _paragraph(rng, 1, 2),
+        *(f"[^{note + 1}]: {_sentence(rng)}" for note in range(footnotes)),
+    ]
+    return "\n\n".join(sections)
+
+
+def generate_post(number: int, rng: random.Random) -> tuple[str, str]:
+    slug = f"generated-post-{number:05d}"
+    title = _title(rng)
+    summary = _paragraph(rng, 2, 4)
+    return slug, f"{_front_matter(number, slug, title, summary, rng)}\n\n{_body(number, summary, rng)}\n"
+
+
+def write_corpus(root: Path, posts: int, *, seed: int = 0, source_root: Path | None = None) -> list[str]:
+    """Write a content root with ``posts`` generated posts next to a copy of the real CV, pages and config.
+
+    Output is deterministic for a given ``seed``. Every 20th post is a draft. Returns the
+    slugs of the published posts, newest first.
+    """
+
+    source_root = Path(source_root or content.CONTENT_DIR)
+    root = Path(root)
+    posts_dir = root / "posts"
+    posts_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copytree(source_root / "config", root / "config", dirs_exist_ok=True)
+    for page in ("cv.md", *(path.name for path in content.PAGE_MAP.values())):
+        if (source_root / page).is_file():
+            shutil.copy2(source_root / page, root / page)
+
+    rng = random.Random(seed)
+    published = []
+    for number in range(posts):
+        slug, text = generate_post(number, rng)
+        (posts_dir / f"{slug}.md").write_text(text, encoding="utf-8")
+        if number % CORPUS_DRAFT_EVERY != CORPUS_DRAFT_EVERY - 1:
+            published.append(slug)
+    return published
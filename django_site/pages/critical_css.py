@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Elements of <body>, in document order, treated as the first screen of a page.
+ABOVE_THE_FOLD_ELEMENTS = 120
+MANIFEST_FORMAT_VERSION = 1
+GROUPING_AT_RULES = ("@media", "@supports", "@container", "@layer")
+
+_PSEUDO = re.compile(r"::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?")
+_ATTRIBUTE = re.compile(r"\[\s*([\w-]+)[^\]]*\]")
+_SIMPLE_SELECTOR = re.compile(r"([.#]?)(-?[_a-zA-Z][\w-]*|\*)")
+_SCRIPT_CLASS = re.compile(r"""classList\.(?:add|toggle)\(\s*["']([\w-]+)["']""")
+_KEYFRAMES_NAME = re.compile(r"@(?:-webkit-)?keyframes\s+([\w-]+)")
+
+
+@dataclass
+class UsedSelectors:
+    tags: set[str] = field(default_factory=lambda: {"html", "body"})
+    classes: set[str] = field(default_factory=set)
+    ids: set[str] = field(default_factory=set)
+    attributes: set[str] = field(default_factory=set)
+
+    def update(self, other: UsedSelectors) -> None:
+        self.tags |= other.tags
+        self.classes |= other.classes
+        self.ids |= other.ids
+        self.attributes |= other.attributes
+
+
+class _AboveTheFoldParser(HTMLParser):
+    def __init__(self, limit: int):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.seen = 0
+        self.in_body = False
+        self.used = UsedSelectors()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            self.in_body = True
+        if not self.in_body or self.seen >= self.limit:
+            return
+        self.seen += 1
+        self.used.tags.add(tag)
+        for name, value in attrs:
+            self.used.attributes.add(name)
+            if name == "class" and value:
+                self.used.classes.update(value.split())
+            elif name == "id" and value:
+                self.used.ids.add(value)
+
+
+def above_the_fold(html: str, limit: int = ABOVE_THE_FOLD_ELEMENTS) -> UsedSelectors:
+    """Tags, classes, ids and attributes of the first ``limit`` elements of the page body."""
+
+    parser = _AboveTheFoldParser(limit)
+    parser.feed(html)
+    parser.close()
+    return parser.used
+
+
+def script_classes(script: str) -> set[str]:
+    """Class names the site script adds to elements, such as reveal and open states."""
+
+    return set(_SCRIPT_CLASS.findall(script))
+
+
+@dataclass
+class _CssRule:
+    prelude: str
+    body: str = ""
+    children: list[_CssRule] | None = None
+
+    def text(self) -> str:
+        if self.children is not None:
+            return f"{self.prelude}{{{''.join(child.text() for child in self.children)}}}"
+        if not self.body and self.prelude.startswith("@") and not self.prelude.startswith("@font-face"):
+            return f"{self.prelude};"
+        return f"{self.prelude}{{{self.body}}}"
+
+
+def _skip_string(css: str, index: int) -> int:
+    quote = css[index]
+    index += 1
+    while index < len(css) and css[index] != quote:
+        index += 2 if css[index] == "\\" else 1
+    return index + 1
+
+
+def _parse_rules(css: str) -> list[_CssRule]:
+    """Split comment-free CSS into rules, recursing into grouping at-rules such as ``@media``."""
+
+    rules: list[_CssRule] = []
+    index = start = 0
+    while index < len(css):
+        char = css[index]
+        if char in "'\"":
+            index = _skip_string(css, index)
+        elif char == ";":
+            # A statement at-rule such as @import or @charset.
+            if css[start:index].strip():
+                rules.append(_CssRule(css[start:index].strip()))
+            index = start = index + 1
+        elif char == "{":
+            prelude = css[start:index].strip()
+            depth, body_start = 1, index + 1
+            index += 1
+            while index < len(css) and depth:
+                if css[index] in "'\"":
+                    index = _skip_string(css, index)
+                    continue
+                depth += {"{": 1, "}": -1}.get(css[index], 0)
+                index += 1
+            body = css[body_start : index - 1]
+            if prelude.lower().startswith(GROUPING_AT_RULES):
+                rules.append(_CssRule(prelude, children=_parse_rules(body)))
+            else:
+                rules.append(_CssRule(prelude, body.strip()))
+            start = index
+        else:
+            index += 1
+    return rules
+
+
+def _selector_matches(selector: str, used: UsedSelectors) -> bool:
+    # Pseudo-classes, including :not() and :is() arguments, are ignored, which only ever keeps extra rules.
+    selector = _PSEUDO.sub(" ", selector)
+    for attribute in _ATTRIBUTE.findall(selector):
+        if attribute.lower() not in used.attributes:
+            return False
+    selector = _ATTRIBUTE.sub(" ", selector)
+    for prefix, name in _SIMPLE_SELECTOR.findall(selector):
+        if prefix == ".":
+            present = name in used.classes
+        elif prefix == "#":
+            present = name in used.ids
+        else:
+            present = name == "*" or name.lower() in used.tags
+        if not present:
+            return False
+    return True
+
+
+def _split_selectors(prelude: str) -> list[str]:
+    selectors, depth, start = [], 0, 0
+    for index, char in enumerate(prelude):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            selectors.append(prelude[start:index])
+            start = index + 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def _select(rules: list[_CssRule], used: UsedSelectors) -> list[_CssRule]:
+    selected = []
+    for rule in rules:
+        if rule.children is not None:
+            children = _select(rule.children, used)
+            if children:
+                selected.append(_CssRule(rule.prelude, children=children))
+        elif rule.prelude.startswith("@"):
+            # @font-face, @import and friends apply page-wide; @keyframes are kept only if used.
+            selected.append(rule)
+        elif any(_selector_matches(selector, used) for selector in _split_selectors(rule.prelude)):
+            selected.append(rule)
+    return selected
+
+
+def extract_critical_css(css: str, used: UsedSelectors) -> str:
+    """Keep the rules of ``css`` (minified, comment-free) that can apply to the ``used`` markup, in source order."""
+
+    selected = _select(_parse_rules(css), used)
+    rule_text = "".join(rule.text() for rule in selected if not _KEYFRAMES_NAME.match(rule.prelude))
+    critical = "".join(
+        rule.text()
+        for rule in selected
+        if not (match := _KEYFRAMES_NAME.match(rule.prelude)) or re.search(rf"\b{re.escape(match.group(1))}\b", rule_text)
+    )
+    if "</style" in critical.lower():
+        raise ValueError("Critical CSS cannot contain '</style'.")
+    return critical
+
+
+class CriticalCssManifest:
+    """Inline critical CSS keyed by template name."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.styles: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: Path | None) -> None:
+        self.path = path
+        styles = self._read_styles(path) if path is not None else {}
+        with self._lock:
+            self.styles = styles
+
+    def get(self, template_name: str | None) -> str | None:
+        return self.styles.get(template_name) if template_name else None
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            document = {"format_version": MANIFEST_FORMAT_VERSION, "styles": dict(sorted(self.styles.items()))}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handle, temp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as temp_file:
+                json.dump(document, temp_file, indent=2)
+                temp_file.write("\n")
+            os.chmod(temp_name, 0o644)
+            os.replace(temp_name, self.path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _read_styles(path: Path) -> dict[str, str]:
+        try:
+            document = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable critical CSS manifest %s.", path)
+            return {}
+
+        if not isinstance(document, dict) or document.get("format_version") != MANIFEST_FORMAT_VERSION:
+            return {}
+        styles = document.get("styles")
+        if not isinstance(styles, dict):
+            return {}
+        return {name: css for name, css in styles.items() if isinstance(name, str) and isinstance(css, str)}
+
+
+critical_styles = CriticalCssManifest()
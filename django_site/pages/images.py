@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+import json
+import logging
+import mimetypes
+import os
+from pathlib import Path
+import re
+import tempfile
+import threading
+
+from .timing import timed
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+IMAGE_SUFFIXES = {".avif", ".gif", ".jpeg", ".jpg", ".png", ".svg", ".webp"}
+# Version 2 added SVG dimensions, so older manifests are re-probed.
+MANIFEST_FORMAT_VERSION = 2
+SVG_ROOT_PATTERN = re.compile(r"<svg\b[^>]*>", re.IGNORECASE)
+SVG_ATTRIBUTE_PATTERN = re.compile(r'([\w:-]+)\s*=\s*["\']([^"\']*)["\']')
+SVG_LENGTH_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(?:px)?")
+
+
+@dataclass
+class ImageManifestEntry:
+    size: int
+    mtime_ns: int
+    mime_type: str | None
+    width: int | None
+    height: int | None
+
+
+def _manifest_key(image_path: Path) -> str:
+    resolved = image_path.resolve()
+    try:
+        return resolved.relative_to(STATIC_DIR).as_posix()
+    except ValueError:
+        return str(resolved)
+
+
+def _source_path(key: str) -> Path:
+    # The inverse of _manifest_key: absolute keys are images outside the static directory.
+    path = Path(key)
+    return path if path.is_absolute() else STATIC_DIR / path
+
+
+def _svg_size(image_path: Path) -> tuple[int | None, int | None]:
+    try:
+        with image_path.open(encoding="utf-8", errors="replace") as svg_file:
+            root_tag = SVG_ROOT_PATTERN.search(svg_file.read(4096))
+    except OSError:
+        return None, None
+    if root_tag is None:
+        return None, None
+
+    attributes = dict(SVG_ATTRIBUTE_PATTERN.findall(root_tag.group()))
+    width, height = (SVG_LENGTH_PATTERN.fullmatch(attributes.get(name, "").strip()) for name in ("width", "height"))
+    if width and height:
+        return round(float(width.group(1))), round(float(height.group(1)))
+    view_box = attributes.get("viewBox", "").replace(",", " ").split()
+    try:
+        return round(float(view_box[2])), round(float(view_box[3]))
+    except (IndexError, ValueError):
+        return None, None
+
+
+@timed("image_probe")
+def _probe_image(image_path: Path, stat: os.stat_result) -> ImageManifestEntry:
+    from PIL import Image
+
+    mime_type, _ = mimetypes.guess_type(image_path.name)
+    width = height = None
+    if image_path.suffix.lower() == ".svg":
+        width, height = _svg_size(image_path)
+    else:
+        try:
+            # Image.open only parses the header; pixel data is never decoded here.
+            with Image.open(image_path) as image:
+                width, height = image.size
+        except OSError:
+            pass
+    return ImageManifestEntry(
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        mime_type=mime_type,
+        width=width,
+        height=height,
+    )
+
+
+class ImageManifest:
+    """Image dimensions keyed by static path, revalidated against file size and mtime."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.entries: dict[str, ImageManifestEntry] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: Path | None) -> None:
+        self.path = path
+        entries = self._read_entries(path) if path is not None else {}
+        with self._lock:
+            self.entries = entries
+
+    def lookup(self, image_path: Path) -> ImageManifestEntry | None:
+        try:
+            stat = image_path.stat()
+        except OSError:
+            return None
+
+        key = _manifest_key(image_path)
+        entry = self.entries.get(key)
+        if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+            return entry
+
+        entry = _probe_image(image_path, stat)
+        with self._lock:
+            self.entries[key] = entry
+        self._save_quietly()
+        return entry
+
+    def refresh(self, root: Path = STATIC_DIR) -> int:
+        probed = 0
+        entries: dict[str, ImageManifestEntry] = {}
+        for image_path in sorted(root.rglob("*")):
+            if image_path.suffix.lower() not in IMAGE_SUFFIXES or not image_path.is_file():
+                continue
+            stat = image_path.stat()
+            key = _manifest_key(image_path)
+            entry = self.entries.get(key)
+            if entry is None or entry.size != stat.st_size or entry.mtime_ns != stat.st_mtime_ns:
+                entry = _probe_image(image_path, stat)
+                probed += 1
+            entries[key] = entry
+        with self._lock:
+            self.entries = entries
+        return probed
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            # Entries on disk may come from other processes; those whose image is gone are pruned.
+            entries = {
+                key: entry
+                for key, entry in {**self._read_entries(self.path), **self.entries}.items()
+                if _source_path(key).is_file()
+            }
+            document = {
+                "format_version": MANIFEST_FORMAT_VERSION,
+                "images": {key: asdict(entry) for key, entry in sorted(entries.items())},
+            }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handle, temp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as temp_file:
+                json.dump(document, temp_file, indent=2)
+                temp_file.write("\n")
+            os.chmod(temp_name, 0o644)
+            os.replace(temp_name, self.path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+    def _save_quietly(self) -> None:
+        try:
+            self.save()
+        except OSError:
+            logger.warning("Could not write image manifest %s.", self.path, exc_info=True)
+
+    @staticmethod
+    def _read_entries(path: Path) -> dict[str, ImageManifestEntry]:
+        try:
+            document = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable image manifest %s.", path)
+            return {}
+
+        if not isinstance(document, dict) or document.get("format_version") != MANIFEST_FORMAT_VERSION:
+            return {}
+        images = document.get("images")
+        if not isinstance(images, dict):
+            return {}
+
+        entries: dict[str, ImageManifestEntry] = {}
+        for key, value in images.items():
+            try:
+                entries[key] = ImageManifestEntry(**value)
+            except TypeError:
+                continue
+        return entries
+
+
+image_manifest = ImageManifest()
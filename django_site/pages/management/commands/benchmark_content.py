@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.benchmarks import DEFAULT_SIZES, compare, results_document, run_suite
+
+
+class Command(BaseCommand):
+    help = "Time the content pipeline and the home, post and sitemap views on synthetic corpora."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=list(DEFAULT_SIZES),
+            help="Corpus sizes (number of posts) to benchmark.",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Timed warm runs per benchmark.")
+        parser.add_argument(
+            "--cold-repeat",
+            type=int,
+            default=1,
+            help="Timed cold runs per benchmark. Each one re-renders the whole corpus.",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=None,
+            help="Results file. Defaults to build/benchmarks/<commit>.json.",
+        )
+        parser.add_argument(
+            "--compare",
+            type=Path,
+            default=None,
+            help="Earlier results file to compare medians against.",
+        )
+
+    def handle(self, *args, **options):
+        if any(size < 1 for size in options["sizes"]):
+            raise CommandError("--sizes must be positive.")
+        if options["repeat"] < 1 or options["cold_repeat"] < 1:
+            raise CommandError("--repeat and --cold-repeat must be at least 1.")
+        baseline = None
+        if options["compare"] is not None:
+            try:
+                baseline = json.loads(options["compare"].read_text(encoding="utf-8"))
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not read {options['compare']}: {exc}") from exc
+
+        def report(result):
+            self.stdout.write(
+                f"{result.name:<20} {result.size:>6} {result.mode:<4} "
+                f"median {result.median_ms:9.2f} ms  min {min(result.runs_ms):9.2f} ms"
+            )
+
+        results = run_suite(
+            tuple(options["sizes"]),
+            repeat=options["repeat"],
+            cold_repeat=options["cold_repeat"],
+            progress=report,
+        )
+        document = results_document(results, repeat=options["repeat"], cold_repeat=options["cold_repeat"])
+
+        output_path = options["output"] or (
+            Path(settings.BASE_DIR) / "build" / "benchmarks" / f"{document['commit'] or 'results'}.json"
+        )
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {output_path}."))
+
+        if baseline is not None:
+            self.stdout.write(f"\nCompared with {baseline.get('commit') or options['compare']} (median ms):")
+            for name, size, mode, before, after, change in compare(baseline, document):
+                self.stdout.write(f"{name:<20} {size:>6} {mode:<4} {before:9.2f} -> {after:9.2f}  {change:+7.1%}")
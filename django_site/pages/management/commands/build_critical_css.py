@@ -0,0 +1,75 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils.text import slugify
+
+from pages.assets import ASSET_BUNDLES, bundle_text
+from pages.content import get_post_index
+from pages.critical_css import UsedSelectors, above_the_fold, critical_styles, extract_critical_css, script_classes
+
+
+def sample_pages() -> list[tuple[str, str]]:
+    """One or more ``(template, path)`` pairs for every page template, rendered to find the first screen's markup."""
+
+    pages = [
+        ("pages/home.html", reverse("home")),
+        ("pages/about_showcase.html", reverse("about")),
+        ("pages/cv.html", reverse("cv")),
+        ("pages/page.html", reverse("publications")),
+        ("pages/search.html", f"{reverse('search')}?q=data"),
+    ]
+    posts = get_post_index().published_posts
+    if posts:
+        newest = posts[0]
+        pages.append(("pages/post_detail.html", reverse("post-detail", kwargs={"slug": newest.slug})))
+        if newest.date:
+            pages.append(("pages/post_list.html", reverse("archive-year", kwargs={"year": newest.date.year})))
+        if newest.tags:
+            pages.append(("pages/post_list.html", reverse("tag-posts", kwargs={"tag": slugify(newest.tags[0])})))
+    return pages
+
+
+class Command(BaseCommand):
+    help = "Work out the CSS each page template needs for its first screen, for inlining into <head>."
+
+    def handle(self, *args, **options):
+        manifest_path = getattr(settings, "CRITICAL_CSS_MANIFEST_PATH", None)
+        if not manifest_path:
+            raise CommandError("Set CRITICAL_CSS_MANIFEST_PATH.")
+
+        try:
+            css = bundle_text(ASSET_BUNDLES["css"])
+            script_state = set()
+            for source in ASSET_BUNDLES["js"].sources:
+                script_state |= script_classes(Path(finders.find(source)).read_text(encoding="utf-8"))
+        except (OSError, TypeError) as exc:
+            raise CommandError(f"Could not read the site assets: {exc}") from exc
+
+        used_by_template: dict[str, UsedSelectors] = {}
+        client = Client()
+        with override_settings(
+            ALLOWED_HOSTS=["testserver"],
+            PAGE_CACHE_ENABLED=False,
+            SECURE_SSL_REDIRECT=False,
+            REDIRECT_WWW_TO_APEX=False,
+        ):
+            for template_name, path in sample_pages():
+                response = client.get(path)
+                if response.status_code != 200:
+                    raise CommandError(f"GET {path} returned {response.status_code}.")
+                used = used_by_template.setdefault(template_name, UsedSelectors())
+                used.update(above_the_fold(response.content.decode("utf-8")))
+
+        critical_styles.load(Path(manifest_path))
+        styles = {}
+        for template_name, used in used_by_template.items():
+            used.classes |= script_state
+            styles[template_name] = extract_critical_css(css, used)
+            self.stdout.write(f"{template_name}: {len(styles[template_name])} of {len(css)} bytes")
+        critical_styles.styles = styles
+        critical_styles.save()
+        self.stdout.write(self.style.SUCCESS(f"Wrote critical CSS for {len(styles)} templates to {manifest_path}."))
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.images import image_manifest
+
+
+class Command(BaseCommand):
+    help = "Record the type and dimensions of every static image so pages never probe them at request time."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=None,
+            help="Manifest path. Defaults to settings.IMAGE_MANIFEST_PATH.",
+        )
+
+    def handle(self, *args, **options):
+        output_path = options["output"] or getattr(settings, "IMAGE_MANIFEST_PATH", None)
+        if not output_path:
+            raise CommandError("Pass --output or set IMAGE_MANIFEST_PATH.")
+
+        image_manifest.load(Path(output_path))
+        probed = image_manifest.refresh()
+        image_manifest.save()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(image_manifest.entries)} images to {output_path} ({probed} probed)."
+            )
+        )
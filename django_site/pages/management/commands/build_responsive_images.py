@@ -0,0 +1,55 @@
+from pathlib import Path
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.content import load_authors_index, load_cv, load_page, load_posts, PAGE_MAP
+from pages.images import STATIC_DIR
+from pages.responsive_images import DERIVATIVE_SOURCE_SUFFIXES, build_derivatives, responsive_images
+
+TEMPLATES_DIR = Path(__file__).resolve().parents[2] / "templates"
+IMAGE_SRC_PATTERN = re.compile(r'<img\b[^>]*?\bsrc="(/static/[^"{}]+)"', flags=re.DOTALL)
+
+
+def _referenced_image_urls() -> set[str]:
+    urls: set[str] = set()
+    for post in load_posts(include_drafts=True):
+        if post.cover_image_url:
+            urls.add(post.cover_image_url)
+        urls.update(IMAGE_SRC_PATTERN.findall(post.body_html))
+    for page_key in PAGE_MAP:
+        urls.update(IMAGE_SRC_PATTERN.findall(load_page(page_key).html))
+    urls.update(IMAGE_SRC_PATTERN.findall(load_cv().intro_html))
+    for author in load_authors_index().values():
+        if author.avatar_url:
+            urls.add(author.avatar_url)
+    for template_path in TEMPLATES_DIR.rglob("*.html"):
+        urls.update(IMAGE_SRC_PATTERN.findall(template_path.read_text(encoding="utf-8")))
+    return {url for url in urls if url.startswith("/static/")}
+
+
+class Command(BaseCommand):
+    help = "Generate WebP (and AVIF, when Pillow supports it) derivatives for images used by posts, authors and templates."
+
+    def handle(self, *args, **options):
+        manifest_path = getattr(settings, "RESPONSIVE_IMAGES_MANIFEST_PATH", None)
+        output_dir = getattr(settings, "RESPONSIVE_IMAGES_DIR", None)
+        if not (manifest_path and output_dir):
+            raise CommandError("Set RESPONSIVE_IMAGES_DIR and RESPONSIVE_IMAGES_MANIFEST_PATH.")
+
+        responsive_images.load(Path(manifest_path))
+        built = {}
+        for url in sorted(_referenced_image_urls()):
+            source_path = STATIC_DIR / url.removeprefix("/static/")
+            if source_path.suffix.lower() not in DERIVATIVE_SOURCE_SUFFIXES:
+                continue
+            if not source_path.is_file():
+                self.stderr.write(f"Skipping {url}: file not found.")
+                continue
+            built[url] = build_derivatives(source_path, url, Path(output_dir))
+            self.stdout.write(f"{url}: {', '.join(str(width) for _, width in built[url].sources[0].srcset)}")
+
+        responsive_images.images = built
+        responsive_images.save()
+        self.stdout.write(self.style.SUCCESS(f"Wrote derivatives for {len(built)} images to {output_dir}."))
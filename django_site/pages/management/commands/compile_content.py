@@ -0,0 +1,46 @@
+import os
+from pathlib import Path
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.content import compile_content_snapshot
+from pages.snapshot import write_snapshot
+
+
+class Command(BaseCommand):
+    help = "Compile posts, pages, the CV and site config into a snapshot that is loaded at startup."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=None,
+            help="Snapshot path. Defaults to settings.CONTENT_SNAPSHOT_PATH.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processes used to render posts. Use 1 to render in-process.",
+        )
+
+    def handle(self, *args, **options):
+        output_path = options["output"] or getattr(settings, "CONTENT_SNAPSHOT_PATH", None)
+        if not output_path:
+            raise CommandError("Pass --output or set CONTENT_SNAPSHOT_PATH.")
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        started = time.perf_counter()
+        snapshot = compile_content_snapshot(workers=options["workers"])
+        header = write_snapshot(snapshot, Path(output_path))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compiled {len(snapshot.posts)} posts into {output_path} "
+                f"({header['length']} bytes, sha256 {header['sha256'][:12]}) in {elapsed:.2f}s."
+            )
+        )
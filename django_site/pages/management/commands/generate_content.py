@@ -0,0 +1,37 @@
+from pathlib import Path
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.corpus import write_corpus
+
+
+class Command(BaseCommand):
+    help = "Write a content root with N generated posts for scale and load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("posts", type=int, help="Number of posts to generate.")
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=None,
+            help="Content root to create. Defaults to a new temporary directory.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the generated text.")
+
+    def handle(self, *args, **options):
+        if options["posts"] < 1:
+            raise CommandError("posts must be at least 1.")
+        output = options["output"]
+        if output is None:
+            output = Path(tempfile.mkdtemp(prefix="content-corpus-"))
+        elif (output / "posts").exists() and any((output / "posts").iterdir()):
+            raise CommandError(f"{output / 'posts'} already has posts; pick an empty content root.")
+
+        published = write_corpus(output, options["posts"], seed=options["seed"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {options['posts']} posts ({len(published)} published) to {output}. "
+                f"Serve them with CONTENT_ROOT={output}."
+            )
+        )
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.outbox import get_outbox
+
+
+class Command(BaseCommand):
+    help = "Send queued contact-form email, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain whatever is due and exit instead of polling.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=10.0,
+            help="Seconds between polls when running continuously.",
+        )
+
+    def handle(self, *args, **options):
+        if options["interval"] <= 0:
+            raise CommandError("--interval must be positive.")
+
+        outbox = get_outbox()
+        while True:
+            result = outbox.drain()
+            if result.sent or result.retried or result.failed:
+                self.stdout.write(
+                    f"Sent {result.sent}, will retry {result.retried}, gave up on {result.failed}; "
+                    f"{outbox.pending_count()} pending."
+                )
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.assets import STATIC_SOURCE_DIR, VENDORED_ASSETS, vendor_asset
+
+
+class Command(BaseCommand):
+    help = "Download the third-party CSS, JS and fonts the site serves from its own static files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Download every file again, not only the missing ones (e.g. after bumping a pinned version).",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=STATIC_SOURCE_DIR,
+            help="Static files directory to write into. Defaults to the pages app's static directory.",
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options["output"]
+        fetched = 0
+        for asset in VENDORED_ASSETS:
+            if not options["refresh"] and (output_dir / asset.path).is_file():
+                continue
+            try:
+                paths = vendor_asset(asset, output_dir)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not vendor {asset.url}: {exc}") from exc
+            fetched += 1
+            self.stdout.write(f"{asset.path}: {len(paths)} files from {asset.url}")
+        self.stdout.write(self.style.SUCCESS(f"Vendored {fetched} of {len(VENDORED_ASSETS)} assets into {output_dir}."))
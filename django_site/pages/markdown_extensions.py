@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import re
+import xml.etree.ElementTree as etree
+
+from markdown import Markdown
+from markdown.extensions import Extension
+from markdown.postprocessors import Postprocessor
+from markdown.treeprocessors import Treeprocessor
+from markdown.util import HTML_PLACEHOLDER_RE
+
+
+EXTERNAL_LINK_PREFIXES = ("http://", "https://")
+EXTERNAL_LINK_TARGET = "_blank"
+EXTERNAL_LINK_REL = "noopener noreferrer"
+IMAGE_LOADING_ATTRIBUTES = (("loading", "lazy"), ("decoding", "async"))
+
+_RAW_ANCHOR = re.compile(r"<a\b([^>]*)>", re.IGNORECASE)
+_RAW_EXTERNAL_HREF = re.compile(r"""\bhref\s*=\s*["']?\s*https?://""", re.IGNORECASE)
+_RAW_TARGET = re.compile(r"\btarget\s*=", re.IGNORECASE)
+_RAW_REL = re.compile(r"\brel\s*=", re.IGNORECASE)
+
+
+def _pixels(value: str | None) -> int | None:
+    value = (value or "").strip().removesuffix("px")
+    return int(value) if value.isdigit() and int(value) > 0 else None
+
+
+class SiteTreeprocessor(Treeprocessor):
+    """Rewrite links and images and collect section headings in one tree walk."""
+
+    def __init__(self, md: Markdown, extension: SiteExtension):
+        super().__init__(md)
+        self.extension = extension
+
+    def run(self, root: etree.Element) -> None:
+        section = 0
+        images: list[etree.Element] = []
+        for child in root:
+            if self._is_section_marker(child):
+                section += 1
+                continue
+            for element in child.iter():
+                if element.tag == "a":
+                    self._rewrite_anchor(element)
+                elif element.tag == "img":
+                    self._rewrite_image(element)
+                    images.append(element)
+                elif element.tag == "h2" and element.get("id"):
+                    self._collect_heading(element, section)
+
+        if images:
+            parents = {element: parent for parent in root.iter() for element in parent}
+            for image in images:
+                self._add_responsive_sources(image, parents[image])
+
+    def _is_section_marker(self, element: etree.Element) -> bool:
+        if element.tag != "p" or len(element) or not element.text:
+            return False
+        match = HTML_PLACEHOLDER_RE.fullmatch(element.text.strip())
+        if match is None:
+            return False
+        raw_blocks = self.md.htmlStash.rawHtmlBlocks
+        index = int(match.group(1))
+        if index >= len(raw_blocks):
+            return False
+        raw_html = raw_blocks[index]
+        return isinstance(raw_html, str) and raw_html.strip() in self.extension.getConfig("section_markers")
+
+    def _rewrite_anchor(self, element: etree.Element) -> None:
+        href = element.get("href")
+        if href is None:
+            return
+        href = self.extension.getConfig("rewrite_url")(href)
+        element.set("href", href)
+        if not href.lower().startswith(EXTERNAL_LINK_PREFIXES):
+            return
+        if element.get("target") is None:
+            element.set("target", EXTERNAL_LINK_TARGET)
+        if element.get("rel") is None:
+            element.set("rel", EXTERNAL_LINK_REL)
+
+    def _rewrite_image(self, element: etree.Element) -> None:
+        src = element.get("src")
+        if src is not None:
+            src = self.extension.getConfig("rewrite_url")(src)
+            element.set("src", src)
+            self._set_dimensions(element, src)
+        # Body images sit below the cover, so none of them should hold up first paint.
+        for name, value in IMAGE_LOADING_ATTRIBUTES:
+            if element.get(name) is None:
+                element.set(name, value)
+
+    def _set_dimensions(self, element: etree.Element, src: str) -> None:
+        if element.get("width") and element.get("height"):
+            return
+        dimensions = self.extension.getConfig("image_dimensions")(src)
+        if dimensions is None:
+            return
+        width, height = dimensions
+        # An author-set width or height keeps the image's aspect ratio for the other one.
+        if (set_width := _pixels(element.get("width"))) is not None:
+            width, height = set_width, max(1, round(height * set_width / width))
+        elif (set_height := _pixels(element.get("height"))) is not None:
+            width, height = max(1, round(width * set_height / height)), set_height
+        element.set("width", str(width))
+        element.set("height", str(height))
+
+    def _add_responsive_sources(self, image: etree.Element, parent: etree.Element) -> None:
+        if image.get("srcset") or parent.tag == "picture":
+            return
+        derivatives = self.extension.getConfig("responsive_image")(image.get("src", ""))
+        if derivatives is None or not derivatives.sources:
+            return
+
+        picture = etree.Element("picture")
+        for source in derivatives.sources:
+            etree.SubElement(
+                picture,
+                "source",
+                {
+                    "type": source.mime_type,
+                    "srcset": source.srcset_attribute,
+                    "sizes": self.extension.getConfig("image_sizes"),
+                },
+            )
+        index = list(parent).index(image)
+        parent.remove(image)
+        picture.tail, image.tail = image.tail, None
+        picture.append(image)
+        parent.insert(index, picture)
+
+    def _collect_heading(self, element: etree.Element, section: int) -> None:
+        text = "".join(element.itertext())
+        text = HTML_PLACEHOLDER_RE.sub("", text)
+        title = " ".join(text.split())
+        if title:
+            self.md.site_headings.append((section, element.get("id"), title))
+
+
+def _add_external_link_attributes(match: re.Match[str]) -> str:
+    attributes = match.group(1)
+    if not _RAW_EXTERNAL_HREF.search(attributes):
+        return match.group(0)
+    trailing_slash = attributes.endswith("/")
+    attributes = attributes.removesuffix("/").rstrip()
+    if not _RAW_TARGET.search(attributes):
+        attributes += f' target="{EXTERNAL_LINK_TARGET}"'
+    if not _RAW_REL.search(attributes):
+        attributes += f' rel="{EXTERNAL_LINK_REL}"'
+    return f"<a{attributes}{' /' if trailing_slash else ''}>"
+
+
+class RawHtmlLinkPostprocessor(Postprocessor):
+    """Give external anchors in raw HTML the ``target``/``rel`` that the tree walk gives Markdown links.
+
+    Raw HTML sits in the stash rather than the element tree. This runs before the stash is
+    put back into the output, so it only sees raw HTML and never code blocks.
+    """
+
+    def run(self, text: str) -> str:
+        raw_blocks = self.md.htmlStash.rawHtmlBlocks
+        for index, raw_html in enumerate(raw_blocks):
+            if isinstance(raw_html, str) and "<a" in raw_html.lower():
+                raw_blocks[index] = _RAW_ANCHOR.sub(_add_external_link_attributes, raw_html)
+        return text
+
+
+class SiteExtension(Extension):
+    """Site-specific link and image rewriting and heading collection.
+
+    Images get ``width``/``height`` from ``image_dimensions`` and lazy, async loading.
+
+    After conversion, ``md.site_headings`` holds ``(section, anchor, title)`` for each
+    ``h2`` with an id, where ``section`` counts the ``section_markers`` seen before it.
+    """
+
+    def __init__(self, **kwargs):
+        self.config = {
+            "rewrite_url": [lambda url: url, "Callable applied to every link href and image src."],
+            "section_markers": [(), "Standalone raw HTML blocks that start a new section."],
+            "responsive_image": [
+                lambda src: None,
+                "Callable returning generated derivatives (with .sources) for an image src, or None.",
+            ],
+            "image_sizes": ["100vw", "sizes attribute emitted with responsive image sources."],
+            "image_dimensions": [
+                lambda src: None,
+                "Callable returning the intrinsic (width, height) of an image src, or None.",
+            ],
+        }
+        super().__init__(**kwargs)
+
+    def extendMarkdown(self, md: Markdown) -> None:
+        md.registerExtension(self)
+        self.md = md
+        self.reset()
+        # Runs after toc (5) has assigned heading ids and caption-auto (4) has built figures.
+        md.treeprocessors.register(SiteTreeprocessor(md, self), "site", 3)
+        # Ahead of raw_html (30), which replaces the stash placeholders.
+        md.postprocessors.register(RawHtmlLinkPostprocessor(md), "site_raw_links", 35)
+
+    def reset(self) -> None:
+        self.md.site_headings = []
+
+
+def makeExtension(**kwargs) -> SiteExtension:
+    return SiteExtension(**kwargs)
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import atexit
+from collections import defaultdict
+from dataclasses import dataclass
+import logging
+import os
+from pathlib import Path
+import re
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .local_sqlite import LocalSQLite
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# A background thread in each worker adds its counts to the shared file this often; /metrics flushes its own first.
+DEFAULT_FLUSH_SECONDS = 5.0
+# Views whose latency is recorded, by view function name.
+LATENCY_VIEWS = frozenset({"home", "post_detail", "sitemap_xml"})
+VIEW_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+MARKDOWN_RENDER_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5)
+
+_LE_LABEL = re.compile(r'(?:^|,)le="([^"]*)"')
+
+
+@dataclass(frozen=True)
+class MetricFamily:
+    name: str
+    kind: str
+    help: str
+    buckets: tuple[float, ...] = ()
+
+
+METRIC_FAMILIES = {
+    family.name: family
+    for family in (
+        MetricFamily(
+            "pages_view_latency_seconds",
+            "histogram",
+            "Time from the metrics middleware to the response, by view.",
+            VIEW_LATENCY_BUCKETS,
+        ),
+        MetricFamily(
+            "pages_markdown_render_seconds",
+            "histogram",
+            "Markdown documents rendered and the time each took.",
+            MARKDOWN_RENDER_BUCKETS,
+        ),
+        MetricFamily("pages_post_index_builds_total", "counter", "Post index builds, from disk or a content snapshot."),
+        MetricFamily("pages_page_cache_lookups_total", "counter", "Page cache lookups, by result."),
+        MetricFamily("pages_contact_blocks_total", "counter", "Contact form submissions blocked, by reason."),
+    )
+}
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels: dict[str, str]) -> str:
+    return ",".join(f'{name}="{_escape_label_value(str(value))}"' for name, value in sorted(labels.items()))
+
+
+def _bucket_bound(value: float) -> str:
+    return f"{value:g}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """Counters kept in memory per process and added to a SQLite file shared by every worker on the host.
+
+    Histograms are stored the Prometheus way, as cumulative ``_bucket`` counters plus ``_sum``
+    and ``_count``, so the totals of all workers are plain sums.
+    """
+
+    def __init__(self, path: Path, flush_seconds: float = DEFAULT_FLUSH_SECONDS):
+        self.database = LocalSQLite(
+            path,
+            schema=(
+                "CREATE TABLE IF NOT EXISTS metric_samples ("
+                "name TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL, PRIMARY KEY (name, labels))",
+            ),
+        )
+        self.flush_seconds = flush_seconds
+        self._pending: defaultdict[tuple[str, str], float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._flusher: _MetricsFlusher | None = None
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        self._add({(name, _label_text(labels)): amount})
+
+    def observe(self, family_name: str, value: float, **labels: str) -> None:
+        family = METRIC_FAMILIES[family_name]
+        label_text = _label_text(labels)
+        prefix = f"{label_text}," if label_text else ""
+        samples = {
+            (f"{family_name}_bucket", f'{prefix}le="{_bucket_bound(bound)}"'): 1 if value <= bound else 0
+            for bound in family.buckets
+        }
+        samples[(f"{family_name}_bucket", f'{prefix}le="+Inf"')] = 1
+        samples[(f"{family_name}_sum", label_text)] = value
+        samples[(f"{family_name}_count", label_text)] = 1
+        self._add(samples)
+
+    def _add(self, samples: dict[tuple[str, str], float]) -> None:
+        # Memory only: requests, including ones on an ASGI event loop, never wait for SQLite.
+        with self._lock:
+            for key, amount in samples.items():
+                self._pending[key] += amount
+
+    def start_flusher(self) -> None:
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = _MetricsFlusher(self)
+            self._flusher.start()
+
+    def stop_flusher(self) -> None:
+        if self._flusher is not None:
+            self._flusher.stopped.set()
+            self._flusher = None
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+        if not pending:
+            return
+        try:
+            with self.database.immediate() as connection:
+                connection.executemany(
+                    "INSERT INTO metric_samples (name, labels, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value",
+                    [(name, labels, value) for (name, labels), value in pending.items()],
+                )
+        except Exception:
+            # Keep the counts for the next attempt.
+            logger.exception("Could not write metrics to %s.", self.database.path)
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] += amount
+
+    def after_fork_in_child(self) -> None:
+        # The parent writes its own pending counts, and its flusher thread (which may have held
+        # the lock mid-fork) does not exist here, so start afresh.
+        self._lock = threading.Lock()
+        self._pending = defaultdict(float)
+        self._flusher = None
+        self.start_flusher()
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        self.flush()
+        return self.database.connection().execute("SELECT name, labels, value FROM metric_samples").fetchall()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending = defaultdict(float)
+        self.database.connection().execute("DELETE FROM metric_samples")
+
+
+class _MetricsFlusher(threading.Thread):
+    def __init__(self, registry: MetricsRegistry):
+        super().__init__(name="pages-metrics-flusher", daemon=True)
+        self.registry = registry
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.registry.flush_seconds):
+            self.registry.flush()
+
+
+def _sample_sort_key(sample: tuple[str, str, float]) -> tuple:
+    name, labels, _ = sample
+    le = _LE_LABEL.search(labels)
+    if le is None:
+        return (name, labels, 0.0)
+    bound = float("inf") if le.group(1) == "+Inf" else float(le.group(1))
+    return (name, _LE_LABEL.sub("", labels), bound)
+
+
+def _family_of(sample_name: str) -> str | None:
+    if sample_name in METRIC_FAMILIES:
+        return sample_name
+    base, _, suffix = sample_name.rpartition("_")
+    family = METRIC_FAMILIES.get(base)
+    if family is not None and family.kind == "histogram" and suffix in {"bucket", "sum", "count"}:
+        return base
+    return None
+
+
+def render_prometheus(samples: list[tuple[str, str, float]]) -> str:
+    """The Prometheus text exposition of ``samples``, grouped by metric family."""
+
+    by_family: defaultdict[str, list[tuple[str, str, float]]] = defaultdict(list)
+    for sample in samples:
+        family_name = _family_of(sample[0])
+        if family_name is not None:
+            by_family[family_name].append(sample)
+
+    lines = []
+    for family in METRIC_FAMILIES.values():
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        for name, labels, value in sorted(by_family[family.name], key=_sample_sort_key):
+            sample = f"{name}{{{labels}}}" if labels else name
+            lines.append(f"{sample} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+_registry_lock = threading.Lock()
+_registry: MetricsRegistry | None = None
+
+
+def get_metrics() -> MetricsRegistry | None:
+    """This process's registry, or ``None`` while ``METRICS_ENABLED`` is off."""
+    global _registry
+
+    if not getattr(settings, "METRICS_ENABLED", False):
+        return None
+    path = Path(settings.METRICS_DB_PATH)
+    registry = _registry
+    if registry is not None and registry.database.path == path:
+        return registry
+    with _registry_lock:
+        if _registry is None or _registry.database.path != path:
+            if _registry is not None:
+                _registry.stop_flusher()
+            _registry = MetricsRegistry(path, getattr(settings, "METRICS_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS))
+            _registry.start_flusher()
+        return _registry
+
+
+def inc(name: str, amount: float = 1, **labels: str) -> None:
+    registry = get_metrics()
+    if registry is not None:
+        registry.inc(name, amount, **labels)
+
+
+def observe(family_name: str, value: float, **labels: str) -> None:
+    registry = get_metrics()
+    if registry is not None:
+        registry.observe(family_name, value, **labels)
+
+
+def _flush_before_fork() -> None:
+    registry = _registry
+    if registry is not None:
+        registry.flush()
+
+
+def _reset_after_fork() -> None:
+    registry = _registry
+    if registry is not None:
+        registry.after_fork_in_child()
+
+
+# Warm-up runs in the gunicorn master, so its counts are written once before the workers fork.
+os.register_at_fork(before=_flush_before_fork, after_in_child=_reset_after_fork)
+atexit.register(_flush_before_fork)
+
+
+class MetricsMiddleware:
+    """Record the latency of ``LATENCY_VIEWS`` responses. Installed only when ``METRICS_ENABLED`` is set."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._record(request, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def _record(request, seconds: float) -> None:
+        match = getattr(request, "resolver_match", None)
+        view_name = getattr(match.func, "__name__", None) if match is not None else None
+        if view_name in LATENCY_VIEWS:
+            observe("pages_view_latency_seconds", seconds, view=view_name)
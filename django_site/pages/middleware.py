@@ -1,14 +1,30 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
 from django.http import HttpResponsePermanentRedirect
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
 
 
 class CanonicalHostRedirectMiddleware:
     """Redirect www host to canonical apex host for SEO consistency."""
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._redirect_to_canonical_host(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self._redirect_to_canonical_host(request) or await self.get_response(request)
+
+    @staticmethod
+    def _redirect_to_canonical_host(request):
         if getattr(settings, "REDIRECT_WWW_TO_APEX", False):
             canonical_host = getattr(settings, "CANONICAL_HOST", "").strip().lower()
             request_host = request.get_host().split(":", 1)[0].strip().lower()
@@ -23,4 +39,30 @@ class CanonicalHostRedirectMiddleware:
                 destination = f"{scheme}://{canonical_host}{request.get_full_path()}"
                 return HttpResponsePermanentRedirect(destination)
 
-        return self.get_response(request)
+        return None
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """WhiteNoise that also runs natively under ASGI instead of forcing a sync thread per request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from .local_sqlite import LocalSQLite
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 20
+OUTBOX_CLAIM_SECONDS = 300
+OUTBOX_RETRY_BASE_SECONDS = 30
+OUTBOX_RETRY_MAX_SECONDS = 3600
+OUTBOX_MAX_ATTEMPTS = 8
+
+
+@dataclass
+class DrainResult:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+def _retry_delay(attempts: int) -> float:
+    return min(OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1), OUTBOX_RETRY_MAX_SECONDS)
+
+
+def _serialize_message(message: EmailMessage) -> str:
+    return json.dumps(
+        {
+            "subject": message.subject,
+            "body": message.body,
+            "from_email": message.from_email,
+            "to": list(message.to),
+            "reply_to": list(message.reply_to),
+        }
+    )
+
+
+def _deserialize_message(payload: str, connection) -> EmailMessage:
+    return EmailMessage(connection=connection, **json.loads(payload))
+
+
+class EmailOutbox:
+    """Spool of outgoing email in a SQLite file, drained with retry and exponential backoff."""
+
+    def __init__(self, path: Path):
+        self.database = LocalSQLite(
+            path,
+            schema=(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "message TEXT NOT NULL, "
+                "status TEXT NOT NULL DEFAULT 'pending', "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "next_attempt_at REAL NOT NULL, "
+                "claimed_until REAL NOT NULL DEFAULT 0, "
+                "last_error TEXT NOT NULL DEFAULT '', "
+                "created_at REAL NOT NULL)",
+                "CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)",
+            ),
+        )
+
+    def enqueue(self, message: EmailMessage) -> int:
+        now = time.time()
+        with self.database.immediate() as connection:
+            cursor = connection.execute(
+                "INSERT INTO outbox (message, next_attempt_at, created_at) VALUES (?, ?, ?)",
+                (_serialize_message(message), now, now),
+            )
+        return cursor.lastrowid
+
+    def pending_count(self) -> int:
+        row = self.database.connection().execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()
+        return row[0]
+
+    def failed_count(self) -> int:
+        row = self.database.connection().execute("SELECT COUNT(*) FROM outbox WHERE status = 'failed'").fetchone()
+        return row[0]
+
+    def drain(self, limit: int = OUTBOX_BATCH_SIZE) -> DrainResult:
+        result = DrainResult()
+        claimed = self._claim_due(limit)
+        if not claimed:
+            return result
+
+        # One SMTP connection (handshake, TLS, auth) is reused for the whole batch.
+        connection = get_connection(fail_silently=False)
+        try:
+            for message_id, payload, attempts in claimed:
+                try:
+                    # No-op while the connection is open; reconnects after a failed send closed it.
+                    connection.open()
+                    _deserialize_message(payload, connection).send(fail_silently=False)
+                except Exception as exc:
+                    if self._record_failure(message_id, attempts + 1, exc):
+                        result.failed += 1
+                    else:
+                        result.retried += 1
+                    connection.close()
+                    continue
+                self._record_sent(message_id)
+                result.sent += 1
+        finally:
+            connection.close()
+        return result
+
+    def _claim_due(self, limit: int) -> list[tuple[int, str, int]]:
+        now = time.time()
+        with self.database.immediate() as connection:
+            rows = connection.execute(
+                "SELECT id, message, attempts FROM outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? AND claimed_until <= ? "
+                "ORDER BY id LIMIT ?",
+                (now, now, limit),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE outbox SET claimed_until = ? WHERE id = ?",
+                [(now + OUTBOX_CLAIM_SECONDS, row[0]) for row in rows],
+            )
+        return rows
+
+    def _record_sent(self, message_id: int) -> None:
+        with self.database.immediate() as connection:
+            connection.execute("DELETE FROM outbox WHERE id = ?", (message_id,))
+
+    def _record_failure(self, message_id: int, attempts: int, exc: Exception) -> bool:
+        failed = attempts >= OUTBOX_MAX_ATTEMPTS
+        if failed:
+            logger.error("Giving up on outbox message %s after %s attempts: %s", message_id, attempts, exc)
+        else:
+            logger.warning("Outbox message %s failed (attempt %s), will retry: %s", message_id, attempts, exc)
+        with self.database.immediate() as connection:
+            connection.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, claimed_until = 0, last_error = ? "
+                "WHERE id = ?",
+                (
+                    "failed" if failed else "pending",
+                    attempts,
+                    time.time() + _retry_delay(attempts),
+                    str(exc)[:500],
+                    message_id,
+                ),
+            )
+        return failed
+
+
+class OutboxSender(threading.Thread):
+    """Daemon thread that drains the outbox when woken and on a fixed poll interval."""
+
+    def __init__(self, outbox: EmailOutbox, poll_seconds: float):
+        super().__init__(name="pages-outbox-sender", daemon=True)
+        self.outbox = outbox
+        self.poll_seconds = poll_seconds
+        self.wake = threading.Event()
+
+    def run(self) -> None:
+        # Drain once on start, so mail queued before a restart doesn't wait for the next submission.
+        while True:
+            try:
+                self.outbox.drain()
+            except Exception:
+                logger.exception("Outbox drain failed.")
+            self.wake.wait(self.poll_seconds)
+            self.wake.clear()
+
+
+_outbox_lock = threading.Lock()
+_outbox: EmailOutbox | None = None
+_sender: OutboxSender | None = None
+_sender_pid: int | None = None
+_fork_hook_registered = False
+
+
+def get_outbox() -> EmailOutbox:
+    global _outbox
+
+    path = Path(settings.CONTACT_OUTBOX_DB_PATH)
+    with _outbox_lock:
+        if _outbox is None or _outbox.database.path != path:
+            _outbox = EmailOutbox(path)
+        return _outbox
+
+
+def start_sender() -> OutboxSender | None:
+    """Start this process's sender thread if it isn't running yet; a new thread drains straight away."""
+    global _sender, _sender_pid
+
+    if not getattr(settings, "CONTACT_OUTBOX_SENDER_THREAD", True):
+        return None
+    outbox = get_outbox()
+    with _outbox_lock:
+        if _sender is None or _sender_pid != os.getpid() or _sender.outbox is not outbox:
+            _sender = OutboxSender(outbox, poll_seconds=getattr(settings, "CONTACT_OUTBOX_POLL_SECONDS", 60))
+            _sender_pid = os.getpid()
+            _sender.start()
+        return _sender
+
+
+def start_sender_in_server_processes() -> None:
+    """Start the sender in this process and again in every process forked from it.
+
+    Called when the WSGI/ASGI app is created. Under gunicorn ``--preload`` that is the
+    master, whose threads don't survive the fork, so each worker starts its own as it
+    is forked. Claims keep the master's sender and the workers' from sending a message twice.
+    """
+    global _fork_hook_registered
+
+    if not _fork_hook_registered:
+        os.register_at_fork(after_in_child=_start_sender_after_fork)
+        _fork_hook_registered = True
+    start_sender()
+
+
+def _start_sender_after_fork() -> None:
+    global _outbox_lock
+
+    # Another thread of the parent may have held the lock when it forked.
+    _outbox_lock = threading.Lock()
+    try:
+        start_sender()
+    except Exception:
+        logger.exception("Could not start the outbox sender after fork.")
+
+
+def wake_sender() -> None:
+    """Start this process's sender thread if needed and ask it to drain now."""
+
+    sender = start_sender()
+    if sender is not None:
+        sender.wake.set()
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import partial, wraps
+import gzip
+from hashlib import sha256
+from pathlib import Path
+import threading
+import time
+from typing import Callable
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, urlencode
+
+from . import content, metrics
+from .timing import current_timing, timed
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+PAGE_CACHE_KEY_PREFIX = "page"
+# The only query parameters views read (cursor pagination and search). Any other
+# parameter, such as a campaign tag, is left out of the key so it can't add entries.
+CACHE_KEY_QUERY_PARAMS = ("after", "before", "q")
+DEFAULT_CACHE_CONTROL = "no-cache"
+# Pages with per-request fields carry fresh form tokens, so browsers must fetch them in full every time.
+PER_REQUEST_CACHE_CONTROL = "private, no-cache"
+# Bodies smaller than this gain little from compression and are always sent as is.
+COMPRESS_MIN_SIZE = 512
+# Preferred first when the client accepts several at the same quality.
+COMPRESSED_ENCODINGS = ("br", "gzip")
+GZIP_LEVEL = 9
+PER_REQUEST_GZIP_LEVEL = 6
+BROTLI_QUALITY = 11
+
+
+@dataclass
+class ContentVersion:
+    fingerprint: str
+    last_modified: int
+
+
+@dataclass
+class CachedPage:
+    content: bytes
+    content_type: str
+    etag: str
+    last_modified: int
+    # Compressed copies of ``content`` by content coding, made once when the page is stored.
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+
+_content_version_lock = threading.Lock()
+_content_version: ContentVersion | None = None
+_content_version_checked_at = 0.0
+
+
+def _version_sources() -> list[Path]:
+    sources = [content.CONTENT_DIR, TEMPLATES_DIR]
+    for manifest_setting in ("RESPONSIVE_IMAGES_MANIFEST_PATH", "CRITICAL_CSS_MANIFEST_PATH"):
+        manifest = getattr(settings, manifest_setting, None)
+        if manifest:
+            sources.append(Path(manifest))
+    # Built bundles and the hashed static names change the asset URLs pages link to.
+    asset_build_dir = getattr(settings, "ASSET_BUILD_DIR", None)
+    if asset_build_dir:
+        sources.append(Path(asset_build_dir))
+    if settings.STATIC_ROOT:
+        sources.append(Path(settings.STATIC_ROOT) / "staticfiles.json")
+    return sources
+
+
+def _scan_content_version() -> ContentVersion:
+    digest = sha256()
+    newest_mtime_ns = 0
+    for source in _version_sources():
+        paths = sorted(source.rglob("*")) if source.is_dir() else [source]
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if not path.is_file():
+                continue
+            digest.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode("utf-8"))
+            newest_mtime_ns = max(newest_mtime_ns, stat.st_mtime_ns)
+
+    snapshot = content.get_content_snapshot()
+    if snapshot is not None:
+        digest.update(f"snapshot\0{snapshot.source_digest}\n".encode("utf-8"))
+    return ContentVersion(fingerprint=digest.hexdigest()[:20], last_modified=newest_mtime_ns // 1_000_000_000)
+
+
+def get_content_version() -> ContentVersion:
+    global _content_version, _content_version_checked_at
+
+    ttl = getattr(settings, "PAGE_CACHE_VERSION_TTL", 1.0)
+    now = time.monotonic()
+    version = _content_version
+    if version is not None and now - _content_version_checked_at < ttl:
+        return version
+
+    with _content_version_lock:
+        if _content_version is None or now - _content_version_checked_at >= ttl:
+            _content_version = _scan_content_version()
+            _content_version_checked_at = now
+        return _content_version
+
+
+def content_version_is_current() -> bool:
+    """Whether ``get_content_version`` would answer from memory rather than rescanning."""
+
+    ttl = getattr(settings, "PAGE_CACHE_VERSION_TTL", 1.0)
+    return _content_version is not None and time.monotonic() - _content_version_checked_at < ttl
+
+
+def clear_content_version() -> None:
+    global _content_version, _content_version_checked_at
+    with _content_version_lock:
+        _content_version = None
+        _content_version_checked_at = 0.0
+
+
+def _page_cache():
+    return caches[getattr(settings, "PAGE_CACHE_ALIAS", "default")]
+
+
+def _cache_key(request, version: ContentVersion) -> str:
+    # Host and scheme are part of the key because canonical and social URLs fall back to them.
+    origin = f"{request.scheme}://{request.get_host()}"
+    query = urlencode(
+        [(name, value) for name in CACHE_KEY_QUERY_PARAMS for value in request.GET.getlist(name)]
+    )
+    path_digest = sha256(f"{origin}{request.path}?{query}".encode("utf-8")).hexdigest()[:32]
+    return f"{PAGE_CACHE_KEY_PREFIX}:{version.fingerprint}:{path_digest}"
+
+
+def _is_cacheable(request, response) -> bool:
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    if response.has_header("Cache-Control") or response.has_header("Vary"):
+        return False
+    session = getattr(request, "session", None)
+    if session is not None and session.accessed:
+        return False
+    return not request.META.get("CSRF_COOKIE_NEEDS_UPDATE") and not request.META.get("CSRF_COOKIE_USED")
+
+
+def _fill_per_request_fields(request, response, per_request_fields: dict[str, Callable]):
+    if not per_request_fields or response.status_code != 200 or response.streaming:
+        return response
+    body = response.content
+    for placeholder, value_for_request in per_request_fields.items():
+        placeholder_bytes = placeholder.encode("utf-8")
+        if placeholder_bytes in body:
+            body = body.replace(placeholder_bytes, str(value_for_request(request)).encode("utf-8"))
+    response.content = body
+    return response
+
+
+def _is_compressible(content_type: str, body: bytes) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return len(body) >= COMPRESS_MIN_SIZE and (media_type.startswith("text/") or media_type.endswith("xml"))
+
+
+@timed("compress")
+def _compress_variants(body: bytes) -> dict[str, bytes]:
+    variants = {"gzip": gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        variants["br"] = brotli.compress(body, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+    # A variant that is not smaller is not worth a Content-Encoding header.
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+
+
+def _negotiate_encoding(request, available) -> str | None:
+    """Pick the best of ``available`` content codings for the request's Accept-Encoding, or ``None`` for identity."""
+
+    header = request.headers.get("Accept-Encoding", "")
+    qualities = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in COMPRESSED_ENCODINGS:
+        if coding not in available:
+            continue
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def _encoded_etag(etag: str, encoding: str | None) -> str:
+    # Each coding is a different representation, so it gets its own validator.
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def _response_from_cache(request, page: CachedPage, per_request_fields: dict[str, Callable]) -> HttpResponse:
+    if page.encoded:
+        encoding = _negotiate_encoding(request, page.encoded)
+    elif per_request_fields and _is_compressible(page.content_type, page.content):
+        # The filled body differs per request, so it is compressed per response with a faster gzip level.
+        encoding = _negotiate_encoding(request, ("gzip",))
+    else:
+        encoding = None
+
+    response = HttpResponse(page.content, content_type=page.content_type)
+    if page.encoded or per_request_fields:
+        response["Vary"] = "Accept-Encoding"
+    if per_request_fields:
+        # No validators: a 304 would let the browser reuse a copy holding expired tokens.
+        response["Cache-Control"] = PER_REQUEST_CACHE_CONTROL
+    else:
+        etag = _encoded_etag(page.etag, encoding)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(page.last_modified)
+        response["Cache-Control"] = getattr(settings, "PAGE_CACHE_CONTROL", DEFAULT_CACHE_CONTROL)
+        conditional_response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=page.last_modified,
+            response=response,
+        )
+        if conditional_response is not response:
+            return conditional_response
+
+    response = _fill_per_request_fields(request, response, per_request_fields)
+    if encoding is not None:
+        if encoding in page.encoded:
+            response.content = page.encoded[encoding]
+        else:
+            response.content = gzip.compress(response.content, compresslevel=PER_REQUEST_GZIP_LEVEL, mtime=0)
+        response["Content-Encoding"] = encoding
+    response["Content-Length"] = str(len(response.content))
+    if request.method == "HEAD":
+        response.content = b""
+    return response
+
+
+def cache_page_by_content_version(
+    view=None,
+    *,
+    per_request_fields: dict[str, Callable] | None = None,
+    bypass_with_session: bool = False,
+):
+    """Serve GET/HEAD responses from a cache keyed by URL and the current content version.
+
+    Only the ``CACHE_KEY_QUERY_PARAMS`` of the query string are part of the key.
+
+    ``per_request_fields`` maps placeholder strings the view renders (for example in
+    place of a CSRF token) to callables that produce the real value for each request.
+    Pages with such fields are sent with ``Cache-Control: private, no-cache`` and no
+    ``ETag`` or ``Last-Modified``, so they are never answered with a 304. With
+    ``bypass_with_session``, requests that carry a session cookie always reach the view. A ``Last-Modified``
+    header set by the view replaces the content version's timestamp.
+
+    Text bodies are compressed with gzip and, when ``brotli`` is installed, brotli
+    once at store time and chosen by ``Accept-Encoding``; pages with per-request
+    fields are gzipped after filling instead.
+    """
+
+    if view is None:
+        return partial(
+            cache_page_by_content_version,
+            per_request_fields=per_request_fields,
+            bypass_with_session=bypass_with_session,
+        )
+    per_request_fields = per_request_fields or {}
+
+    def bypasses_cache(request) -> bool:
+        return (
+            not getattr(settings, "PAGE_CACHE_ENABLED", True)
+            or request.method not in {"GET", "HEAD"}
+            or (bypass_with_session and settings.SESSION_COOKIE_NAME in request.COOKIES)
+        )
+
+    def lookup(request) -> tuple[str, ContentVersion, CachedPage | None]:
+        timing = current_timing()
+        started = time.perf_counter() if timing is not None else 0.0
+        version = get_content_version()
+        key = _cache_key(request, version)
+        page = _page_cache().get(key)
+        result = "miss" if page is None else "hit"
+        if timing is not None:
+            timing.record("page_cache", (time.perf_counter() - started) * 1000, result)
+        metrics.inc("pages_page_cache_lookups_total", result=result)
+        return key, version, page
+
+    def store(request, response, key: str, version: ContentVersion) -> CachedPage | None:
+        if not _is_cacheable(request, response):
+            return None
+        etag = f'"{sha256(response.content).hexdigest()[:32]}"'
+        content_type = response["Content-Type"]
+        page = CachedPage(
+            content=response.content,
+            content_type=content_type,
+            etag=etag,
+            last_modified=parse_http_date_safe(response.get("Last-Modified", "")) or version.last_modified,
+            encoded=(
+                _compress_variants(response.content)
+                if not per_request_fields and _is_compressible(content_type, response.content)
+                else {}
+            ),
+        )
+        _page_cache().set(key, page, timeout=None)
+        return page
+
+    if iscoroutinefunction(view):
+        # The page cache is in-process memory, so the async path reads it directly
+        # instead of hopping to a thread for each lookup; only a version rescan does.
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if bypasses_cache(request):
+                return _fill_per_request_fields(request, await view(request, *args, **kwargs), per_request_fields)
+
+            if not content_version_is_current():
+                # The rescan walks and stats the content tree, so it runs off the event loop.
+                await sync_to_async(get_content_version, thread_sensitive=False)()
+            key, version, page = lookup(request)
+            if page is None:
+                response = await view(request, *args, **kwargs)
+                page = store(request, response, key, version)
+                if page is None:
+                    return _fill_per_request_fields(request, response, per_request_fields)
+            return _response_from_cache(request, page, per_request_fields)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if bypasses_cache(request):
+            return _fill_per_request_fields(request, view(request, *args, **kwargs), per_request_fields)
+
+        key, version, page = lookup(request)
+        if page is None:
+            response = view(request, *args, **kwargs)
+            page = store(request, response, key, version)
+            if page is None:
+                return _fill_per_request_fields(request, response, per_request_fields)
+        return _response_from_cache(request, page, per_request_fields)
+
+    return wrapper
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from pathlib import Path
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from .local_sqlite import LocalSQLite
+
+DEFAULT_RATE_LIMIT_BACKEND = "pages.rate_limit.SQLiteRateLimiter"
+CACHE_KEY_PREFIX = "rate_limit"
+CACHE_GENERATION_KEY = f"{CACHE_KEY_PREFIX}:generation"
+# How often the SQLite limiter sweeps hits left by keys that never came back.
+SQLITE_SWEEP_INTERVAL_SECONDS = 300
+
+
+class RateLimiter(ABC):
+    """Counts hits per key over one or more trailing windows."""
+
+    @abstractmethod
+    def hit(self, key: str, windows: Sequence[int]) -> list[int]:
+        """Record one hit for ``key`` and return the hit count inside each window (in seconds)."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget every recorded hit."""
+
+
+class CacheRateLimiter(RateLimiter):
+    """Fixed-window counters in the default cache; only shared across workers if the cache is.
+
+    Counter keys carry a generation number, so ``reset`` moves every worker to fresh keys
+    without touching anything else in the cache; the old counters expire with their window.
+    """
+
+    def hit(self, key: str, windows: Sequence[int]) -> list[int]:
+        generation = cache.get(CACHE_GENERATION_KEY, 0)
+        return [self._increment(f"{CACHE_KEY_PREFIX}:{generation}:{key}:{window}", window) for window in windows]
+
+    def reset(self) -> None:
+        if cache.add(CACHE_GENERATION_KEY, 1, timeout=None):
+            return
+        try:
+            cache.incr(CACHE_GENERATION_KEY)
+        except ValueError:
+            cache.set(CACHE_GENERATION_KEY, 1, timeout=None)
+
+    @staticmethod
+    def _increment(key: str, window_seconds: int) -> int:
+        if cache.add(key, 1, timeout=window_seconds):
+            return 1
+        try:
+            return cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=window_seconds)
+            return 1
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """Sliding-window log in a SQLite file shared by every worker on the host.
+
+    Each hit prunes its own key's expired rows. Keys that stop arriving are swept every
+    ``SQLITE_SWEEP_INTERVAL_SECONDS``, once older than the longest window any worker uses.
+    """
+
+    def __init__(self, path: Path):
+        self.database = LocalSQLite(
+            path,
+            schema=(
+                "CREATE TABLE IF NOT EXISTS rate_limit_hits (key TEXT NOT NULL, hit_at REAL NOT NULL)",
+                "CREATE INDEX IF NOT EXISTS rate_limit_hits_key ON rate_limit_hits (key, hit_at)",
+                "CREATE INDEX IF NOT EXISTS rate_limit_hits_hit_at ON rate_limit_hits (hit_at)",
+                "CREATE TABLE IF NOT EXISTS rate_limit_windows (seconds REAL PRIMARY KEY)",
+            ),
+        )
+        self._known_windows: set[float] = set()
+        self._next_sweep_at = 0.0
+
+    def hit(self, key: str, windows: Sequence[int]) -> list[int]:
+        now = time.time()
+        columns = ", ".join("COALESCE(SUM(hit_at > ?), 0)" for _ in windows)
+        new_windows = set(windows) - self._known_windows
+        with self.database.immediate() as connection:
+            if new_windows:
+                # Recorded so no worker's sweep drops hits another worker still counts.
+                connection.executemany(
+                    "INSERT OR IGNORE INTO rate_limit_windows (seconds) VALUES (?)",
+                    [(window,) for window in new_windows],
+                )
+            connection.execute("DELETE FROM rate_limit_hits WHERE key = ? AND hit_at <= ?", (key, now - max(windows)))
+            if now >= self._next_sweep_at:
+                connection.execute(
+                    "DELETE FROM rate_limit_hits WHERE hit_at <= ? - (SELECT MAX(seconds) FROM rate_limit_windows)",
+                    (now,),
+                )
+                self._next_sweep_at = now + SQLITE_SWEEP_INTERVAL_SECONDS
+            connection.execute("INSERT INTO rate_limit_hits (key, hit_at) VALUES (?, ?)", (key, now))
+            row = connection.execute(
+                f"SELECT {columns} FROM rate_limit_hits WHERE key = ?",
+                (*(now - window for window in windows), key),
+            ).fetchone()
+        self._known_windows |= new_windows
+        return [int(count) for count in row]
+
+    def reset(self) -> None:
+        self.database.connection().execute("DELETE FROM rate_limit_hits")
+        self._next_sweep_at = 0.0
+
+
+_rate_limiter_lock = threading.Lock()
+_rate_limiter: RateLimiter | None = None
+_rate_limiter_config: tuple | None = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The ``CONTACT_RATE_LIMIT_BACKEND`` class, built with ``CONTACT_RATE_LIMIT_OPTIONS`` as keyword arguments."""
+    global _rate_limiter, _rate_limiter_config
+
+    backend = getattr(settings, "CONTACT_RATE_LIMIT_BACKEND", DEFAULT_RATE_LIMIT_BACKEND)
+    options = dict(getattr(settings, "CONTACT_RATE_LIMIT_OPTIONS", {}))
+    config = (backend, sorted((name, str(value)) for name, value in options.items()))
+    with _rate_limiter_lock:
+        if _rate_limiter is None or _rate_limiter_config != config:
+            _rate_limiter = import_string(backend)(**options)
+            _rate_limiter_config = config
+        return _rate_limiter
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from hashlib import sha256
+import json
+import logging
+import os
+from pathlib import Path, PurePosixPath
+import tempfile
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+RESPONSIVE_WIDTHS = (480, 960, 1600)
+RESPONSIVE_URL_PREFIX = "/static/responsive/"
+DERIVATIVE_SOURCE_SUFFIXES = {".jpeg", ".jpg", ".png", ".webp"}
+MANIFEST_FORMAT_VERSION = 1
+
+
+@dataclass
+class ResponsiveSource:
+    mime_type: str
+    srcset: list[tuple[str, int]]
+
+    @property
+    def srcset_attribute(self) -> str:
+        return ", ".join(f"{url} {width}w" for url, width in self.srcset)
+
+
+@dataclass
+class ResponsiveImage:
+    width: int
+    height: int
+    sources: list[ResponsiveSource]
+
+
+def _output_formats() -> list[tuple[str, str, str, dict]]:
+    from PIL import features
+
+    formats = []
+    if features.check("avif"):
+        formats.append(("image/avif", "AVIF", ".avif", {"quality": 55}))
+    formats.append(("image/webp", "WEBP", ".webp", {"quality": 80, "method": 6}))
+    return formats
+
+
+def _prepare_for_export(image: Image.Image) -> Image.Image:
+    if image.mode in {"RGB", "RGBA"}:
+        return image
+    has_alpha = image.mode in {"LA", "PA"} or (image.mode == "P" and "transparency" in image.info)
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def build_derivatives(source_path: Path, url: str, output_dir: Path) -> ResponsiveImage:
+    from PIL import Image
+
+    digest = sha256(source_path.read_bytes()).hexdigest()[:10]
+    stem = PurePosixPath(url.removeprefix("/static/")).with_suffix("")
+
+    with Image.open(source_path) as opened:
+        image = _prepare_for_export(opened)
+        source_width, source_height = image.size
+        widths = sorted({min(width, source_width) for width in RESPONSIVE_WIDTHS})
+
+        sources: list[ResponsiveSource] = []
+        for mime_type, image_format, suffix, options in _output_formats():
+            srcset: list[tuple[str, int]] = []
+            for width in widths:
+                name = f"{stem}-{digest}-{width}w{suffix}"
+                target = output_dir / name
+                if not target.exists():
+                    height = max(1, round(source_height * width / source_width))
+                    resized = image if width == source_width else image.resize((width, height), Image.Resampling.LANCZOS)
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    temp_target = target.with_name(f".{target.name}.tmp")
+                    resized.save(temp_target, format=image_format, **options)
+                    os.replace(temp_target, target)
+                srcset.append((f"{RESPONSIVE_URL_PREFIX}{name}", width))
+            sources.append(ResponsiveSource(mime_type=mime_type, srcset=srcset))
+
+    return ResponsiveImage(width=source_width, height=source_height, sources=sources)
+
+
+class ResponsiveImageManifest:
+    """Generated WebP/AVIF derivatives keyed by the original image URL."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.images: dict[str, ResponsiveImage] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: Path | None) -> None:
+        self.path = path
+        images = self._read_images(path) if path is not None else {}
+        with self._lock:
+            self.images = images
+
+    def get(self, url: str) -> ResponsiveImage | None:
+        return self.images.get(url)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            document = {
+                "format_version": MANIFEST_FORMAT_VERSION,
+                "images": {url: asdict(image) for url, image in sorted(self.images.items())},
+            }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handle, temp_name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8") as temp_file:
+                json.dump(document, temp_file, indent=2)
+                temp_file.write("\n")
+            os.chmod(temp_name, 0o644)
+            os.replace(temp_name, self.path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _read_images(path: Path) -> dict[str, ResponsiveImage]:
+        try:
+            document = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable responsive image manifest %s.", path)
+            return {}
+
+        if not isinstance(document, dict) or document.get("format_version") != MANIFEST_FORMAT_VERSION:
+            return {}
+        raw_images = document.get("images")
+        if not isinstance(raw_images, dict):
+            return {}
+
+        images: dict[str, ResponsiveImage] = {}
+        for url, value in raw_images.items():
+            try:
+                images[url] = ResponsiveImage(
+                    width=value["width"],
+                    height=value["height"],
+                    sources=[
+                        ResponsiveSource(
+                            mime_type=source["mime_type"],
+                            srcset=[(candidate_url, width) for candidate_url, width in source["srcset"]],
+                        )
+                        for source in value["sources"]
+                    ],
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+        return images
+
+
+responsive_images = ResponsiveImageManifest()
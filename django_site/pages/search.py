@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+import heapq
+from math import log
+import re
+import sys
+
+TOKEN_PATTERN = re.compile(r"\w+")
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was "
+    "were which will with".split()
+)
+# Field weights fold title and tag matches into one weighted term frequency (a simple BM25F).
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 2
+BODY_WEIGHT = 1
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_QUERY_TERMS = 16
+MAX_TERM_FREQUENCY = 0xFFFF
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+@dataclass
+class SearchDocument:
+    title: str
+    tags: list[str]
+    body_text: str
+
+
+@dataclass
+class SearchIndex:
+    """BM25 index over documents numbered 0..N-1 (positions in the published post list).
+
+    Postings are two parallel arrays per term, ascending document numbers and weighted
+    term frequencies, so the index pickles compactly into the content snapshot.
+    """
+
+    term_ids: dict[str, int]
+    postings_docs: list[array]
+    postings_freqs: list[array]
+    doc_lengths: array
+    # BM25's per-document denominator term, k1 * (1 - b + b * length / average length).
+    length_norms: array
+
+    @property
+    def document_count(self) -> int:
+        return len(self.doc_lengths)
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[int, float]]:
+        """Return up to ``limit`` ``(document, score)`` pairs, best first; ties go to the lower (newer) document."""
+
+        term_ids = [
+            self.term_ids[term]
+            for term in dict.fromkeys(tokenize(query))
+            if term in self.term_ids
+        ][:MAX_QUERY_TERMS]
+        if not term_ids:
+            return []
+
+        document_count = self.document_count
+        length_norms = self.length_norms
+        scores: dict[int, float] = {}
+        for term_id in term_ids:
+            docs = self.postings_docs[term_id]
+            freqs = self.postings_freqs[term_id]
+            idf = log(1 + (document_count - len(docs) + 0.5) / (len(docs) + 0.5)) * (BM25_K1 + 1)
+            for doc, freq in zip(docs, freqs):
+                scores[doc] = scores.get(doc, 0.0) + idf * freq / (freq + length_norms[doc])
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+def build_search_index(documents: Iterable[SearchDocument]) -> SearchIndex:
+    term_ids: dict[str, int] = {}
+    postings_docs: list[array] = []
+    postings_freqs: list[array] = []
+    doc_lengths = array("I")
+
+    for doc, document in enumerate(documents):
+        weighted: Counter[str] = Counter()
+        for weight, tokens in (
+            (TITLE_WEIGHT, tokenize(document.title)),
+            (TAG_WEIGHT, tokenize(" ".join(document.tags))),
+            (BODY_WEIGHT, tokenize(document.body_text)),
+        ):
+            for token in tokens:
+                weighted[token] += weight
+        doc_lengths.append(sum(weighted.values()))
+
+        for term, freq in weighted.items():
+            term_id = term_ids.get(term)
+            if term_id is None:
+                term_id = term_ids[sys.intern(term)] = len(postings_docs)
+                postings_docs.append(array("I"))
+                postings_freqs.append(array("H"))
+            postings_docs[term_id].append(doc)
+            postings_freqs[term_id].append(min(freq, MAX_TERM_FREQUENCY))
+
+    average_length = (sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0) or 1.0
+    return SearchIndex(
+        term_ids=term_ids,
+        postings_docs=postings_docs,
+        postings_freqs=postings_freqs,
+        doc_lengths=doc_lengths,
+        length_norms=array(
+            "d",
+            (BM25_K1 * (1 - BM25_B + BM25_B * length / average_length) for length in doc_lengths),
+        ),
+    )
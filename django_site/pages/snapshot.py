@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from dataclasses import fields
+from datetime import datetime, timezone
+from hashlib import sha256
+import json
+import logging
+import os
+from pathlib import Path
+import pickle
+import tempfile
+
+from django.conf import settings
+
+from . import content
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"sams-website-content-snapshot\n"
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_DATACLASSES = (
+    content.ContentSnapshot,
+    content.PostContent,
+    content.PostTocEntry,
+    content.PageContent,
+    content.CVContent,
+    content.CVEntry,
+    content.AuthorProfile,
+    content.SearchIndex,
+)
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, corrupt or was built by incompatible code."""
+
+
+def _schema_fingerprint() -> str:
+    schema = [
+        [cls.__qualname__, [field.name for field in fields(cls)]]
+        for cls in SNAPSHOT_DATACLASSES
+    ]
+    return sha256(json.dumps(schema).encode("utf-8")).hexdigest()
+
+
+def write_snapshot(snapshot: content.ContentSnapshot, path: Path) -> dict:
+    payload = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+    header = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "schema": _schema_fingerprint(),
+        "source_digest": snapshot.source_digest,
+        "sha256": sha256(payload).hexdigest(),
+        "length": len(payload),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(handle, "wb") as temp_file:
+            temp_file.write(SNAPSHOT_MAGIC)
+            temp_file.write(json.dumps(header, sort_keys=True).encode("utf-8") + b"\n")
+            temp_file.write(payload)
+        os.chmod(temp_name, 0o644)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    return header
+
+
+def read_snapshot(path: Path) -> content.ContentSnapshot:
+    try:
+        raw = path.read_bytes()
+    except OSError as exc:
+        raise SnapshotError(f"Cannot read snapshot {path}: {exc}") from exc
+
+    if not raw.startswith(SNAPSHOT_MAGIC):
+        raise SnapshotError(f"{path} is not a content snapshot.")
+    header_line, separator, payload = raw[len(SNAPSHOT_MAGIC) :].partition(b"\n")
+    if not separator:
+        raise SnapshotError(f"{path} has a truncated header.")
+    try:
+        header = json.loads(header_line)
+    except ValueError as exc:
+        raise SnapshotError(f"{path} has an unreadable header.") from exc
+
+    if header.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise SnapshotError(
+            f"{path} uses snapshot format {header.get('format_version')}, expected {SNAPSHOT_FORMAT_VERSION}."
+        )
+    if header.get("schema") != _schema_fingerprint():
+        raise SnapshotError(f"{path} was built by a different version of pages.content.")
+    if header.get("length") != len(payload) or header.get("sha256") != sha256(payload).hexdigest():
+        raise SnapshotError(f"{path} failed its checksum.")
+
+    snapshot = pickle.loads(payload)
+    if not isinstance(snapshot, content.ContentSnapshot):
+        raise SnapshotError(f"{path} does not contain a content snapshot.")
+    return snapshot
+
+
+def activate_configured_snapshot() -> content.ContentSnapshot | None:
+    snapshot_path = getattr(settings, "CONTENT_SNAPSHOT_PATH", None)
+    if not snapshot_path:
+        return None
+    snapshot_path = Path(snapshot_path)
+    if not snapshot_path.exists():
+        return None
+
+    try:
+        snapshot = read_snapshot(snapshot_path)
+    except SnapshotError as exc:
+        logger.warning("Ignoring content snapshot: %s", exc)
+        return None
+
+    if getattr(settings, "CONTENT_SNAPSHOT_VERIFY", True):
+        source_digest = content.content_source_digest()
+        if snapshot.source_digest != source_digest:
+            logger.warning("Ignoring content snapshot %s: content has changed since it was compiled.", snapshot_path)
+            return None
+
+    content.set_content_snapshot(snapshot)
+    return snapshot
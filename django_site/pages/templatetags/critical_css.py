@@ -0,0 +1,14 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..critical_css import critical_styles
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def critical_css(context) -> str:
+    """The built first-screen CSS for the page template being rendered, or an empty string."""
+
+    css = critical_styles.get(getattr(context.template, "name", None))
+    return mark_safe(css) if css else ""
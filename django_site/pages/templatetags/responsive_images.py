@@ -0,0 +1,29 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from .. import content
+from ..responsive_images import responsive_images
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_sources(url: str | None, sizes: str) -> str:
+    image = responsive_images.get(url) if url else None
+    if image is None:
+        return ""
+    return format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}" />',
+        ((source.mime_type, source.srcset_attribute, sizes) for source in image.sources),
+    )
+
+
+@register.simple_tag
+def image_dimensions(url: str | None) -> str:
+    """``width``/``height`` attributes from the image manifest, so the browser reserves the image's space."""
+
+    dimensions = content.image_dimensions(url) if url else None
+    if dimensions is None:
+        return ""
+    return format_html('width="{}" height="{}"', *dimensions)
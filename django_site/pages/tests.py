@@ -1,21 +1,79 @@
 from django.test import TestCase
 from django.urls import reverse
-from django.core import mail
-from django.core.cache import cache
-from django.test import override_settings
+from django.core import mail, signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import CommandError, call_command
+from django.core.cache import cache, caches
+from django.conf import settings
+from django.test import AsyncRequestFactory, Client, RequestFactory, override_settings
+from io import StringIO
+from pathlib import Path
+import dataclasses
+import gzip
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import socketserver
+import subprocess
+import sys
+import tempfile
+import threading
 import time
+from unittest import mock
+
+from PIL import Image
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.utils.http import http_date
+from django.utils.text import slugify
+
+from . import (
+    assets,
+    async_views,
+    benchmarks,
+    content,
+    corpus,
+    critical_css,
+    images,
+    metrics,
+    outbox,
+    page_cache,
+    rate_limit,
+    responsive_images,
+    search,
+    snapshot,
+    timing,
+    views,
+    warmup,
+)
+from .middleware import CanonicalHostRedirectMiddleware
 
 
 class PageRouteTests(TestCase):
     def setUp(self):
         super().setUp()
         cache.clear()
+        rate_limit_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, rate_limit_dir)
+        rate_limit_settings = override_settings(
+            CONTACT_RATE_LIMIT_OPTIONS={"path": rate_limit_dir / "rate-limits.sqlite3"},
+            CONTACT_OUTBOX_DB_PATH=rate_limit_dir / "outbox.sqlite3",
+            CONTACT_OUTBOX_SENDER_THREAD=False,
+        )
+        rate_limit_settings.enable()
+        self.addCleanup(rate_limit_settings.disable)
 
-    def _prime_contact_session(self, *, seconds_ago: int = 5):
-        self.client.get(reverse("home"))
-        session = self.client.session
-        session["contact_form_rendered_at"] = int(time.time()) - seconds_ago
-        session.save()
+    def _contact_form_token(self, *, seconds_ago: int = 5) -> str:
+        return signing.dumps(int(time.time()) - seconds_ago, salt=views.CONTACT_FORM_TOKEN_SALT)
+
+    def _contact_form_token_from(self, response) -> str:
+        match = re.search(r'name="contact_form_token" value="([^"]+)"', response.content.decode("utf-8"))
+        self.assertIsNotNone(match)
+        return match.group(1)
 
     def test_home_page_renders(self):
         response = self.client.get(reverse("home"))
@@ -72,11 +130,11 @@ class PageRouteTests(TestCase):
         DEFAULT_FROM_EMAIL="website@sam-osian.com",
     )
     def test_contact_form_valid_submission_sends_email(self):
-        self._prime_contact_session(seconds_ago=5)
         response = self.client.post(
             reverse("home"),
             {
                 "form_name": "contact",
+                "contact_form_token": self._contact_form_token(seconds_ago=5),
                 "name": "Test User",
                 "email": "test@example.com",
                 "message": "Hello from the contact form",
@@ -85,17 +143,21 @@ class PageRouteTests(TestCase):
         )
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Your message has been sent")
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(outbox.get_outbox().pending_count(), 1)
+
+        self.assertEqual(outbox.get_outbox().drain().sent, 1)
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].to, ["samoand@liverpool.ac.uk"])
         self.assertIn("Test User", mail.outbox[0].subject)
 
     @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
     def test_contact_form_invalid_submission_shows_errors(self):
-        self._prime_contact_session(seconds_ago=5)
         response = self.client.post(
             reverse("home"),
             {
                 "form_name": "contact",
+                "contact_form_token": self._contact_form_token(seconds_ago=5),
                 "name": "",
                 "email": "not-an-email",
                 "message": "",
@@ -108,12 +170,13 @@ class PageRouteTests(TestCase):
 
     @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
     def test_contact_form_too_fast_submission_is_blocked(self):
-        self.client.get(reverse("home"))
+        token = self._contact_form_token_from(self.client.get(reverse("home")))
         with self.assertLogs("pages.contact_protection", level="WARNING") as logs:
             response = self.client.post(
                 reverse("home"),
                 {
                     "form_name": "contact",
+                    "contact_form_token": token,
                     "name": "Fast User",
                     "email": "fast@example.com",
                     "message": "This should be blocked for speed",
@@ -125,14 +188,58 @@ class PageRouteTests(TestCase):
         self.assertEqual(len(mail.outbox), 0)
         self.assertTrue(any("reason=too_fast" in entry for entry in logs.output))
 
+    @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+    def test_contact_form_tampered_token_is_blocked(self):
+        token = self._contact_form_token(seconds_ago=5)
+        with self.assertLogs("pages.contact_protection", level="WARNING") as logs:
+            response = self.client.post(
+                reverse("home"),
+                {
+                    "form_name": "contact",
+                    "contact_form_token": f"{token[:-1]}x",
+                    "name": "Forged User",
+                    "email": "forged@example.com",
+                    "message": "This token was edited",
+                },
+                follow=True,
+            )
+        self.assertContains(response, "delivery issue")
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(any("reason=missing_timestamp" in entry for entry in logs.output))
+
+    @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend", CONTACT_FORM_TOKEN_MAX_AGE_SECONDS=3600)
+    def test_contact_form_expired_token_is_blocked(self):
+        with mock.patch("django.core.signing.time.time", return_value=time.time() - 3601):
+            token = self._contact_form_token(seconds_ago=5)
+        with self.assertLogs("pages.contact_protection", level="WARNING") as logs:
+            response = self.client.post(
+                reverse("home"),
+                {
+                    "form_name": "contact",
+                    "contact_form_token": token,
+                    "name": "Replaying Bot",
+                    "email": "bot@example.com",
+                    "message": "This token was harvested earlier",
+                },
+                follow=True,
+            )
+        self.assertContains(response, "delivery issue")
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(any("reason=missing_timestamp" in entry for entry in logs.output))
+
+    def test_home_get_does_not_create_a_session(self):
+        response = self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
     @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
     def test_contact_form_honeypot_submission_is_ignored(self):
-        self._prime_contact_session(seconds_ago=5)
         with self.assertLogs("pages.contact_protection", level="WARNING") as logs:
             response = self.client.post(
                 reverse("home"),
                 {
                     "form_name": "contact",
+                    "contact_form_token": self._contact_form_token(seconds_ago=5),
                     "name": "Bot User",
                     "email": "bot@example.com",
                     "message": "Spam message",
@@ -147,11 +254,11 @@ class PageRouteTests(TestCase):
 
     @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
     def test_contact_form_rate_limit_blocks_second_submission_within_minute(self):
-        self._prime_contact_session(seconds_ago=5)
         first = self.client.post(
             reverse("home"),
             {
                 "form_name": "contact",
+                "contact_form_token": self._contact_form_token(seconds_ago=5),
                 "name": "Normal User",
                 "email": "normal@example.com",
                 "message": "First message",
@@ -159,14 +266,14 @@ class PageRouteTests(TestCase):
             follow=True,
         )
         self.assertEqual(first.status_code, 200)
-        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(outbox.get_outbox().pending_count(), 1)
 
-        self._prime_contact_session(seconds_ago=5)
         with self.assertLogs("pages.contact_protection", level="WARNING") as logs:
             second = self.client.post(
                 reverse("home"),
                 {
                     "form_name": "contact",
+                    "contact_form_token": self._contact_form_token(seconds_ago=5),
                     "name": "Normal User",
                     "email": "normal@example.com",
                     "message": "Second message",
@@ -175,7 +282,7 @@ class PageRouteTests(TestCase):
             )
         self.assertEqual(second.status_code, 200)
         self.assertContains(second, "delivery issue")
-        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(outbox.get_outbox().pending_count(), 1)
         self.assertTrue(any("reason=rate_limit" in entry for entry in logs.output))
 
 
@@ -189,6 +296,18 @@ class PostRouteTests(TestCase):
         self.assertContains(response, "Sam Osian")
         self.assertContains(response, 'aria-label="Back to homepage"')
 
+    def test_cover_loads_first_and_other_images_lazily(self):
+        response = self.client.get(reverse("post-detail", kwargs={"slug": "rethinking-significance"}))
+        html = response.content.decode()
+
+        cover = re.search(r'<img src="[^"]+" alt="Featured image for [^"]+"[^>]*>', html).group()
+        self.assertIn('fetchpriority="high"', cover)
+        self.assertIn('width="1536" height="1024"', cover)
+        self.assertNotIn("loading=", cover)
+        for image in re.findall(r'<img[^>]*alt="Portrait of [^"]+"[^>]*>', html):
+            self.assertIn('loading="lazy"', image)
+            self.assertIn("height=", image)
+
     def test_post_seo_fields_render_when_configured(self):
         response = self.client.get(reverse("post-detail", kwargs={"slug": "rethinking-significance"}))
         self.assertEqual(response.status_code, 200)
@@ -268,15 +387,1579 @@ class PostRouteTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(
             response,
-            'href="https://mentalhealth.bmj.com/content/29/1/e302212" target="_blank" rel="noopener noreferrer"',
+            'href="https://mentalhealth.bmj.com/content/29/1/e302212" rel="noopener noreferrer" target="_blank"',
             html=False,
         )
         self.assertContains(
             response,
-            'href="https://pfdtoolkit.org" target="_blank" rel="noopener noreferrer"',
+            'href="https://pfdtoolkit.org" rel="noopener noreferrer" target="_blank"',
             html=False,
         )
 
     def test_draft_post_is_hidden(self):
         response = self.client.get(reverse("post-detail", kwargs={"slug": "the-lives-we-could-save"}))
         self.assertEqual(response.status_code, 404)
+
+
+class PostIndexTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.posts_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.posts_dir)
+        for source in content.POSTS_DIR.glob("*.md"):
+            shutil.copy(source, self.posts_dir / source.name)
+        patcher = mock.patch.object(content, "POSTS_DIR", self.posts_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(content.set_content_snapshot, content.get_content_snapshot())
+        content.set_content_snapshot(None)
+        content.clear_post_index()
+        self.addCleanup(content.clear_post_index)
+
+    def test_get_post_reuses_parsed_posts_between_calls(self):
+        first = content.get_post("rethinking-significance")
+        second = content.get_post("rethinking-significance")
+        self.assertIsNotNone(first)
+        self.assertIs(first, second)
+        self.assertIsNone(content.get_post("does-not-exist"))
+
+    def test_only_changed_posts_are_reloaded(self):
+        content.load_posts()
+        changed_path = self.posts_dir / "rethinking-significance.md"
+        changed_path.write_text(
+            changed_path.read_text(encoding="utf-8").replace(
+                "Has the p-value overstayed its welcome?",
+                "Has the p-value finally left?",
+            ),
+            encoding="utf-8",
+        )
+        stat = changed_path.stat()
+        os.utime(changed_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        with mock.patch.object(content, "_load_post", wraps=content._load_post) as load_post:
+            post = content.get_post("rethinking-significance")
+
+        self.assertEqual(load_post.call_count, 1)
+        self.assertIn("Has the p-value finally left?", post.title)
+
+    def test_removed_and_added_posts_are_picked_up(self):
+        self.assertIsNotNone(content.get_post("pfd-toolkit-announcement"))
+        (self.posts_dir / "pfd-toolkit-announcement.md").unlink()
+        (self.posts_dir / "new-post.md").write_text(
+            "---\ntitle: New post\ndate: 2026-04-01\n---\n\nHello.\n",
+            encoding="utf-8",
+        )
+
+        self.assertIsNone(content.get_post("pfd-toolkit-announcement"))
+        self.assertEqual(content.load_posts()[0].slug, "new-post")
+
+    def test_drafts_only_resolve_when_requested(self):
+        (self.posts_dir / "draft-post.md").write_text(
+            "---\ntitle: Draft\ndraft: true\ndate: 2026-05-01\n---\n\nNot yet.\n",
+            encoding="utf-8",
+        )
+
+        self.assertIsNone(content.get_post("draft-post"))
+        self.assertIsNotNone(content.get_post("draft-post", include_drafts=True))
+        self.assertNotIn("draft-post", [post.slug for post in content.load_posts()])
+        self.assertIn("draft-post", [post.slug for post in content.load_posts(include_drafts=True)])
+
+
+class PostRenderingTests(TestCase):
+    def test_post_body_is_rendered_once_and_split_at_markers(self):
+        body = (
+            "Summary with a [link](https://example.com).\n\n"
+            "<!-- more -->\n\n"
+            "## Section\n\n"
+            "Main text with a note[^1].\n\n"
+            "```\n<!-- post-footer -->\n```\n\n"
+            "<!-- post-footer -->\n\n"
+            "Footer text.\n\n"
+            "[^1]: The note.\n"
+        )
+        with mock.patch.object(
+            content, "_render_markdown_document", wraps=content._render_markdown_document
+        ) as render:
+            rendered = content._render_post_body(body)
+
+        self.assertEqual(render.call_count, 1)
+        self.assertIn('href="https://example.com" rel="noopener noreferrer" target="_blank"', rendered.summary_html)
+        self.assertNotIn("Section", rendered.summary_html)
+        self.assertIn('<h2 id="section">Section</h2>', rendered.main_body_html)
+        self.assertIn("&lt;!-- post-footer --&gt;", rendered.main_body_html)
+        self.assertIn('class="footnote"', rendered.main_body_html)
+        self.assertEqual(rendered.footer_html, "<p>Footer text.</p>")
+        self.assertNotIn("<!-- more -->", rendered.body_html)
+        self.assertNotIn("<!-- post-footer -->", rendered.body_html)
+
+    def test_summary_footnote_references_are_stripped_when_the_post_is_split(self):
+        rendered = content._render_post_body(
+            "Claim[^a] and again[^a].\n\n<!-- more -->\n\nMore[^b].\n\n[^a]: Source A.\n[^b]: Source B.\n"
+        )
+
+        self.assertEqual(rendered.summary_html, "<p>Claim and again.</p>")
+        self.assertIn('<li id="fn:a">', rendered.main_body_html)
+        self.assertIn("Source A.", rendered.main_body_html)
+        self.assertNotIn('href="#fnref:a"', rendered.main_body_html)
+        self.assertNotIn('href="#fnref2:a"', rendered.main_body_html)
+        self.assertIn('href="#fnref:b"', rendered.main_body_html)
+        self.assertIn('<sup id="fnref:a">', rendered.body_html)
+
+    def test_images_get_intrinsic_dimensions_and_lazy_loading(self):
+        html = content._render_markdown(
+            "![A](../assets/me-circle-128.webp)\n\n"
+            '![B](../assets/images/rethinking_significance.webp){ width="600" }\n\n'
+            '![C](https://example.com/c.png){ loading="eager" }\n'
+        )
+
+        self.assertIn(
+            '<img alt="A" decoding="async" height="128" loading="lazy" src="/static/assets/me-circle-128.webp" width="128">',
+            html,
+        )
+        self.assertIn('height="400"', html)
+        self.assertIn('width="600"', html)
+        self.assertIn('<img alt="C" decoding="async" loading="eager" src="https://example.com/c.png">', html)
+
+    def test_inline_marker_falls_back_to_rendering_each_section(self):
+        body = "Summary <!-- more --> continues inline.\n\nMain text.\n"
+        rendered = content._render_post_body(body)
+
+        self.assertEqual(rendered.summary_html, "<p>Summary </p>")
+        self.assertIn("Main text.", rendered.main_body_html)
+        self.assertEqual(rendered.footer_html, "")
+
+    def test_links_and_images_are_rewritten_outside_code_blocks(self):
+        html = content._render_markdown(
+            "[Home](index.md) [About](about.md) [Post](posts/some-post.md) "
+            "[Ext](https://example.com){ target=\"_self\" }\n\n"
+            "![Cover](../assets/images/cover.png)\n\n"
+            "```\n[Raw](index.md) https://example.com\n```\n"
+        )
+
+        self.assertIn('<a href="/">Home</a>', html)
+        self.assertIn('<a href="/about/">About</a>', html)
+        self.assertIn('<a href="/some-post/">Post</a>', html)
+        self.assertIn('href="https://example.com" rel="noopener noreferrer" target="_self"', html)
+        self.assertIn('src="/static/assets/images/cover.png"', html)
+        self.assertIn("[Raw](index.md) https://example.com", html)
+
+    def test_external_links_in_raw_html_open_in_a_new_tab(self):
+        html = content._render_markdown(
+            '<div class="links"><a href="https://example.com/block">Block</a> '
+            '<a href="/cv/">Local</a></div>\n\n'
+            'Inline <a class="x" href="https://example.com/inline" target="_self">link</a>.\n\n'
+            '`<a href="https://example.com/code">`\n'
+        )
+
+        self.assertIn('<a href="https://example.com/block" target="_blank" rel="noopener noreferrer">', html)
+        self.assertIn('<a href="/cv/">Local</a>', html)
+        self.assertIn(
+            '<a class="x" href="https://example.com/inline" target="_self" rel="noopener noreferrer">', html
+        )
+        self.assertIn('<code>&lt;a href="https://example.com/code"&gt;</code>', html)
+
+    def test_toc_entries_only_cover_main_body_headings(self):
+        body = (
+            "## Summary heading\n\n"
+            "<!-- more -->\n\n"
+            "## First *section*\n\n"
+            "!!! note\n    ## Nested heading\n\n"
+            "<!-- post-footer -->\n\n"
+            "## Footer heading\n"
+        )
+        rendered = content._render_post_body(body)
+
+        self.assertEqual(
+            [(entry.title, entry.anchor) for entry in rendered.toc_entries],
+            [("First section", "first-section"), ("Nested heading", "nested-heading")],
+        )
+
+
+class MarkdownEngineTests(TestCase):
+    def test_engine_is_reused_within_a_thread_and_not_shared_across_threads(self):
+        engine = content._markdown_engine()
+        self.assertIs(content._markdown_engine(), engine)
+
+        other_engines = []
+        thread = threading.Thread(target=lambda: other_engines.append(content._markdown_engine()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other_engines[0], engine)
+
+    def test_engine_state_does_not_leak_between_documents(self):
+        source = "Claim[^1].\n\n## Heading\n\n[^1]: Source.\n"
+        first = content._render_markdown_document(source)
+        content._render_markdown("Other[^note] text.\n\n## Heading\n\n[^note]: Other note.\n")
+        second = content._render_markdown_document(source)
+
+        self.assertEqual(first, second)
+        self.assertIn('id="fn:1"', second[0])
+        self.assertNotIn("Other note", second[0])
+
+
+class ContentSnapshotTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.snapshot_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.snapshot_dir)
+        self.snapshot_path = self.snapshot_dir / "content.snapshot"
+        self.addCleanup(content.set_content_snapshot, content.get_content_snapshot())
+        content.set_content_snapshot(None)
+
+    def test_compile_command_writes_a_snapshot_that_round_trips(self):
+        call_command("compile_content", output=self.snapshot_path, workers=1, stdout=StringIO())
+
+        loaded = snapshot.read_snapshot(self.snapshot_path)
+        self.assertEqual(loaded.source_digest, content.content_source_digest())
+        self.assertEqual([post.slug for post in loaded.posts], [post.slug for post in content.load_posts()])
+        self.assertEqual(loaded.cv, content.load_cv())
+        self.assertEqual(loaded.pages["publications"], content.load_page("publications"))
+
+    def test_corrupt_snapshot_is_rejected(self):
+        snapshot.write_snapshot(content.compile_content_snapshot(), self.snapshot_path)
+        raw = bytearray(self.snapshot_path.read_bytes())
+        raw[-1] ^= 0xFF
+        self.snapshot_path.write_bytes(bytes(raw))
+
+        with self.assertRaisesMessage(snapshot.SnapshotError, "checksum"):
+            snapshot.read_snapshot(self.snapshot_path)
+
+    def test_snapshot_from_other_schema_is_rejected(self):
+        snapshot.write_snapshot(content.compile_content_snapshot(), self.snapshot_path)
+
+        with mock.patch.object(snapshot, "_schema_fingerprint", return_value="other"):
+            with self.assertRaisesMessage(snapshot.SnapshotError, "different version"):
+                snapshot.read_snapshot(self.snapshot_path)
+
+    def test_active_snapshot_serves_content_without_parsing(self):
+        compiled = content.compile_content_snapshot()
+        snapshot.write_snapshot(compiled, self.snapshot_path)
+
+        with override_settings(CONTENT_SNAPSHOT_PATH=self.snapshot_path):
+            self.assertIsNotNone(snapshot.activate_configured_snapshot())
+        with mock.patch.object(content, "_load_post") as load_post, mock.patch.object(content, "_read_cv") as read_cv:
+            response = self.client.get(reverse("post-detail", kwargs={"slug": "rethinking-significance"}))
+            home_response = self.client.get(reverse("home"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(home_response.status_code, 200)
+        load_post.assert_not_called()
+        read_cv.assert_not_called()
+
+    def test_stale_snapshot_is_ignored(self):
+        compiled = content.compile_content_snapshot()
+        compiled.source_digest = "stale"
+        snapshot.write_snapshot(compiled, self.snapshot_path)
+
+        with override_settings(CONTENT_SNAPSHOT_PATH=self.snapshot_path):
+            with self.assertLogs("pages.snapshot", level="WARNING"):
+                self.assertIsNone(snapshot.activate_configured_snapshot())
+        self.assertIsNone(content.get_content_snapshot())
+
+
+class ImageManifestTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.image_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.image_dir)
+        self.image_path = self.image_dir / "sample.png"
+        Image.new("RGB", (40, 30)).save(self.image_path)
+        self.manifest_path = self.image_dir / "image-manifest.json"
+
+    def test_probe_result_is_persisted_and_reused(self):
+        manifest = images.ImageManifest(self.manifest_path)
+        entry = manifest.lookup(self.image_path)
+        self.assertEqual((entry.mime_type, entry.width, entry.height), ("image/png", 40, 30))
+
+        reloaded = images.ImageManifest()
+        reloaded.load(self.manifest_path)
+        with mock.patch("PIL.Image.open") as image_open:
+            entry = reloaded.lookup(self.image_path)
+        image_open.assert_not_called()
+        self.assertEqual((entry.width, entry.height), (40, 30))
+
+    def test_changed_image_is_probed_again(self):
+        manifest = images.ImageManifest(self.manifest_path)
+        manifest.lookup(self.image_path)
+        Image.new("RGB", (80, 20)).save(self.image_path)
+        stat = self.image_path.stat()
+        os.utime(self.image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        entry = manifest.lookup(self.image_path)
+        self.assertEqual((entry.width, entry.height), (80, 20))
+
+    def test_missing_and_unreadable_images(self):
+        manifest = images.ImageManifest()
+        self.assertIsNone(manifest.lookup(self.image_dir / "missing.png"))
+
+        svg_path = self.image_dir / "icon.svg"
+        svg_path.write_text("<svg xmlns='http://www.w3.org/2000/svg'/>", encoding="utf-8")
+        entry = manifest.lookup(svg_path)
+        self.assertEqual((entry.mime_type, entry.width, entry.height), ("image/svg+xml", None, None))
+
+    def test_svg_size_comes_from_its_root_attributes(self):
+        manifest = images.ImageManifest()
+        sized = self.image_dir / "sized.svg"
+        sized.write_text('<?xml version="1.0"?>\n<svg width="1600px" height="900" viewBox="0 0 16 9"/>', encoding="utf-8")
+        scalable = self.image_dir / "scalable.svg"
+        scalable.write_text('<svg viewBox="0,0,24.5,12" width="100%"/>', encoding="utf-8")
+
+        self.assertEqual((manifest.lookup(sized).width, manifest.lookup(sized).height), (1600, 900))
+        self.assertEqual((manifest.lookup(scalable).width, manifest.lookup(scalable).height), (24, 12))
+
+    def test_deleted_images_are_pruned_on_save(self):
+        manifest = images.ImageManifest(self.manifest_path)
+        removed_path = self.image_dir / "removed.png"
+        Image.new("RGB", (10, 10)).save(removed_path)
+        manifest.lookup(removed_path)
+        manifest.lookup(self.image_path)
+
+        removed_path.unlink()
+        images.ImageManifest(self.manifest_path).save()
+
+        reloaded = images.ImageManifest()
+        reloaded.load(self.manifest_path)
+        self.assertEqual(list(reloaded.entries), [str(self.image_path.resolve())])
+
+    def test_build_image_manifest_command_covers_static_images(self):
+        self.addCleanup(images.image_manifest.load, images.image_manifest.path)
+        call_command("build_image_manifest", output=self.manifest_path, stdout=StringIO())
+
+        reloaded = images.ImageManifest()
+        reloaded.load(self.manifest_path)
+        entry = reloaded.entries["assets/pfd-toolkit-cover.jpg"]
+        self.assertEqual((entry.width, entry.height), (5000, 2812))
+
+
+class ResponsiveImageTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        self.source_path = self.work_dir / "photo.png"
+        Image.new("RGB", (600, 300), color=(200, 120, 40)).save(self.source_path)
+
+    def _use_manifest(self, manifest_images):
+        patcher = mock.patch.object(responsive_images.responsive_images, "images", manifest_images)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_derivatives_are_generated_at_capped_widths(self):
+        output_dir = self.work_dir / "responsive"
+        built = responsive_images.build_derivatives(self.source_path, "/static/assets/photo.png", output_dir)
+
+        self.assertEqual((built.width, built.height), (600, 300))
+        webp = next(source for source in built.sources if source.mime_type == "image/webp")
+        self.assertEqual([width for _, width in webp.srcset], [480, 600])
+        for url, width in webp.srcset:
+            self.assertTrue(url.startswith("/static/responsive/assets/photo-"))
+            with Image.open(output_dir / url.removeprefix("/static/responsive/")) as derivative:
+                self.assertEqual(derivative.format, "WEBP")
+                self.assertEqual(derivative.width, width)
+
+    def test_markdown_images_get_picture_sources(self):
+        built = responsive_images.build_derivatives(
+            self.source_path, "/static/assets/photo.png", self.work_dir / "responsive"
+        )
+        self._use_manifest({"/static/assets/photo.png": built})
+
+        html = content._render_markdown("Look: ![Photo](../assets/photo.png) here.\n")
+
+        self.assertIn("<picture><source ", html)
+        self.assertIn(f'srcset="{built.sources[-1].srcset_attribute}"', html)
+        self.assertIn(f'sizes="{content.MARKDOWN_IMAGE_SIZES}"', html)
+        self.assertIn('<img alt="Photo" decoding="async" loading="lazy" src="/static/assets/photo.png"></picture> here.', html)
+
+    def test_template_tag_emits_sources_only_for_known_images(self):
+        built = responsive_images.build_derivatives(
+            self.source_path, "/static/assets/photo.png", self.work_dir / "responsive"
+        )
+        self._use_manifest({"/static/assets/photo.png": built})
+        template = Template('{% load responsive_images %}{% responsive_sources url sizes="50vw" %}')
+
+        rendered = template.render(Context({"url": "/static/assets/photo.png"}))
+        self.assertIn('<source type="image/webp" srcset="/static/responsive/assets/photo-', rendered)
+        self.assertIn('sizes="50vw"', rendered)
+        self.assertEqual(template.render(Context({"url": "/static/assets/other.png"})), "")
+
+
+HUGEICONS_FIXTURE_CSS = (
+    '@font-face{font-family:"hgi-stroke-rounded";src:url("hgi-stroke-rounded.woff2") format("woff2")}\n'
+    '.hgi-stroke{font-family:"hgi-stroke-rounded"}\n.hgi-stroke.hgi-arrow-left-01:before{content:"\\e001"}\n'
+)
+
+
+def _use_vendored_icon_fixture(test_case):
+    # The hugeicons stylesheet is fetched by `vendor_assets`, so tests bring their own.
+    static_dir = Path(tempfile.mkdtemp())
+    test_case.addCleanup(shutil.rmtree, static_dir, ignore_errors=True)
+    icons_path = static_dir / "pages" / "vendor" / "hugeicons" / "hgi-stroke-rounded.css"
+    icons_path.parent.mkdir(parents=True)
+    icons_path.write_text(HUGEICONS_FIXTURE_CSS, encoding="utf-8")
+    static_settings = override_settings(STATICFILES_DIRS=[*settings.STATICFILES_DIRS, static_dir])
+    static_settings.enable()
+    test_case.addCleanup(static_settings.disable)
+
+
+class AssetBundleTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.build_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.build_dir, ignore_errors=True)
+        _use_vendored_icon_fixture(self)
+
+    def test_minify_css_keeps_strings_urls_and_meaningful_spaces(self):
+        minified = assets.minify_css(
+            "/* note */\n.a :hover,\n.b > .c {\n  content: \"a  /* b */\";\n  margin: 0 auto;\n}\n/*! kept */\n"
+            ".d { background: url(https://example.com/a//b.png); }\n"
+            ".e::after { content: \"}\"; }\n"
+            "@media (max-width: 760px) and (min-width: 10px) { .f { color: red; } }\n"
+        )
+        self.assertEqual(
+            minified,
+            '.a :hover,.b>.c{content:"a  /* b */";margin:0 auto}/*! kept */'
+            ".d{background:url(https://example.com/a//b.png)}.e::after{content:\"}\"}"
+            "@media (max-width:760px) and (min-width:10px){.f{color:red}}\n",
+        )
+
+    def test_minify_js_keeps_literals_and_line_breaks_that_matter(self):
+        source = (
+            "// leading comment\n"
+            "const re = /[/]\\/x/g; // trailing\n"
+            "const url = \"https://example.com/a//b\";\n"
+            "const total = a + +b;\n"
+            "const half = total / 2 / 3;\n"
+            "const text = `line one\n  line two // not a comment ${ value /* kept */ }`;\n"
+            "let value = 'it\\'s /* fine */'\n"
+            "value = value\n"
+            "  .trim()\n"
+            "x = a\n"
+            "++b\n"
+            "function f() {\n  return /x/.test(value);\n}\n"
+        )
+        self.assertEqual(
+            assets.minify_js(source),
+            "const re=/[/]\\/x/g;const url=\"https://example.com/a//b\";const total=a+ +b;const half=total/2/3;"
+            "const text=`line one\n  line two // not a comment ${ value /* kept */ }`;"
+            "let value='it\\'s /* fine */'\nvalue=value.trim()\nx=a\n++b\nfunction f(){return/x/.test(value);}\n",
+        )
+
+    def test_minified_bundle_is_valid_javascript(self):
+        node = shutil.which("node")
+        if node is None:
+            self.skipTest("node is not installed")
+        bundle_path = self.build_dir / "bundle.js"
+        bundle_path.write_text(assets.bundle_text(assets.ASSET_BUNDLES["js"]), encoding="utf-8")
+
+        subprocess.run([node, "--check", str(bundle_path)], check=True, capture_output=True)
+
+    def test_vendor_assets_saves_stylesheet_fonts_next_to_the_stylesheet(self):
+        downloads = {
+            "https://cdn.example.com/font/icons.css": (
+                b'@font-face{src:url("https://cdn.example.com/font/icons.woff2?v=2") format("woff2"),'
+                b"url(icons.svg#icons) format(\"svg\")}.i{background:url(data:image/png;base64,AA==)}"
+            ),
+            "https://cdn.example.com/font/icons.woff2?v=2": b"woff2",
+            "https://cdn.example.com/font/icons.svg": b"<svg/>",
+        }
+        asset = assets.VendoredAsset("pages/vendor/icons/icons.css", "https://cdn.example.com/font/icons.css")
+
+        with mock.patch.object(assets, "_fetch", side_effect=downloads.__getitem__):
+            paths = assets.vendor_asset(asset, self.build_dir)
+
+        icons_dir = self.build_dir / "pages" / "vendor" / "icons"
+        self.assertEqual(paths, [icons_dir / "icons.css", icons_dir / "icons.woff2", icons_dir / "icons.svg"])
+        self.assertEqual(
+            (icons_dir / "icons.css").read_text(encoding="utf-8"),
+            '@font-face{src:url("icons.woff2") format("woff2"),url("icons.svg#icons") format("svg")}'
+            ".i{background:url(data:image/png;base64,AA==)}",
+        )
+        self.assertEqual((icons_dir / "icons.woff2").read_bytes(), b"woff2")
+
+    def test_vendor_assets_command_only_fetches_missing_files(self):
+        (self.build_dir / "pages" / "vendor" / "simplebar").mkdir(parents=True)
+        for asset in assets.VENDORED_ASSETS[:2]:
+            (self.build_dir / asset.path).write_text("", encoding="utf-8")
+
+        with mock.patch.object(assets, "_fetch", return_value=b".hgi{}") as fetch:
+            call_command("vendor_assets", "--output", str(self.build_dir), stdout=StringIO())
+
+        fetch.assert_called_once_with("https://cdn.hugeicons.com/font/hgi-stroke-rounded.css")
+
+    def test_build_assets_command_writes_bundles_the_templates_switch_to(self):
+        response = self.client.get(reverse("about"))
+        self.assertContains(response, 'href="/static/pages/vendor/simplebar/simplebar.css"')
+        self.assertContains(response, 'href="/static/pages/vendor/hugeicons/hgi-stroke-rounded.css"')
+        self.assertContains(response, 'src="/static/pages/vendor/simplebar/simplebar.min.js"')
+        self.assertContains(response, 'src="/static/pages/site.js"')
+        self.assertContains(response, 'class="scroll-root" data-simplebar')
+        self.assertNotContains(response, "?v=")
+        self.assertNotContains(response, "cdn.jsdelivr.net")
+        self.assertNotContains(response, "cdn.hugeicons.com")
+
+        call_command("build_assets", "--output", str(self.build_dir), stdout=StringIO())
+
+        css = (self.build_dir / "pages" / "site.min.css").read_text(encoding="utf-8")
+        self.assertIn(".simplebar-scrollbar", css)
+        self.assertIn('url("/static/pages/vendor/hugeicons/hgi-stroke-rounded.woff2")', css)
+        self.assertIn(".site-shell{", css)
+        js = (self.build_dir / "pages" / "site.min.js").read_text(encoding="utf-8")
+        self.assertLess(js.index("SimpleBar"), js.index("initPostReadingUi"))
+        with override_settings(ASSET_BUILD_DIR=self.build_dir):
+            self.assertEqual(assets.bundle_paths("css"), ["pages/site.min.css"])
+            response = self.client.get(reverse("cv"))
+        self.assertContains(response, 'href="/static/pages/site.min.css"')
+        self.assertContains(response, 'src="/static/pages/site.min.js"')
+        self.assertNotContains(response, "/static/pages/site.css")
+
+
+class CriticalCssTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        _use_vendored_icon_fixture(self)
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.addCleanup(critical_css.critical_styles.load, settings.CRITICAL_CSS_MANIFEST_PATH)
+        self.addCleanup(caches["pages"].clear)
+
+    def test_extract_keeps_rules_for_the_first_screen_only(self):
+        used = critical_css.above_the_fold(
+            '<html><head><link rel="x"></head><body><header class="top" data-reveal>'
+            '<a class="brand" href="/">Home</a></header><footer class="foot"></footer></body></html>',
+            limit=3,
+        )
+        css = (
+            ":root{--ink:#111}.top>.brand:hover{color:red}.foot{margin:0}[data-reveal]{animation:rise 1s}"
+            "[data-other]{opacity:0}@keyframes rise{from{opacity:0}to{opacity:1}}@keyframes spin{to{rotate:1turn}}"
+            "@media (max-width:760px){.foot{padding:0}.top{padding:0}}:is(.foot,.top) a{color:blue}"
+        )
+
+        self.assertEqual(
+            critical_css.extract_critical_css(css, used),
+            ":root{--ink:#111}.top>.brand:hover{color:red}[data-reveal]{animation:rise 1s}"
+            "@keyframes rise{from{opacity:0}to{opacity:1}}@media (max-width:760px){.top{padding:0}}"
+            ":is(.foot,.top) a{color:blue}",
+        )
+
+    def test_command_inlines_css_for_every_page_template_and_defers_the_stylesheet(self):
+        manifest_path = self.work_dir / "critical-css.json"
+        with override_settings(CRITICAL_CSS_MANIFEST_PATH=manifest_path):
+            call_command("build_critical_css", stdout=StringIO())
+
+        styles = json.loads(manifest_path.read_text(encoding="utf-8"))["styles"]
+        templates_dir = Path(__file__).resolve().parent / "templates" / "pages"
+        self.assertEqual(
+            set(styles),
+            {f"pages/{path.name}" for path in templates_dir.glob("*.html") if path.name != "base.html"},
+        )
+        self.assertIn(".shell-top{", styles["pages/cv.html"])
+        self.assertNotIn(".cv-doc-layout{", styles["pages/home.html"])
+
+        caches["pages"].clear()
+        response = self.client.get(reverse("cv"))
+        self.assertContains(response, f"<style>{styles['pages/cv.html']}</style>", html=False)
+        self.assertContains(response, '<link rel="preload" href="/static/pages/site.css" as="style"', html=False)
+        self.assertContains(response, '<noscript><link rel="stylesheet" href="/static/pages/site.css" /></noscript>')
+
+        critical_css.critical_styles.load(None)
+        caches["pages"].clear()
+        response = self.client.get(reverse("cv"))
+        self.assertNotContains(response, "<style>")
+        self.assertContains(response, '<link rel="stylesheet" href="/static/pages/site.css" />', html=False)
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self._reset_page_cache()
+        self.addCleanup(self._reset_page_cache)
+
+    def _reset_page_cache(self):
+        caches["pages"].clear()
+        page_cache.clear_content_version()
+
+    def test_feed_uses_the_newest_post_date_and_answers_polls_with_304(self):
+        first = self.client.get(reverse("feed-xml"))
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["Content-Type"], "application/atom+xml; charset=utf-8")
+        self.assertFalse(first["ETag"].startswith("W/"))
+        self.assertEqual(first["Last-Modified"], "Mon, 02 Mar 2026 00:00:00 GMT")
+        self.assertContains(first, "<id>https://sam-osian.com/rethinking-significance/</id>")
+        self.assertContains(first, "<author><name>Dan Joyce</name></author>")
+        self.assertContains(first, "&lt;p&gt;In research, the p-value")
+
+        with mock.patch("pages.views._feed_xml_content") as render_feed:
+            by_etag = self.client.get(reverse("feed-xml"), HTTP_IF_NONE_MATCH=first["ETag"])
+            by_date = self.client.get(reverse("feed-xml"), HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        render_feed.assert_not_called()
+        self.assertEqual(by_etag.status_code, 304)
+        self.assertEqual(by_date.status_code, 304)
+
+    def test_pages_advertise_the_feed_at_its_routed_url(self):
+        response = self.client.get(reverse("cv"))
+
+        self.assertContains(
+            response,
+            f'<link rel="alternate" type="application/atom+xml" title="Sam Osian" href="{reverse("feed-xml")}" />',
+            html=True,
+        )
+
+    def test_repeat_requests_are_served_without_rendering(self):
+        first = self.client.get(reverse("cv"))
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", first)
+
+        with mock.patch("pages.views.load_cv") as load_cv:
+            second = self.client.get(reverse("cv"))
+
+        load_cv.assert_not_called()
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_only_the_query_params_views_read_are_part_of_the_key(self):
+        factory = RequestFactory()
+        version = page_cache.ContentVersion(fingerprint="v", last_modified=0)
+
+        def key(url):
+            return page_cache._cache_key(factory.get(url), version)
+
+        self.assertEqual(len({key("/"), key("/?utm_source=x"), key("/?utm_source=y")}), 1)
+        self.assertEqual(key("/tags/a/?after=p&utm_source=x"), key("/tags/a/?utm_source=y&after=p"))
+        self.assertEqual(len({key("/tags/a/"), key("/tags/a/?after=p"), key("/tags/a/?after=q")}), 3)
+        self.assertNotEqual(key("/tags/a/?after=p"), key("/tags/a/?before=p"))
+
+        self.client.get(reverse("cv"))
+        with mock.patch("pages.views.load_cv") as load_cv:
+            tagged = self.client.get(reverse("cv"), {"utm_source": "newsletter"})
+        load_cv.assert_not_called()
+        self.assertEqual(tagged.status_code, 200)
+
+    def test_conditional_requests_get_not_modified(self):
+        first = self.client.get(reverse("post-detail", kwargs={"slug": "rethinking-significance"}))
+
+        by_etag = self.client.get(
+            reverse("post-detail", kwargs={"slug": "rethinking-significance"}),
+            HTTP_IF_NONE_MATCH=first["ETag"],
+        )
+        self.assertEqual(by_etag.status_code, 304)
+        self.assertEqual(by_etag.content, b"")
+        self.assertEqual(by_etag["ETag"], first["ETag"])
+
+        by_date = self.client.get(reverse("sitemap-xml"))
+        revalidated = self.client.get(reverse("sitemap-xml"), HTTP_IF_MODIFIED_SINCE=by_date["Last-Modified"])
+        self.assertEqual(revalidated.status_code, 304)
+
+        stale = self.client.get(reverse("sitemap-xml"), HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(stale.status_code, 200)
+
+    def test_head_requests_return_headers_only(self):
+        full = self.client.get(reverse("about"))
+        head = self.client.head(reverse("about"))
+
+        self.assertEqual(head.status_code, 200)
+        self.assertEqual(head.content, b"")
+        self.assertEqual(head["Content-Length"], str(len(full.content)))
+        self.assertEqual(head["ETag"], full["ETag"])
+
+    def test_cached_pages_are_served_precompressed_by_accept_encoding(self):
+        import brotli
+
+        plain = self.client.get(reverse("cv"))
+        with mock.patch("pages.page_cache._compress_variants") as compress:
+            br = self.client.get(reverse("cv"), HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+            gzipped = self.client.get(reverse("cv"), HTTP_ACCEPT_ENCODING="gzip, br;q=0")
+            identity = self.client.get(reverse("cv"), HTTP_ACCEPT_ENCODING="identity")
+        compress.assert_not_called()
+
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertEqual(plain["Vary"], "Accept-Encoding")
+        self.assertEqual(br["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(br.content), plain.content)
+        self.assertEqual(br["Content-Length"], str(len(br.content)))
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(gzipped.content), plain.content)
+        self.assertEqual(identity.content, plain.content)
+        self.assertEqual(len({plain["ETag"], br["ETag"], gzipped["ETag"]}), 3)
+
+        revalidated = self.client.get(reverse("cv"), HTTP_ACCEPT_ENCODING="br", HTTP_IF_NONE_MATCH=br["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated["Vary"], "Accept-Encoding")
+
+    def test_small_and_per_request_pages_are_compressed_appropriately(self):
+        robots = self.client.get(reverse("robots-txt"), HTTP_ACCEPT_ENCODING="br, gzip")
+        self.assertNotIn("Content-Encoding", robots)
+
+        home = self.client.get(reverse("home"), HTTP_ACCEPT_ENCODING="br, gzip")
+        self.assertEqual(home["Content-Encoding"], "gzip")
+        self.assertNotIn("ETag", home)
+        body = gzip.decompress(home.content)
+        self.assertNotIn(views.CONTACT_CSRF_TOKEN_PLACEHOLDER.encode(), body)
+
+    def test_content_version_change_invalidates_cached_pages(self):
+        first = self.client.get(reverse("robots-txt"))
+        version = page_cache.ContentVersion(fingerprint="changed", last_modified=0)
+
+        with (
+            mock.patch.object(page_cache, "get_content_version", return_value=version),
+            mock.patch("pages.views._full_url", return_value="https://example.com/sitemap.xml"),
+        ):
+            second = self.client.get(reverse("robots-txt"))
+
+        self.assertIn(b"https://example.com/sitemap.xml", second.content)
+        self.assertNotEqual(second["ETag"], first["ETag"])
+
+    def test_home_is_cached_with_fresh_form_tokens(self):
+        first = self.client.get(reverse("home"))
+        with mock.patch("pages.views.get_post_index") as get_post_index, mock.patch("pages.views.time.time", return_value=time.time() + 60):
+            second = self.client.get(reverse("home"))
+
+        get_post_index.assert_not_called()
+        self.assertEqual(second["Cache-Control"], page_cache.PER_REQUEST_CACHE_CONTROL)
+        self.assertNotIn("ETag", second)
+        self.assertNotIn("Last-Modified", second)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, second.cookies)
+        self.assertNotContains(second, views.CONTACT_FORM_TOKEN_PLACEHOLDER)
+        self.assertNotContains(second, views.CONTACT_CSRF_TOKEN_PLACEHOLDER)
+        self.assertNotEqual(
+            PageRouteTests._contact_form_token_from(self, second),
+            PageRouteTests._contact_form_token_from(self, first),
+        )
+
+    def test_conditional_requests_for_home_get_the_full_page_with_a_fresh_token(self):
+        first = self.client.get(reverse("home"))
+        with mock.patch("pages.views.time.time", return_value=time.time() + 60):
+            revalidated = self.client.get(
+                reverse("home"),
+                HTTP_IF_NONE_MATCH="*",
+                HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 3600),
+            )
+
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertNotEqual(
+            PageRouteTests._contact_form_token_from(self, revalidated),
+            PageRouteTests._contact_form_token_from(self, first),
+        )
+
+    def test_pages_that_touch_the_session_are_not_cached(self):
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "returning-visitor"
+        response = self.client.get(reverse("home"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+
+
+def _hit_rate_limiter(db_path, hits):
+    limiter = rate_limit.SQLiteRateLimiter(db_path)
+    for _ in range(hits):
+        limiter.hit("shared", windows=(60,))
+
+
+class RateLimiterTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        self.limiter = rate_limit.SQLiteRateLimiter(self.work_dir / "rate-limits.sqlite3")
+
+    def test_counts_each_window_from_one_hit(self):
+        now = time.time()
+        with mock.patch("pages.rate_limit.time.time", return_value=now - 120):
+            self.assertEqual(self.limiter.hit("ip", windows=(60, 600)), [1, 1])
+        with mock.patch("pages.rate_limit.time.time", return_value=now):
+            self.assertEqual(self.limiter.hit("ip", windows=(60, 600)), [1, 2])
+            self.assertEqual(self.limiter.hit("other-ip", windows=(60, 600)), [1, 1])
+
+    def test_expired_hits_are_pruned(self):
+        now = time.time()
+        with mock.patch("pages.rate_limit.time.time", return_value=now - 700):
+            self.limiter.hit("ip", windows=(60, 600))
+        with mock.patch("pages.rate_limit.time.time", return_value=now):
+            self.assertEqual(self.limiter.hit("ip", windows=(60, 600)), [1, 1])
+
+    def _stored_hits(self):
+        rows = self.limiter.database.connection().execute("SELECT key, COUNT(*) FROM rate_limit_hits GROUP BY key")
+        return dict(rows.fetchall())
+
+    def test_each_hit_prunes_only_its_own_key_by_its_own_windows(self):
+        now = time.time()
+        with mock.patch("pages.rate_limit.time.time", return_value=now - 120):
+            self.limiter.hit("short", windows=(60,))
+            self.limiter.hit("long", windows=(600,))
+        with mock.patch("pages.rate_limit.time.time", return_value=now):
+            self.assertEqual(self.limiter.hit("short", windows=(60,)), [1])
+
+        self.assertEqual(self._stored_hits(), {"short": 1, "long": 1})
+
+    def test_idle_keys_are_swept_after_the_longest_window_any_worker_uses(self):
+        other_worker = rate_limit.SQLiteRateLimiter(self.limiter.database.path)
+        now = time.time()
+        with mock.patch("pages.rate_limit.time.time", return_value=now - 700):
+            self.limiter.hit("gone", windows=(60, 600))
+        with mock.patch("pages.rate_limit.time.time", return_value=now - 120):
+            self.limiter.hit("recent", windows=(60, 600))
+        with mock.patch("pages.rate_limit.time.time", return_value=now):
+            other_worker.hit("short-only", windows=(60,))
+
+        self.assertEqual(self._stored_hits(), {"recent": 1, "short-only": 1})
+
+    def test_hits_from_separate_processes_are_all_counted(self):
+        db_path = self.work_dir / "rate-limits.sqlite3"
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_hit_rate_limiter, args=(db_path, 25)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+            self.assertEqual(worker.exitcode, 0)
+
+        self.assertEqual(self.limiter.hit("shared", windows=(60,)), [101])
+
+    @override_settings(CONTACT_RATE_LIMIT_BACKEND="pages.rate_limit.CacheRateLimiter", CONTACT_RATE_LIMIT_OPTIONS={})
+    def test_backend_is_configurable(self):
+        limiter = rate_limit.get_rate_limiter()
+        self.assertIsInstance(limiter, rate_limit.CacheRateLimiter)
+        limiter.reset()
+        self.assertEqual(limiter.hit("ip", windows=(60, 600)), [1, 1])
+        self.assertEqual(limiter.hit("ip", windows=(60, 600)), [2, 2])
+
+    def test_backend_is_built_with_the_configured_options(self):
+        db_path = self.work_dir / "configured.sqlite3"
+        with override_settings(
+            CONTACT_RATE_LIMIT_BACKEND="pages.rate_limit.SQLiteRateLimiter",
+            CONTACT_RATE_LIMIT_OPTIONS={"path": db_path},
+        ):
+            limiter = rate_limit.get_rate_limiter()
+
+        self.assertIsInstance(limiter, rate_limit.SQLiteRateLimiter)
+        self.assertEqual(limiter.database.path, db_path)
+
+    def test_cache_limiter_reset_leaves_other_cache_entries(self):
+        limiter = rate_limit.CacheRateLimiter()
+        cache.set("unrelated", "kept")
+        self.addCleanup(cache.delete, "unrelated")
+        limiter.hit("ip", windows=(60,))
+
+        limiter.reset()
+        self.assertEqual(cache.get("unrelated"), "kept")
+        self.assertEqual(limiter.hit("ip", windows=(60,)), [1])
+
+    def test_base_class_cannot_be_instantiated(self):
+        with self.assertRaises(TypeError):
+            rate_limit.RateLimiter()
+
+
+class _SMTPStandInHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.connections += 1
+        self._reply("220 localhost ready")
+        while line := self.rfile.readline():
+            command = line.decode("ascii", "replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self._reply("250 localhost")
+            elif command == "DATA":
+                self._reply("354 end with .")
+                lines = []
+                while (data_line := self.rfile.readline()) not in (b".\r\n", b""):
+                    lines.append(data_line)
+                self.server.messages.append(b"".join(lines))
+                self._reply("250 queued")
+            elif command == "QUIT":
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("250 ok")
+
+    def _reply(self, text):
+        self.wfile.write(f"{text}\r\n".encode("ascii"))
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        self.outbox = outbox.EmailOutbox(self.work_dir / "outbox.sqlite3")
+
+        self.smtp = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPStandInHandler)
+        self.smtp.daemon_threads = True
+        self.smtp.connections = 0
+        self.smtp.messages = []
+        threading.Thread(target=self.smtp.serve_forever, daemon=True).start()
+        self.addCleanup(self.smtp.server_close)
+        self.addCleanup(self.smtp.shutdown)
+
+        smtp_settings = override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=self.smtp.server_address[1],
+            EMAIL_HOST_USER="",
+            EMAIL_HOST_PASSWORD="",
+            EMAIL_USE_TLS=False,
+            EMAIL_USE_SSL=False,
+        )
+        smtp_settings.enable()
+        self.addCleanup(smtp_settings.disable)
+
+    def _message(self, number):
+        return mail.EmailMessage(
+            subject=f"Message {number}",
+            body="Hello",
+            from_email="website@sam-osian.com",
+            to=["samoand@liverpool.ac.uk"],
+            reply_to=["visitor@example.com"],
+        )
+
+    def test_batch_is_sent_over_one_smtp_connection(self):
+        for number in range(3):
+            self.outbox.enqueue(self._message(number))
+
+        result = self.outbox.drain()
+
+        self.assertEqual(result.sent, 3)
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.assertIn(b"Reply-To: visitor@example.com", self.smtp.messages[0])
+        self.assertEqual(self.outbox.pending_count(), 0)
+
+    def _unreachable_port(self):
+        unreachable = socketserver.TCPServer(("127.0.0.1", 0), socketserver.BaseRequestHandler)
+        unreachable.server_close()
+        return unreachable.server_address[1]
+
+    def test_failed_sends_are_retried_with_backoff(self):
+        self.outbox.enqueue(self._message(1))
+
+        with self.assertLogs("pages.outbox", level="WARNING"), override_settings(EMAIL_PORT=self._unreachable_port()):
+            result = self.outbox.drain()
+        self.assertEqual((result.sent, result.retried), (0, 1))
+        self.assertEqual(self.outbox.pending_count(), 1)
+        self.assertEqual(self.outbox.drain().sent, 0)
+
+        later = time.time() + outbox.OUTBOX_RETRY_BASE_SECONDS + 1
+        with mock.patch("pages.outbox.time.time", return_value=later):
+            self.assertEqual(self.outbox.drain().sent, 1)
+        self.assertEqual(len(self.smtp.messages), 1)
+
+    def test_messages_are_abandoned_after_max_attempts(self):
+        self.outbox.enqueue(self._message(1))
+        now = time.time()
+        with (
+            self.assertLogs("pages.outbox", level="WARNING") as logs,
+            override_settings(EMAIL_PORT=self._unreachable_port()),
+        ):
+            for attempt in range(outbox.OUTBOX_MAX_ATTEMPTS):
+                with mock.patch("pages.outbox.time.time", return_value=now + attempt * outbox.OUTBOX_RETRY_MAX_SECONDS):
+                    self.outbox.drain()
+
+        self.assertEqual(self.outbox.pending_count(), 0)
+        self.assertEqual(self.outbox.failed_count(), 1)
+        self.assertTrue(any("Giving up" in entry for entry in logs.output))
+
+    def _sender_settings(self):
+        return override_settings(
+            CONTACT_OUTBOX_DB_PATH=self.outbox.database.path,
+            CONTACT_OUTBOX_SENDER_THREAD=True,
+            CONTACT_OUTBOX_POLL_SECONDS=3600,
+        )
+
+    def test_server_start_up_sends_mail_queued_before_a_restart(self):
+        self.outbox.enqueue(self._message(1))
+
+        with (
+            self._sender_settings(),
+            mock.patch.object(outbox, "_sender", None),
+            mock.patch.object(outbox, "_fork_hook_registered", False),
+            mock.patch("pages.outbox.os.register_at_fork") as register_at_fork,
+        ):
+            outbox.start_sender_in_server_processes()
+            deadline = time.monotonic() + 10
+            while self.outbox.pending_count() and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+        register_at_fork.assert_called_once_with(after_in_child=outbox._start_sender_after_fork)
+        self.assertEqual(self.outbox.pending_count(), 0)
+        self.assertEqual(len(self.smtp.messages), 1)
+
+    def test_a_forked_worker_starts_its_own_sender(self):
+        with (
+            self._sender_settings(),
+            mock.patch.object(outbox, "_sender", None),
+            mock.patch.object(outbox, "_sender_pid", None),
+            mock.patch.object(outbox, "_outbox_lock", threading.Lock()),
+        ):
+            parent_sender = outbox.start_sender()
+            # As seen from a child process, the parent's thread belongs to another pid.
+            outbox._sender_pid = -1
+            outbox._start_sender_after_fork()
+
+            self.assertIsNot(outbox._sender, parent_sender)
+            self.assertTrue(outbox._sender.is_alive())
+            self.assertEqual(outbox._sender_pid, os.getpid())
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        caches["pages"].clear()
+        self.addCleanup(caches["pages"].clear)
+        self.addCleanup(content.set_content_snapshot, content.get_content_snapshot())
+
+    async def test_async_views_render_the_same_pages(self):
+        request = AsyncRequestFactory().get("/rethinking-significance/")
+        async_response = await async_views.post_detail(request, slug="rethinking-significance")
+        await caches["pages"].aclear()
+        sync_response = await sync_to_async(views.post_detail)(
+            RequestFactory().get("/rethinking-significance/"), slug="rethinking-significance"
+        )
+
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.content, sync_response.content)
+
+    async def test_content_version_rescan_runs_off_the_event_loop(self):
+        await sync_to_async(page_cache.clear_content_version)()
+        loop_thread = threading.get_ident()
+        scan_threads = []
+        real_scan = page_cache._scan_content_version
+
+        def scan():
+            scan_threads.append(threading.get_ident())
+            return real_scan()
+
+        with mock.patch("pages.page_cache._scan_content_version", side_effect=scan):
+            response = await async_views.cv(AsyncRequestFactory().get("/cv/"))
+            await async_views.cv(AsyncRequestFactory().get("/cv/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(scan_threads), 1)
+        self.assertNotEqual(scan_threads[0], loop_thread)
+
+    async def test_snapshot_content_is_read_without_a_thread_hop(self):
+        content.set_content_snapshot(content.compile_content_snapshot())
+
+        with mock.patch("pages.async_views.sync_to_async") as to_thread:
+            response = await async_views.cv(AsyncRequestFactory().get("/cv/"))
+
+        to_thread.assert_not_called()
+        self.assertContains(response, "Data Scientist")
+
+    @override_settings(REDIRECT_WWW_TO_APEX=True, CANONICAL_HOST="sam-osian.com", ALLOWED_HOSTS=["www.sam-osian.com"])
+    async def test_canonical_host_middleware_runs_natively_async(self):
+        async def get_response(request):
+            return HttpResponse("apex")
+
+        middleware = CanonicalHostRedirectMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        response = await middleware(RequestFactory().get("/cv/", HTTP_HOST="www.sam-osian.com"))
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response["Location"], "http://sam-osian.com/cv/")
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        caches["pages"].clear()
+        self.addCleanup(caches["pages"].clear)
+
+    def test_timing_is_off_by_default(self):
+        response = self.client.get(reverse("cv"))
+
+        self.assertNotIn("Server-Timing", response)
+        with self.assertRaises(MiddlewareNotUsed):
+            timing.ServerTimingMiddleware(lambda request: HttpResponse())
+        with timing.span("render"):
+            self.assertIsNone(timing.current_timing())
+
+    @override_settings(SERVER_TIMING_ENABLED=True)
+    def test_header_and_log_line_report_the_request_spans(self):
+        client = Client()
+        with self.assertLogs("pages.timing", "INFO") as logs:
+            miss = client.get(reverse("cv"))
+            hit = client.get(reverse("cv"))
+
+        self.assertRegex(miss["Server-Timing"], r'page_cache;dur=[\d.]+;desc="miss"')
+        self.assertRegex(miss["Server-Timing"], r"render;dur=[\d.]+")
+        self.assertRegex(miss["Server-Timing"], r"total;dur=[\d.]+$")
+        self.assertIn('desc="hit"', hit["Server-Timing"])
+        self.assertNotIn("render;", hit["Server-Timing"])
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["event"], "request_timing")
+        self.assertEqual((line["method"], line["path"], line["status"]), ("GET", "/cv/", 200))
+        self.assertEqual(line["spans"]["render"]["count"], 1)
+        self.assertGreaterEqual(line["total_ms"], line["spans"]["render"]["ms"])
+
+    def test_repeated_spans_are_summed(self):
+        request_timing = timing.RequestTiming()
+        request_timing.record("markdown", 1.25)
+        request_timing.record("markdown", 2.5)
+        request_timing.record("page_cache", 0.1, "hit")
+
+        self.assertEqual(
+            request_timing.header_value(5.0),
+            'markdown;dur=3.8;desc="2 calls", page_cache;dur=0.1;desc="hit", total;dur=5.0',
+        )
+
+    @override_settings(SERVER_TIMING_ENABLED=True)
+    async def test_middleware_times_async_views(self):
+        async def get_response(request):
+            with timing.span("search"):
+                pass
+            return HttpResponse("ok")
+
+        middleware = timing.ServerTimingMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        with self.assertLogs("pages.timing", "INFO"):
+            response = await middleware(AsyncRequestFactory().get("/search/"))
+        self.assertRegex(response["Server-Timing"], r"^search;dur=[\d.]+, total;dur=[\d.]+$")
+
+
+def _count_in_worker(hits):
+    for _ in range(hits):
+        metrics.inc("pages_contact_blocks_total", reason="honeypot")
+    metrics.get_metrics().flush()
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        caches["pages"].clear()
+        self.addCleanup(caches["pages"].clear)
+        registry_patch = mock.patch.object(metrics, "_registry", None)
+        registry_patch.start()
+        self.addCleanup(registry_patch.stop)
+        self.addCleanup(lambda: metrics._registry and metrics._registry.stop_flusher())
+        settings_override = override_settings(
+            METRICS_ENABLED=True,
+            METRICS_DB_PATH=self.work_dir / "metrics.sqlite3",
+            METRICS_ALLOWED_IPS=["127.0.0.1"],
+            METRICS_TOKEN="scrape-token",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _scrape(self, **extra) -> str:
+        response = Client().get(reverse("metrics"), **extra)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], metrics.PROMETHEUS_CONTENT_TYPE)
+        return response.content.decode()
+
+    def test_endpoint_is_missing_unless_enabled(self):
+        with override_settings(METRICS_ENABLED=False):
+            self.assertIsNone(metrics.get_metrics())
+            self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+            with self.assertRaises(MiddlewareNotUsed):
+                metrics.MetricsMiddleware(lambda request: HttpResponse())
+
+    def test_scrapes_need_an_allowed_address_or_the_token(self):
+        client = Client()
+        self.assertEqual(client.get(reverse("metrics"), REMOTE_ADDR="203.0.113.9").status_code, 403)
+        self.assertEqual(
+            client.get(reverse("metrics"), REMOTE_ADDR="203.0.113.9", HTTP_X_FORWARDED_FOR="127.0.0.1").status_code,
+            403,
+        )
+        self.assertEqual(
+            client.get(reverse("metrics"), REMOTE_ADDR="203.0.113.9", HTTP_AUTHORIZATION="Bearer wrong").status_code,
+            403,
+        )
+        self._scrape(REMOTE_ADDR="203.0.113.9", HTTP_AUTHORIZATION="Bearer scrape-token")
+
+    @override_settings(SECURE_SSL_REDIRECT=True)
+    def test_plain_http_scrapes_are_redirected_before_the_token_is_checked(self):
+        response = Client().get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-token")
+
+        self.assertEqual(response.status_code, 301)
+        self.assertTrue(response["Location"].startswith("https://"))
+
+    def test_reports_view_latency_cache_lookups_and_markdown_renders(self):
+        client = Client()
+        post_url = reverse("post-detail", kwargs={"slug": "rethinking-significance"})
+        client.get(post_url)
+        client.get(post_url)
+        client.get(reverse("sitemap-xml"))
+        client.get(reverse("cv"))
+        content._render_markdown("Some *text*.")
+
+        exposition = self._scrape()
+        self.assertIn("# TYPE pages_view_latency_seconds histogram", exposition)
+        self.assertIn('pages_view_latency_seconds_bucket{view="post_detail",le="+Inf"} 2', exposition)
+        self.assertIn('pages_view_latency_seconds_count{view="post_detail"} 2', exposition)
+        self.assertIn('pages_view_latency_seconds_count{view="sitemap_xml"} 1', exposition)
+        self.assertNotIn('view="cv"', exposition)
+        self.assertIn('pages_page_cache_lookups_total{result="hit"} 1', exposition)
+        self.assertIn('pages_page_cache_lookups_total{result="miss"} 3', exposition)
+        self.assertRegex(exposition, r"pages_markdown_render_seconds_count [1-9]\d*\n")
+
+        buckets = re.findall(r'pages_view_latency_seconds_bucket\{view="post_detail",le="([^"]+)"\} (\d+)', exposition)
+        bounds = [float(bound) for bound, _ in buckets]
+        self.assertEqual(bounds, sorted(bounds))
+        counts = [int(count) for _, count in buckets]
+        self.assertEqual(counts, sorted(counts))
+
+    def test_requests_only_count_in_memory_and_the_flusher_writes(self):
+        db_path = self.work_dir / "flushed.sqlite3"
+        registry = metrics.MetricsRegistry(db_path, flush_seconds=0.05)
+        registry.inc("pages_post_index_builds_total")
+        self.assertFalse(db_path.exists())
+
+        registry.start_flusher()
+        self.addCleanup(registry.stop_flusher)
+        rows = []
+        deadline = time.monotonic() + 10
+        while not rows and time.monotonic() < deadline:
+            time.sleep(0.02)
+            rows = registry.database.connection().execute("SELECT name, value FROM metric_samples").fetchall()
+        self.assertEqual(rows, [("pages_post_index_builds_total", 1.0)])
+
+    def test_contact_blocks_are_counted_by_reason(self):
+        with self.assertLogs("pages.contact_protection", level="WARNING"):
+            views._log_contact_block("honeypot", RequestFactory().post("/"))
+            views._log_contact_block("too_fast", RequestFactory().post("/"), elapsed_seconds=1)
+            views._log_contact_block("too_fast", RequestFactory().post("/"), elapsed_seconds=2)
+
+        exposition = self._scrape()
+        self.assertIn('pages_contact_blocks_total{reason="honeypot"} 1', exposition)
+        self.assertIn('pages_contact_blocks_total{reason="too_fast"} 2', exposition)
+
+    def test_counts_from_separate_workers_are_summed(self):
+        metrics.inc("pages_contact_blocks_total", reason="honeypot")
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_count_in_worker, args=(10,)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+            self.assertEqual(worker.exitcode, 0)
+
+        # The count made before the fork is written once, by this process, not again by each worker.
+        self.assertIn('pages_contact_blocks_total{reason="honeypot"} 31', self._scrape())
+
+    async def test_async_endpoint_serves_the_same_exposition(self):
+        metrics.inc("pages_post_index_builds_total")
+
+        response = await async_views.metrics(AsyncRequestFactory().get("/metrics", REMOTE_ADDR="127.0.0.1"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"pages_post_index_builds_total 1\n", response.content)
+
+
+class WarmupTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        warmup.reset_warmup_state()
+        self.addCleanup(warmup.reset_warmup_state)
+        caches["pages"].clear()
+        self.addCleanup(caches["pages"].clear)
+        patcher = mock.patch("pages.warmup.gc.freeze")
+        self.freeze = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(CANONICAL_HOST="sam-osian.com", ALLOWED_HOSTS=["sam-osian.com", "testserver"])
+    def test_warm_up_primes_the_page_cache_for_the_canonical_host(self):
+        state = warmup.warm_up()
+
+        self.assertEqual(state.status, "ready")
+        self.assertIsNotNone(state.duration_seconds)
+        self.freeze.assert_called_once()
+        with mock.patch("pages.views._cv_context") as build_context:
+            response = views.cv(
+                RequestFactory().get("/cv/", HTTP_HOST="sam-osian.com", HTTP_X_FORWARDED_PROTO="https")
+            )
+        build_context.assert_not_called()
+        self.assertContains(response, "Data Scientist")
+
+    def test_warm_up_records_failure_without_raising(self):
+        with mock.patch("pages.content.load_cv", side_effect=ValueError("bad cv")):
+            state = warmup.warm_up()
+
+        self.assertEqual(state.status, "failed")
+        self.assertEqual(state.error, "bad cv")
+        self.freeze.assert_not_called()
+
+    def test_readiness_reports_503_until_warm_up_has_finished(self):
+        with mock.patch("pages.views.warm_up_in_background") as start_warmup:
+            response = self.client.get(reverse("readiness"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "pending")
+        start_warmup.assert_called_once()
+
+        warmup.warm_up()
+        response = self.client.get(reverse("readiness"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "ready")
+        self.assertEqual(response["Cache-Control"], "no-store")
+
+    def test_readiness_reports_a_failed_warm_up_without_leaving_rotation(self):
+        with mock.patch("pages.content.load_cv", side_effect=ValueError("bad cv")), self.assertLogs("pages.warmup"):
+            warmup.warm_up()
+
+        response = self.client.get(reverse("readiness"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "failed")
+        self.assertEqual(response.json()["error"], "bad cv")
+        self.assertContains(self.client.get(reverse("cv")), "Data Scientist")
+
+
+class ImportTimeBudgetTests(TestCase):
+    # Boot cost of a worker: the WSGI app plus the URLconf it loads on the first request.
+    # Measured around 300 ms on a dev container, nearly all of it Django itself.
+    STARTUP_IMPORT_BUDGET_MS = 1000
+    DEFERRED_MODULES = {"markdown", "pymdownx", "yaml", "PIL"}
+
+    def _import_times(self) -> dict[str, int]:
+        env = {
+            **os.environ,
+            "DEBUG": "false",
+            "SECRET_KEY": "import-time-test",
+            "CONTENT_WARMUP": "false",
+            "CONTACT_OUTBOX_SENDER_THREAD": "false",
+            "DJANGO_SETTINGS_MODULE": "config.settings",
+        }
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import config.wsgi, pages.urls"],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        times = {}
+        for line in result.stderr.splitlines():
+            match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)$", line)
+            if match:
+                cumulative_us, indent, module = match.groups()
+                times[module] = (int(cumulative_us), len(indent))
+        return times
+
+    def test_startup_does_not_import_content_dependencies(self):
+        imported = {module.split(".", 1)[0] for module in self._import_times()}
+        self.assertFalse(imported & self.DEFERRED_MODULES)
+
+    def test_startup_import_time_is_within_budget(self):
+        # Best of three, so one slow run on a busy machine doesn't fail the suite.
+        totals_ms = []
+        for _ in range(3):
+            times = self._import_times()
+            totals_ms.append(sum(cumulative for cumulative, indent in times.values() if indent == 0) / 1000)
+        self.assertLess(min(totals_ms), self.STARTUP_IMPORT_BUDGET_MS)
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.work_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.work_dir)
+
+    def test_command_writes_comparable_results_and_restores_content(self):
+        posts_dir = content.POSTS_DIR
+        output_path = self.work_dir / "results.json"
+
+        call_command(
+            "benchmark_content", "--sizes", "2", "--repeat", "1", "--output", str(output_path), stdout=StringIO()
+        )
+
+        document = json.loads(output_path.read_text(encoding="utf-8"))
+        self.assertEqual(document["format_version"], benchmarks.BENCHMARK_FORMAT_VERSION)
+        keys = {(row["name"], row["size"], row["mode"]) for row in document["results"]}
+        self.assertIn(("load_posts", 2, "cold"), keys)
+        self.assertIn(("view:post_detail", 2, "warm"), keys)
+        self.assertIn(("_render_markdown", 1, "warm"), keys)
+        self.assertEqual(content.POSTS_DIR, posts_dir)
+        self.assertIsNotNone(content.get_post("rethinking-significance"))
+
+        rows = benchmarks.compare(document, document)
+        self.assertEqual(len(rows), len(document["results"]))
+        self.assertTrue(all(change == 0 for *_, change in rows))
+
+
+class ContentCorpusTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.addCleanup(content.set_content_snapshot, content.get_content_snapshot())
+        content.set_content_snapshot(None)
+        caches["pages"].clear()
+        self.addCleanup(caches["pages"].clear)
+
+    def test_generated_posts_use_every_loader_feature(self):
+        published = corpus.write_corpus(self.root, 21)
+
+        self.assertEqual(len(published), 20)
+        self.assertEqual(published, sorted(published))
+        self.assertEqual(corpus.write_corpus(Path(tempfile.mkdtemp()), 3), published[:3])
+        posts = [content._load_post(self.root / "posts" / f"generated-post-{number:05d}.md") for number in range(3)]
+        self.assertEqual([post.post_id for post in posts], [1, 2, 3])
+        self.assertEqual([post.authors for post in posts], [["sam", "dan-joyce"], ["sam"], ["sam"]])
+        self.assertTrue(all(post.tags and post.cover_image_url and post.seo_description for post in posts))
+        for post in posts:
+            self.assertTrue(post.summary_html and post.footer_html)
+            self.assertIn('class="admonition', post.main_body_html)
+            self.assertIn('class="tabbed-set', post.main_body_html)
+            self.assertIn('class="footnote"', post.main_body_html)
+
+    def test_content_root_setting_points_the_site_at_a_generated_corpus(self):
+        call_command("generate_content", "5", "--output", str(self.root), stdout=StringIO())
+
+        with override_settings(CONTENT_ROOT=self.root):
+            self.assertEqual(content.POSTS_DIR, self.root / "posts")
+            self.assertEqual([post.slug for post in content.load_posts()][0], "generated-post-00000")
+            self.assertIsNone(content.get_post("rethinking-significance"))
+            response = self.client.get(reverse("post-detail", args=["generated-post-00002"]))
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(self.client.get(reverse("cv")), "Data Scientist")
+
+        self.assertEqual(content.CONTENT_DIR, settings.CONTENT_ROOT)
+        self.assertIsNotNone(content.get_post("rethinking-significance"))
+
+    def test_changing_the_content_root_drops_the_active_snapshot(self):
+        call_command("generate_content", "3", "--output", str(self.root), stdout=StringIO())
+        self.addCleanup(content.set_content_snapshot, content.get_content_snapshot())
+        content.set_content_snapshot(content.compile_content_snapshot())
+
+        with override_settings(CONTENT_ROOT=self.root):
+            self.assertIsNone(content.get_content_snapshot())
+            self.assertEqual([post.slug for post in content.load_posts()][0], "generated-post-00000")
+            self.assertEqual(content.load_site_config(), content._read_site_config())
+
+    def test_generate_content_refuses_a_root_that_already_has_posts(self):
+        corpus.write_corpus(self.root, 1)
+        with self.assertRaises(CommandError):
+            call_command("generate_content", "1", "--output", str(self.root), stdout=StringIO())
+
+
+class PostListingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = Path(tempfile.mkdtemp())
+        cls.addClassCleanup(shutil.rmtree, cls.root)
+        # 90 daily posts back from March 2026 reach into 2025.
+        cls.published = corpus.write_corpus(cls.root, 90)
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(content.set_content_snapshot, content.get_content_snapshot())
+        content.set_content_snapshot(None)
+        root_settings = override_settings(CONTENT_ROOT=self.root)
+        root_settings.enable()
+        self.addCleanup(root_settings.disable)
+        caches["pages"].clear()
+        self.addCleanup(caches["pages"].clear)
+
+    def test_index_maps_tags_and_years_to_newest_first_positions(self):
+        index = content.get_post_index()
+        for tag, positions in index.tag_positions.items():
+            self.assertEqual(positions, sorted(set(positions)))
+            self.assertTrue(all(tag in map(slugify, index.published_posts[p].tags) for p in positions))
+        self.assertEqual(index.tag_names["original-research"], "Original research")
+        self.assertEqual(sum(map(len, index.year_positions.values())), len(self.published))
+        self.assertEqual(sorted(index.year_positions), [2025, 2026])
+
+    def test_cursor_pages_walk_the_listing_both_ways(self):
+        index = content.get_post_index()
+        positions = index.year_positions[2025]
+        expected = [index.published_posts[position].slug for position in positions]
+
+        seen, page = [], index.page(positions, size=7)
+        while True:
+            seen += [post.slug for post in page.posts]
+            if page.older_cursor is None:
+                break
+            page = index.page(positions, after=page.older_cursor, size=7)
+        self.assertEqual(seen, expected)
+
+        newer = index.page(positions, before=page.posts[0].slug, size=7)
+        self.assertEqual([post.slug for post in newer.posts], expected[-len(page.posts) - 7 : -len(page.posts)])
+        self.assertIsNone(index.page(positions, after="no-such-post"))
+        self.assertIsNone(index.page(positions, after=expected[-1]))
+
+    def test_tag_and_archive_routes_paginate_with_cursors(self):
+        response = self.client.get(reverse("tag-posts", args=["statistics"]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Posts tagged Statistics")
+        page = response.context["post_page"]
+        self.assertEqual(len(page.posts), content.POSTS_PAGE_SIZE)
+        self.assertIsNone(page.newer_cursor)
+        self.assertContains(response, f'href="/tags/statistics/?after={page.older_cursor}"')
+
+        response = self.client.get(reverse("tag-posts", args=["statistics"]), {"after": page.older_cursor})
+        self.assertEqual(response.context["post_page"].newer_cursor, response.context["post_page"].posts[0].slug)
+        self.assertContains(response, "noindex,follow")
+
+        response = self.client.get(reverse("archive-year", args=[2026]))
+        self.assertContains(response, "Posts from 2026")
+        self.assertTrue(all(post.date.year == 2026 for post in response.context["post_page"].posts))
+
+        self.assertEqual(self.client.get(reverse("tag-posts", args=["no-such-tag"])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("archive-year", args=[1999])).status_code, 404)
+        self.assertEqual(self.client.get("/archive/2026/", {"after": "no-such-post"}).status_code, 404)
+
+    def test_post_detail_links_its_tags(self):
+        post = content.get_post(self.published[0])
+        response = self.client.get(post.url)
+        tag_url = reverse("tag-posts", args=[slugify(post.tags[0])])
+        self.assertContains(response, f'<a href="{tag_url}">{post.tags[0]}</a>', html=True)
+
+    def test_post_detail_does_not_link_tags_without_a_slug(self):
+        post = dataclasses.replace(content.get_post(self.published[0]), tags=["!!!"])
+        with mock.patch.object(views, "get_post", return_value=post):
+            response = self.client.get(post.url)
+
+        self.assertContains(response, "<span>!!!</span>", html=True)
+        self.assertNotContains(response, "/tags//")
+
+
+class SearchTests(TestCase):
+    def _index(self):
+        return search.build_search_index(
+            [
+                search.SearchDocument("Coroner reports at scale", ["Open data"], "Reading every report by hand."),
+                search.SearchDocument("Rethinking significance", ["Statistics"], "The p-value and coroner data."),
+                search.SearchDocument("Unrelated", [], "Nothing to see here."),
+            ]
+        )
+
+    def test_bm25_ranks_title_matches_above_body_matches(self):
+        index = self._index()
+
+        self.assertEqual([doc for doc, _ in index.search("coroner")], [0, 1])
+        self.assertEqual([doc for doc, _ in index.search("significance")], [1])
+        self.assertEqual([doc for doc, _ in index.search("statistics")], [1])
+        self.assertEqual(index.search("the and of"), [])
+        self.assertEqual(index.search("missing"), [])
+
+    def test_postings_are_compact_arrays(self):
+        index = self._index()
+        term_id = index.term_ids["coroner"]
+
+        self.assertEqual(list(index.postings_docs[term_id]), [0, 1])
+        self.assertEqual(list(index.postings_freqs[term_id]), [search.TITLE_WEIGHT, search.BODY_WEIGHT])
+        self.assertEqual(index.postings_docs[term_id].typecode, "I")
+
+    def test_snapshot_carries_a_prebuilt_index(self):
+        self.addCleanup(content.set_content_snapshot, content.get_content_snapshot())
+        compiled = content.compile_content_snapshot()
+        content.set_content_snapshot(compiled)
+
+        with mock.patch("pages.content._build_search_index") as build:
+            results = content.get_post_index().search("p-value significance")
+
+        build.assert_not_called()
+        self.assertEqual(results[0].slug, "rethinking-significance")
+
+    def test_search_route_lists_matching_posts(self):
+        response = self.client.get(reverse("search"), {"q": "significance p-value"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([post.slug for post in response.context["results"]][0], "rethinking-significance")
+        self.assertContains(response, 'href="/rethinking-significance/"')
+        self.assertContains(response, "noindex,follow")
+        self.assertNotIn("ETag", response)
+
+        self.assertContains(self.client.get(reverse("search"), {"q": "zzzz"}), "No posts match")
+        self.assertEqual(self.client.get(reverse("search")).context["results"], [])
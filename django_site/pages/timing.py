@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+import json
+import logging
+import time
+from typing import Callable, Iterator
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.shortcuts import render as django_render
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+@dataclass
+class SpanTotal:
+    duration_ms: float = 0.0
+    count: int = 0
+    description: str | None = None
+
+
+@dataclass
+class RequestTiming:
+    started_at: float = field(default_factory=time.perf_counter)
+    spans: dict[str, SpanTotal] = field(default_factory=dict)
+
+    def record(self, name: str, duration_ms: float, description: str | None = None) -> None:
+        total = self.spans.get(name)
+        if total is None:
+            total = self.spans[name] = SpanTotal()
+        total.duration_ms += duration_ms
+        total.count += 1
+        if description is not None:
+            total.description = description
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def header_value(self, total_ms: float) -> str:
+        entries = []
+        for name, total in self.spans.items():
+            description = total.description or (f"{total.count} calls" if total.count > 1 else None)
+            entry = f"{name};dur={total.duration_ms:.1f}"
+            entries.append(f'{entry};desc="{description}"' if description else entry)
+        entries.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(entries)
+
+
+_current_timing: ContextVar[RequestTiming | None] = ContextVar("pages_request_timing", default=None)
+
+
+def current_timing() -> RequestTiming | None:
+    return _current_timing.get()
+
+
+@contextmanager
+def span(name: str, description: str | None = None) -> Iterator[None]:
+    timing = _current_timing.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.record(name, (time.perf_counter() - started) * 1000, description)
+
+
+def timed(name: str) -> Callable:
+    """Record each call of the decorated function as a span; costs one context lookup when timing is off."""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            timing = _current_timing.get()
+            if timing is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timing.record(name, (time.perf_counter() - started) * 1000)
+
+        return wrapper
+
+    return decorator
+
+
+def render(request, template_name, context=None, *args, **kwargs):
+    """``django.shortcuts.render`` timed as the ``render`` span."""
+
+    with span("render"):
+        return django_render(request, template_name, context, *args, **kwargs)
+
+
+class ServerTimingMiddleware:
+    """Collect spans for each request, then report them in a ``Server-Timing`` header and one JSON log line.
+
+    Installed only when ``SERVER_TIMING_ENABLED`` is set; otherwise Django drops it at startup.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SERVER_TIMING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing = RequestTiming()
+        token = _current_timing.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self._report(request, response, timing)
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        token = _current_timing.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self._report(request, response, timing)
+
+    @staticmethod
+    def _report(request, response, timing: RequestTiming):
+        total_ms = timing.elapsed_ms
+        response[SERVER_TIMING_HEADER] = timing.header_value(total_ms)
+        logger.info(
+            json.dumps(
+                {
+                    "event": "request_timing",
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "total_ms": round(total_ms, 2),
+                    "spans": {
+                        name: {"ms": round(total.duration_ms, 2), "count": total.count}
+                        for name, total in timing.spans.items()
+                    },
+                },
+                separators=(",", ":"),
+            )
+        )
+        return response
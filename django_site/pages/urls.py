@@ -1,14 +1,25 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views
+from . import views as sync_views
+
+# ASGI deployments serve the async variants so content reads stay on the event loop.
+views = async_views if getattr(settings, "ASYNC_VIEWS", False) else sync_views
 
 urlpatterns = [
     path("robots.txt", views.robots_txt, name="robots-txt"),
     path("sitemap.xml", views.sitemap_xml, name="sitemap-xml"),
+    path("feed.xml", views.feed_xml, name="feed-xml"),
+    path("ready/", views.readiness, name="readiness"),
+    path("metrics", views.metrics, name="metrics"),
     path("", views.home, name="home"),
     path("about/", views.about, name="about"),
     path("publications/", views.publications, name="publications"),
     path("cv/", views.cv, name="cv"),
+    path("search/", views.search, name="search"),
+    path("tags/<slug:tag>/", views.tag_posts, name="tag-posts"),
+    path("archive/<int:year>/", views.archive_year, name="archive-year"),
     path("posts/<slug:slug>/", views.post_detail, name="post-detail-with-prefix"),
     path("<slug:slug>/", views.post_detail, name="post-detail"),
 ]
@@ -1,25 +1,35 @@
+from datetime import datetime, time as datetime_time, timezone
 import logging
 import time
 from hashlib import sha256
-from xml.sax.saxutils import escape
+import hmac
+from xml.sax.saxutils import escape, quoteattr
 
 from django.conf import settings
-from django.core.cache import cache
+from django.core import signing
 from django.core.mail import EmailMessage
-from django.http import Http404, HttpResponse
-from django.shortcuts import redirect, render
+from django.http import Http404, HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import redirect
+from django.utils.http import http_date
 
 from .content import (
     AuthorProfile,
     get_post,
+    get_post_index,
     load_authors_index,
     load_cv,
     load_page,
-    load_posts,
     load_posts_config,
     load_site_config,
 )
 from .forms import ContactForm
+from .metrics import PROMETHEUS_CONTENT_TYPE, get_metrics, render_prometheus
+from .outbox import get_outbox, wake_sender
+from .page_cache import cache_page_by_content_version
+from .rate_limit import get_rate_limiter
+from .timing import render, span
+from .warmup import get_warmup_state, warm_up_in_background
 
 logger = logging.getLogger(__name__)
 contact_protection_logger = logging.getLogger("pages.contact_protection")
@@ -27,8 +37,15 @@ contact_protection_logger = logging.getLogger("pages.contact_protection")
 CONTACT_MIN_SUBMIT_SECONDS = 3
 CONTACT_RATE_LIMIT_1_MIN = 1
 CONTACT_RATE_LIMIT_10_MIN = 2
-CONTACT_FORM_RENDERED_AT_SESSION_KEY = "contact_form_rendered_at"
+CONTACT_FORM_TOKEN_FIELD = "contact_form_token"
+CONTACT_FORM_TOKEN_SALT = "pages.contact_form_rendered_at"
+CONTACT_FORM_TOKEN_PLACEHOLDER = "__contact_form_token__"
+CONTACT_CSRF_TOKEN_PLACEHOLDER = "__contact_csrf_token__"
 CONTACT_HONEYPOT_FIELD = "company_website"
+SEARCH_QUERY_MAX_LENGTH = 200
+SEARCH_RESULTS_LIMIT = 20
+FEED_ENTRY_LIMIT = 20
+FEED_TITLE = "Sam Osian"
 
 
 def _client_ip(request) -> str:
@@ -43,17 +60,27 @@ def _ip_hash(ip_address: str) -> str:
     return sha256(f"{secret}:{ip_address}".encode("utf-8")).hexdigest()[:16]
 
 
-def _increment_rate_counter(key: str, window_seconds: int) -> int:
-    if cache.add(key, 1, timeout=window_seconds):
-        return 1
+def _contact_form_token(_request) -> str:
+    return signing.dumps(int(time.time()), salt=CONTACT_FORM_TOKEN_SALT)
+
+
+def _contact_form_rendered_at(token: str) -> int | None:
     try:
-        return cache.incr(key)
-    except ValueError:
-        cache.set(key, 1, timeout=window_seconds)
-        return 1
+        rendered_at = signing.loads(
+            token,
+            salt=CONTACT_FORM_TOKEN_SALT,
+            max_age=settings.CONTACT_FORM_TOKEN_MAX_AGE_SECONDS,
+        )
+    except signing.BadSignature:
+        # Includes SignatureExpired, so a harvested token can't be replayed indefinitely.
+        return None
+    return rendered_at if isinstance(rendered_at, int) else None
 
 
 def _log_contact_block(reason: str, request, **details) -> None:
+    registry = get_metrics()
+    if registry is not None:
+        registry.inc("pages_contact_blocks_total", reason=reason)
     ip = _client_ip(request)
     hashed_ip = _ip_hash(ip)
     detail_bits = " ".join(f"{key}={value}" for key, value in details.items())
@@ -83,9 +110,19 @@ def _absolute_asset_url(request, url: str | None) -> str | None:
     return request.build_absolute_uri(url)
 
 
-def home(request):
+HOME_PER_REQUEST_FIELDS = {
+    CONTACT_CSRF_TOKEN_PLACEHOLDER: get_token,
+    CONTACT_FORM_TOKEN_PLACEHOLDER: _contact_form_token,
+}
+
+
+def _contact_form_state(request) -> tuple[ContactForm, str | None]:
     contact_form = ContactForm()
-    contact_status = request.session.pop("contact_status", None)
+    contact_status = None
+    # Only visitors redirected back from a contact submission carry a session cookie.
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        with span("session"):
+            contact_status = request.session.pop("contact_status", None)
 
     if contact_status == "validation_error":
         previous_data = request.session.pop("contact_form_data", None)
@@ -95,92 +132,99 @@ def home(request):
         else:
             contact_form = ContactForm()
 
-    if request.method == "POST" and request.POST.get("form_name") == "contact":
-        ip = _client_ip(request)
-        hashed_ip = _ip_hash(ip)
-        minute_key = f"contact_rate_limit:1m:{hashed_ip}"
-        ten_minute_key = f"contact_rate_limit:10m:{hashed_ip}"
-        per_minute_count = _increment_rate_counter(minute_key, window_seconds=60)
-        per_ten_minute_count = _increment_rate_counter(ten_minute_key, window_seconds=600)
-        if per_minute_count > CONTACT_RATE_LIMIT_1_MIN or per_ten_minute_count > CONTACT_RATE_LIMIT_10_MIN:
-            _log_contact_block(
-                "rate_limit",
-                request,
-                per_minute_count=per_minute_count,
-                per_ten_minute_count=per_ten_minute_count,
-            )
-            request.session["contact_status"] = "send_error"
-            response = redirect("home")
-            response.status_code = 303
-            return response
+    return contact_form, contact_status
 
-        honeypot_value = str(request.POST.get(CONTACT_HONEYPOT_FIELD, "")).strip()
-        if honeypot_value:
-            _log_contact_block("honeypot", request)
-            request.session["contact_status"] = "success"
-            response = redirect("home")
-            response.status_code = 303
-            return response
-
-        rendered_at = request.session.get(CONTACT_FORM_RENDERED_AT_SESSION_KEY)
-        now_ts = int(time.time())
-        if not isinstance(rendered_at, int):
-            _log_contact_block("missing_timestamp", request)
-            request.session["contact_status"] = "send_error"
-            response = redirect("home")
-            response.status_code = 303
-            return response
 
-        elapsed = now_ts - rendered_at
-        if elapsed < CONTACT_MIN_SUBMIT_SECONDS:
-            _log_contact_block("too_fast", request, elapsed_seconds=elapsed)
+def _handle_contact_submission(request):
+    ip = _client_ip(request)
+    hashed_ip = _ip_hash(ip)
+    per_minute_count, per_ten_minute_count = get_rate_limiter().hit(
+        f"contact_rate_limit:{hashed_ip}",
+        windows=(60, 600),
+    )
+    if per_minute_count > CONTACT_RATE_LIMIT_1_MIN or per_ten_minute_count > CONTACT_RATE_LIMIT_10_MIN:
+        _log_contact_block(
+            "rate_limit",
+            request,
+            per_minute_count=per_minute_count,
+            per_ten_minute_count=per_ten_minute_count,
+        )
+        request.session["contact_status"] = "send_error"
+        response = redirect("home")
+        response.status_code = 303
+        return response
+
+    honeypot_value = str(request.POST.get(CONTACT_HONEYPOT_FIELD, "")).strip()
+    if honeypot_value:
+        _log_contact_block("honeypot", request)
+        request.session["contact_status"] = "success"
+        response = redirect("home")
+        response.status_code = 303
+        return response
+
+    rendered_at = _contact_form_rendered_at(str(request.POST.get(CONTACT_FORM_TOKEN_FIELD, "")))
+    now_ts = int(time.time())
+    if rendered_at is None:
+        _log_contact_block("missing_timestamp", request)
+        request.session["contact_status"] = "send_error"
+        response = redirect("home")
+        response.status_code = 303
+        return response
+
+    elapsed = now_ts - rendered_at
+    if elapsed < CONTACT_MIN_SUBMIT_SECONDS:
+        _log_contact_block("too_fast", request, elapsed_seconds=elapsed)
+        request.session["contact_status"] = "send_error"
+        response = redirect("home")
+        response.status_code = 303
+        return response
+
+    contact_form = ContactForm(request.POST)
+    if contact_form.is_valid():
+        name = contact_form.cleaned_data["name"]
+        email = contact_form.cleaned_data["email"]
+        message = contact_form.cleaned_data["message"]
+
+        email_message = EmailMessage(
+            subject=f"New website contact from {name}",
+            body=(
+                f"Name: {name}\n"
+                f"Email: {email}\n\n"
+                "Message:\n"
+                f"{message}"
+            ),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[settings.CONTACT_EMAIL_RECIPIENT],
+            reply_to=[email],
+        )
+        try:
+            get_outbox().enqueue(email_message)
+        except Exception:
+            logger.exception("Contact form email could not be queued.")
             request.session["contact_status"] = "send_error"
             response = redirect("home")
             response.status_code = 303
             return response
-
-        contact_form = ContactForm(request.POST)
-        if contact_form.is_valid():
-            name = contact_form.cleaned_data["name"]
-            email = contact_form.cleaned_data["email"]
-            message = contact_form.cleaned_data["message"]
-
-            email_message = EmailMessage(
-                subject=f"New website contact from {name}",
-                body=(
-                    f"Name: {name}\n"
-                    f"Email: {email}\n\n"
-                    "Message:\n"
-                    f"{message}"
-                ),
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[settings.CONTACT_EMAIL_RECIPIENT],
-                reply_to=[email],
-            )
-            try:
-                email_message.send(fail_silently=False)
-                request.session["contact_status"] = "success"
-                response = redirect("home")
-                response.status_code = 303
-                return response
-            except Exception:
-                logger.exception("Contact form email send failed.")
-                request.session["contact_status"] = "send_error"
-                response = redirect("home")
-                response.status_code = 303
-                return response
-        else:
-            request.session["contact_status"] = "validation_error"
-            request.session["contact_form_data"] = {
-                "name": request.POST.get("name", ""),
-                "email": request.POST.get("email", ""),
-                "message": request.POST.get("message", ""),
-            }
-            response = redirect("home")
-            response.status_code = 303
-            return response
-
-    posts = load_posts()
+        wake_sender()
+        request.session["contact_status"] = "success"
+        response = redirect("home")
+        response.status_code = 303
+        return response
+    else:
+        request.session["contact_status"] = "validation_error"
+        request.session["contact_form_data"] = {
+            "name": request.POST.get("name", ""),
+            "email": request.POST.get("email", ""),
+            "message": request.POST.get("message", ""),
+        }
+        response = redirect("home")
+        response.status_code = 303
+        return response
+
+
+def _home_context(contact_form: ContactForm, contact_status: str | None) -> dict:
+    index = get_post_index()
+    posts = index.published_posts
     cv = load_cv()
     site_config = load_site_config()
     posts_config = load_posts_config()
@@ -195,69 +239,57 @@ def home(request):
             featured_post_id = None
     else:
         featured_post_id = None
-    featured_post = next((post for post in posts if post.post_id == featured_post_id), None)
+    featured_post = index.published_posts_by_id.get(featured_post_id)
     if featured_post is None and posts:
         featured_post = posts[0]
 
-    recent_posts = posts
+    recent_posts = posts[:4]
     if featured_post is not None:
-        non_featured_posts = [post for post in posts if post.slug != featured_post.slug]
+        non_featured_posts = [post for post in recent_posts if post.slug != featured_post.slug]
         recent_posts = non_featured_posts if non_featured_posts else [featured_post]
 
-    request.session[CONTACT_FORM_RENDERED_AT_SESSION_KEY] = int(time.time())
+    return {
+        "hero_config": site_config.get("hero", {}),
+        "featured_post": featured_post,
+        "recent_posts": recent_posts[:3],
+        "cv_entries": cv.entries[:4],
+        "cv_suggest_prior": len(cv.entries) >= 4,
+        "about_preview": str(site_config.get("about_preview", "")).strip(),
+        "contact_form": contact_form,
+        "contact_status": contact_status,
+        "contact_csrf_token": CONTACT_CSRF_TOKEN_PLACEHOLDER,
+        "contact_form_token": CONTACT_FORM_TOKEN_PLACEHOLDER,
+    }
+
+
+@cache_page_by_content_version(per_request_fields=HOME_PER_REQUEST_FIELDS, bypass_with_session=True)
+def home(request):
+    if request.method == "POST" and request.POST.get("form_name") == "contact":
+        return _handle_contact_submission(request)
 
-    return render(
-        request,
-        "pages/home.html",
-        {
-            "hero_config": site_config.get("hero", {}),
-            "featured_post": featured_post,
-            "recent_posts": recent_posts[:3],
-            "cv_entries": cv.entries[:4],
-            "cv_suggest_prior": len(cv.entries) >= 4,
-            "about_preview": str(site_config.get("about_preview", "")).strip(),
-            "contact_form": contact_form,
-            "contact_status": contact_status,
-        },
-    )
+    contact_form, contact_status = _contact_form_state(request)
+    return render(request, "pages/home.html", _home_context(contact_form, contact_status))
 
 
-def about(request):
+def _about_context() -> dict:
     site_config = load_site_config()
     cv_content = load_cv()
-    return render(
-        request,
-        "pages/about_showcase.html",
-        {
-            "about_config": site_config.get("about", {}),
-            "cv_entries": cv_content.entries[:3],
-            "cv_suggest_prior": len(cv_content.entries) >= 3,
-        },
-    )
+    return {
+        "about_config": site_config.get("about", {}),
+        "cv_entries": cv_content.entries[:3],
+        "cv_suggest_prior": len(cv_content.entries) >= 3,
+    }
 
 
-def publications(request):
-    page = load_page("publications")
-    return render(
-        request,
-        "pages/page.html",
-        {"page": page, "page_key": "publications"},
-    )
+def _publications_context() -> dict:
+    return {"page": load_page("publications"), "page_key": "publications"}
 
 
-def cv(request):
-    cv_content = load_cv()
-
-    return render(
-        request,
-        "pages/cv.html",
-        {
-            "cv": cv_content,
-        },
-    )
+def _cv_context() -> dict:
+    return {"cv": load_cv()}
 
 
-def post_detail(request, slug: str):
+def _post_detail_context(request, slug: str) -> dict:
     post = get_post(slug=slug)
     if post is None:
         raise Http404("Post not found.")
@@ -288,29 +320,121 @@ def post_detail(request, slug: str):
         ]
     )
 
-    return render(
+    return {
+        "post": post,
+        "author_profiles": author_profiles,
+        "post_cover_image_absolute_url": post_cover_image_absolute_url,
+        "post_social_image_absolute_url": post_social_image_absolute_url,
+    }
+
+
+def _post_list_context(request, positions: list[int] | None, heading: str, list_path: str) -> dict:
+    if positions is None:
+        raise Http404("No posts found.")
+    page = get_post_index().page(positions, after=request.GET.get("after"), before=request.GET.get("before"))
+    if page is None:
+        raise Http404("No posts found.")
+    return {
+        "heading": heading,
+        "list_path": list_path,
+        "post_page": page,
+        "is_first_page": page.newer_cursor is None,
+    }
+
+
+def _tag_posts_context(request, tag: str) -> dict:
+    index = get_post_index()
+    return _post_list_context(
         request,
-        "pages/post_detail.html",
-        {
-            "post": post,
-            "author_profiles": author_profiles,
-            "post_cover_image_absolute_url": post_cover_image_absolute_url,
-            "post_social_image_absolute_url": post_social_image_absolute_url,
-        },
+        index.tag_positions.get(tag),
+        f"Posts tagged {index.tag_names.get(tag, tag)}",
+        f"/tags/{tag}/",
     )
 
 
-def robots_txt(_request):
+def _archive_year_context(request, year: int) -> dict:
+    return _post_list_context(
+        request,
+        get_post_index().year_positions.get(year),
+        f"Posts from {year}",
+        f"/archive/{year}/",
+    )
+
+
+def _search_context(request) -> dict:
+    query = request.GET.get("q", "").strip()[:SEARCH_QUERY_MAX_LENGTH]
+    return {
+        "query": query,
+        "results": get_post_index().search(query, limit=SEARCH_RESULTS_LIMIT) if query else [],
+    }
+
+
+def _post_published_at(post) -> datetime | None:
+    if post.date is None:
+        return None
+    return datetime.combine(post.date, datetime_time.min, tzinfo=timezone.utc)
+
+
+def _feed_xml_content() -> tuple[str, datetime | None]:
+    """Return the Atom feed and the newest post's publication time."""
+
+    posts = get_post_index().published_posts[:FEED_ENTRY_LIMIT]
+    authors_index = load_authors_index()
+    updated = max((published for post in posts if (published := _post_published_at(post))), default=None)
+    feed_updated = (updated or datetime(2000, 1, 1, tzinfo=timezone.utc)).isoformat()
+
+    entries = []
+    for post in posts:
+        published = _post_published_at(post)
+        post_url = _full_url(post.url)
+        author_names = [authors_index[author].name if author in authors_index else author for author in post.authors]
+        authors = "".join(f"<author><name>{escape(name)}</name></author>" for name in author_names)
+        categories = "".join(f"<category term={quoteattr(tag)}/>" for tag in post.tags)
+        entries.append(
+            "<entry>"
+            f"<title>{escape(post.title)}</title>"
+            f'<link rel="alternate" type="text/html" href="{escape(post_url)}"/>'
+            f"<id>{escape(post_url)}</id>"
+            f"{f'<published>{published.isoformat()}</published>' if published else ''}"
+            f"<updated>{published.isoformat() if published else feed_updated}</updated>"
+            f"{authors}"
+            f"{categories}"
+            f'<summary type="html">{escape(post.summary_html)}</summary>'
+            "</entry>"
+        )
+
+    feed = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<feed xmlns="http://www.w3.org/2005/Atom" xml:base="{escape(_full_url("/"))}">'
+        f"<title>{escape(FEED_TITLE)}</title>"
+        f'<link rel="self" type="application/atom+xml" href="{escape(_full_url("/feed.xml"))}"/>'
+        f'<link rel="alternate" type="text/html" href="{escape(_full_url("/"))}"/>'
+        f"<id>{escape(_full_url('/'))}</id>"
+        f"<updated>{feed_updated}</updated>"
+        f"{''.join(entries)}"
+        "</feed>"
+    )
+    return feed, updated
+
+
+def _feed_response(feed: str, updated: datetime | None) -> HttpResponse:
+    response = HttpResponse(feed, content_type="application/atom+xml; charset=utf-8")
+    if updated is not None:
+        # The page cache keeps this as the page's Last-Modified instead of the file mtimes.
+        response["Last-Modified"] = http_date(updated.timestamp())
+    return response
+
+
+def _robots_txt_content() -> str:
     sitemap_url = _full_url("/sitemap.xml")
-    content = (
+    return (
         "User-agent: *\n"
         "Allow: /\n\n"
         f"Sitemap: {sitemap_url}\n"
     )
-    return HttpResponse(content, content_type="text/plain; charset=utf-8")
 
 
-def sitemap_xml(_request):
+def _sitemap_xml_content() -> str:
     urls: list[tuple[str, str, str, str | None]] = [
         (_full_url("/"), "weekly", "1.0", None),
         (_full_url("/about/"), "monthly", "0.8", None),
@@ -318,9 +442,14 @@ def sitemap_xml(_request):
         (_full_url("/publications/"), "monthly", "0.7", None),
     ]
 
-    for post in load_posts():
+    index = get_post_index()
+    for post in index.published_posts:
         lastmod = post.date.isoformat() if post.date else None
         urls.append((_full_url(post.url), "monthly", "0.7", lastmod))
+    for tag in sorted(index.tag_positions):
+        urls.append((_full_url(f"/tags/{tag}/"), "weekly", "0.5", None))
+    for year in sorted(index.year_positions, reverse=True):
+        urls.append((_full_url(f"/archive/{year}/"), "monthly", "0.5", None))
 
     body = "".join(
         (
@@ -333,10 +462,104 @@ def sitemap_xml(_request):
         )
         for loc, changefreq, priority, lastmod in urls
     )
-    xml = (
+    return (
         '<?xml version="1.0" encoding="UTF-8"?>'
         '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
         f"{body}"
         "</urlset>"
     )
-    return HttpResponse(xml, content_type="application/xml; charset=utf-8")
+
+
+@cache_page_by_content_version
+def about(request):
+    return render(request, "pages/about_showcase.html", _about_context())
+
+
+@cache_page_by_content_version
+def publications(request):
+    return render(request, "pages/page.html", _publications_context())
+
+
+@cache_page_by_content_version
+def cv(request):
+    return render(request, "pages/cv.html", _cv_context())
+
+
+@cache_page_by_content_version
+def post_detail(request, slug: str):
+    return render(request, "pages/post_detail.html", _post_detail_context(request, slug))
+
+
+@cache_page_by_content_version
+def tag_posts(request, tag: str):
+    return render(request, "pages/post_list.html", _tag_posts_context(request, tag))
+
+
+@cache_page_by_content_version
+def archive_year(request, year: int):
+    return render(request, "pages/post_list.html", _archive_year_context(request, year))
+
+
+# Not page-cached: every distinct query would take a cache slot from the real pages.
+def search(request):
+    return render(request, "pages/search.html", _search_context(request))
+
+
+@cache_page_by_content_version
+def robots_txt(_request):
+    return HttpResponse(_robots_txt_content(), content_type="text/plain; charset=utf-8")
+
+
+@cache_page_by_content_version
+def sitemap_xml(_request):
+    return HttpResponse(_sitemap_xml_content(), content_type="application/xml; charset=utf-8")
+
+
+@cache_page_by_content_version
+def feed_xml(_request):
+    return _feed_response(*_feed_xml_content())
+
+
+def _readiness_response() -> JsonResponse:
+    state = get_warmup_state()
+    if state.status == "pending":
+        warm_up_in_background()
+    body = {"status": state.status, "warmup_seconds": state.duration_seconds}
+    if state.status == "failed":
+        # The worker still serves pages, loading content lazily, so it stays in rotation.
+        body["error"] = state.error
+    return JsonResponse(
+        body,
+        status=200 if state.status in {"ready", "failed"} else 503,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def readiness(_request):
+    return _readiness_response()
+
+
+def _metrics_allowed(request) -> bool:
+    token = getattr(settings, "METRICS_TOKEN", "")
+    scheme, _, supplied = request.headers.get("Authorization", "").partition(" ")
+    if token and scheme.lower() == "bearer" and hmac.compare_digest(supplied.strip(), token):
+        return True
+    # REMOTE_ADDR rather than X-Forwarded-For, which the client controls.
+    return request.META.get("REMOTE_ADDR", "") in getattr(settings, "METRICS_ALLOWED_IPS", ())
+
+
+def _metrics_response(request) -> HttpResponse:
+    registry = get_metrics()
+    if registry is None:
+        raise Http404("Metrics are disabled.")
+    if not _metrics_allowed(request):
+        return HttpResponse("Forbidden", status=403, content_type="text/plain; charset=utf-8")
+    return HttpResponse(
+        render_prometheus(registry.samples()),
+        content_type=PROMETHEUS_CONTENT_TYPE,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def metrics(request):
+    return _metrics_response(request)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import gc
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.http.request import validate_host
+from django.template.loader import get_template
+from django.urls import reverse
+
+from . import content
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TEMPLATES = (
+    "pages/home.html",
+    "pages/about_showcase.html",
+    "pages/page.html",
+    "pages/cv.html",
+    "pages/post_detail.html",
+)
+
+
+@dataclass
+class WarmupState:
+    status: str = "pending"
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str = ""
+
+    @property
+    def duration_seconds(self) -> float | None:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+_warmup_lock = threading.Lock()
+_warmup_state = WarmupState()
+
+
+def get_warmup_state() -> WarmupState:
+    return _warmup_state
+
+
+def reset_warmup_state() -> None:
+    global _warmup_state
+    with _warmup_lock:
+        _warmup_state = WarmupState()
+
+
+def _warm_content() -> None:
+    # Without a snapshot the search index is built on first use; do it before forking.
+    content.get_post_index().search_index
+    for page_key in content.PAGE_MAP:
+        content.load_page(page_key)
+    content.load_cv()
+    content.load_authors_index()
+    content.load_site_config()
+    content.load_posts_config()
+    # Builds this thread's engine, importing markdown and the pymdownx extensions.
+    content._markdown_engine()
+
+
+def _warm_templates() -> None:
+    for template_name in WARMUP_TEMPLATES:
+        get_template(template_name)
+
+
+def _warm_page_cache() -> None:
+    from . import views
+
+    host = getattr(settings, "CANONICAL_HOST", "")
+    if not getattr(settings, "PAGE_CACHE_ENABLED", True) or not validate_host(host, settings.ALLOWED_HOSTS):
+        return
+    for route_name, view in (
+        ("home", views.home),
+        ("about", views.about),
+        ("publications", views.publications),
+        ("cv", views.cv),
+        ("robots-txt", views.robots_txt),
+        ("sitemap-xml", views.sitemap_xml),
+        ("feed-xml", views.feed_xml),
+    ):
+        # Canonical host over HTTPS (via the proxy header) so the entries match production requests.
+        request = HttpRequest()
+        request.method = "GET"
+        request.path = request.path_info = reverse(route_name)
+        request.META = {"HTTP_HOST": host, "HTTP_X_FORWARDED_PROTO": "https", "SERVER_PORT": "443"}
+        view(request)
+
+
+def warm_up() -> WarmupState:
+    """Load content, compile templates and prime the page cache in this process.
+
+    Called before gunicorn forks its workers (``--preload``) so they share the result
+    copy-on-write. Safe to call more than once; later calls return the recorded state.
+    """
+
+    global _warmup_state
+
+    with _warmup_lock:
+        if _warmup_state.status in {"running", "ready"}:
+            return _warmup_state
+        _warmup_state = WarmupState(status="running", started_at=time.time())
+
+    try:
+        _warm_content()
+        _warm_templates()
+        _warm_page_cache()
+    except Exception as exc:
+        logger.exception("Content warm-up failed.")
+        state = WarmupState(status="failed", started_at=_warmup_state.started_at, finished_at=time.time(), error=str(exc))
+    else:
+        state = WarmupState(status="ready", started_at=_warmup_state.started_at, finished_at=time.time())
+        # Move everything loaded so far out of the collector's reach, so collections in
+        # forked workers don't write to (and un-share) these pages.
+        gc.freeze()
+        logger.info("Content warm-up finished in %.2fs.", state.duration_seconds)
+
+    with _warmup_lock:
+        _warmup_state = state
+    return state
+
+
+def warm_up_in_background() -> None:
+    with _warmup_lock:
+        if _warmup_state.status != "pending":
+            return
+    threading.Thread(target=warm_up, name="pages-warmup", daemon=True).start()